@@ -0,0 +1,76 @@
+#!/usr/bin/env python3
+"""
+Cache Throughput Microbenchmark
+
+Measures get/set throughput of the single-lock CacheManager against the
+lock-striped ShardedCacheManager as the number of threads grows.
+
+Usage:
+    python benchmarks/cache_throughput.py [--ops 200000] [--threads 1,2,4,8,16]
+"""
+
+import argparse
+import sys
+import threading
+import time
+from pathlib import Path
+
+# Add the src directory to the Python path
+src_path = Path(__file__).parent.parent / "src"
+sys.path.insert(0, str(src_path))
+
+from db2_mcp_server.cache import CacheManager, ShardedCacheManager
+
+KEY_SPACE = 10000
+READ_RATIO = 0.9  # 90% gets, 10% sets
+
+
+def run_workload(cache, threads: int, total_ops: int) -> float:
+    """Run a mixed get/set workload and return operations per second."""
+    keys = [f"table_metadata:SCHEMA:TABLE_{i}" for i in range(KEY_SPACE)]
+    for key in keys:
+        cache.set(key, {"table_name": key})
+
+    ops_per_thread = total_ops // threads
+    write_every = int(1 / (1 - READ_RATIO))
+    start_barrier = threading.Barrier(threads + 1)
+
+    def worker(offset: int):
+        start_barrier.wait()
+        for i in range(ops_per_thread):
+            key = keys[(i * 7919 + offset) % KEY_SPACE]
+            if i % write_every == 0:
+                cache.set(key, {"table_name": key})
+            else:
+                cache.get(key)
+
+    workers = [threading.Thread(target=worker, args=(n * 104729,)) for n in range(threads)]
+    for t in workers:
+        t.start()
+    start_barrier.wait()
+    started = time.perf_counter()
+    for t in workers:
+        t.join()
+    elapsed = time.perf_counter() - started
+    return (ops_per_thread * threads) / elapsed
+
+
+def main():
+    parser = argparse.ArgumentParser(description="CacheManager throughput benchmark")
+    parser.add_argument("--ops", type=int, default=200000, help="Total operations per run")
+    parser.add_argument("--threads", default="1,2,4,8,16", help="Comma-separated thread counts")
+    parser.add_argument("--shards", type=int, default=16, help="Shards for ShardedCacheManager")
+    args = parser.parse_args()
+
+    thread_counts = [int(n) for n in args.threads.split(",")]
+    print(f"{'threads':>8} {'CacheManager ops/s':>20} {'Sharded ops/s':>16} {'speedup':>8}")
+    for threads in thread_counts:
+        single = run_workload(CacheManager(sweep_interval=0), threads, args.ops)
+        sharded = run_workload(
+            ShardedCacheManager(shards=args.shards, sweep_interval=0), threads, args.ops
+        )
+        print(f"{threads:>8} {single:>20,.0f} {sharded:>16,.0f} {sharded / single:>7.2f}x")
+
+
+if __name__ == "__main__":
+    main()
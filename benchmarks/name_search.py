@@ -0,0 +1,63 @@
+#!/usr/bin/env python3
+"""
+Name Search Benchmark
+
+Builds a NameIndex over a synthetic catalog and reports the latency of
+exact, prefix and fuzzy searches. Realistic catalogs repeat column names
+across many tables, which the index stores once.
+
+Usage:
+    python benchmarks/name_search.py [--tables 50000] [--columns 20]
+"""
+
+import argparse
+import random
+import sys
+import time
+from pathlib import Path
+
+# Add the src directory to the Python path
+src_path = Path(__file__).parent.parent / "src"
+sys.path.insert(0, str(src_path))
+
+from db2_mcp_server.search.name_index import NameIndex
+
+WORDS = ["customer", "order", "invoice", "product", "account", "payment", "shipment", "employee",
+         "branch", "region", "ledger", "contract", "claim", "policy", "vendor", "asset"]
+SUFFIXES = ["", "_hist", "_stage", "_archive", "_daily", "_map", "_detail", "_summary"]
+COLUMNS = ["id", "name", "status", "created_at", "updated_at", "amount", "currency", "description"]
+
+
+def build(tables: int, columns: int, seed: int = 7) -> NameIndex:
+    rng = random.Random(seed)
+    index = NameIndex()
+    for i in range(tables):
+        table = f"{rng.choice(WORDS)}_{rng.choice(WORDS)}{rng.choice(SUFFIXES)}_{i}".upper()
+        names = [f"{rng.choice(WORDS)}_{rng.choice(COLUMNS)}".upper() for _ in range(columns - 1)] + ["ID"]
+        index.add_table(table, f"SCHEMA_{i % 20}", dict.fromkeys(names))
+    return index
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Name search benchmark")
+    parser.add_argument("--tables", type=int, default=50000, help="Tables in the synthetic catalog")
+    parser.add_argument("--columns", type=int, default=20, help="Columns per table")
+    parser.add_argument("--repeat", type=int, default=200, help="Searches per query")
+    args = parser.parse_args()
+
+    started = time.perf_counter()
+    index = build(args.tables, args.columns)
+    print(f"Indexed {args.tables} tables x {args.columns} columns in {time.perf_counter() - started:.1f}s")
+
+    print(f"{'query':>22} {'matches':>8} {'avg':>10}")
+    for query in ("ID", "customer_order_", "schema_3.payment", "invoce_amount", "custmer_ordr_hist_42"):
+        index.search(query, limit=10)
+        started = time.perf_counter()
+        for _ in range(args.repeat):
+            matches = index.search(query, limit=10)
+        elapsed = (time.perf_counter() - started) / args.repeat
+        print(f"{query:>22} {len(matches):>8} {elapsed * 1000:>7.3f} ms")
+
+
+if __name__ == "__main__":
+    main()
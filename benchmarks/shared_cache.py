@@ -0,0 +1,118 @@
+#!/usr/bin/env python3
+"""
+Shared Cache Benchmark
+
+Compares the in-process CacheManager against a CacheManager backed by the
+cross-process shared cache server:
+
+1. Lookup latency of a cache hit served by each tier.
+2. Cold start of several worker processes loading the same catalog keys,
+   where every load simulates a DB2 catalog query. Without a shared tier
+   each worker pays for every key; with it, most keys are loaded once.
+
+Usage:
+    python benchmarks/shared_cache.py [--workers 4] [--keys 200] [--load-ms 2]
+"""
+
+import argparse
+import multiprocessing
+import sys
+import time
+from pathlib import Path
+
+# Add the src directory to the Python path
+src_path = Path(__file__).parent.parent / "src"
+sys.path.insert(0, str(src_path))
+
+from db2_mcp_server.cache import CacheManager
+from db2_mcp_server.shared_cache import SharedCacheClient, SharedCacheServer
+
+AUTHKEY = b"benchmark"
+
+
+def catalog_row(i: int) -> dict:
+    return {"TABSCHEMA": "APP", "TABNAME": f"TABLE_{i}", "COLUMNS": [f"COL_{c}" for c in range(20)]}
+
+
+def hit_latency(cache, keys, rounds: int) -> float:
+    """Return the mean microseconds per cache hit."""
+    started = time.perf_counter()
+    for _ in range(rounds):
+        for key in keys:
+            cache.get(key)
+    return (time.perf_counter() - started) * 1e6 / (rounds * len(keys))
+
+
+def cold_worker(address, keys, offset: int, load_ms: float, shared: bool, loads) -> None:
+    """Simulate one server process answering a request for every key.
+
+    Workers start at different offsets, as a load balancer spreads different
+    requests across them.
+    """
+    l2 = SharedCacheClient(address, AUTHKEY) if shared else None
+    cache = CacheManager(sweep_interval=0, l2=l2)
+
+    def loader(i):
+        with loads.get_lock():
+            loads.value += 1
+        time.sleep(load_ms / 1000)  # stands in for a SYSCAT query
+        return catalog_row(i)
+
+    for n in range(len(keys)):
+        i = (n + offset) % len(keys)
+        cache.get_or_load(keys[i], lambda i=i: loader(i), ttl=300)
+
+
+def cold_start(address, workers: int, keys, load_ms: float, shared: bool):
+    """Run workers concurrently and return (catalog loads, wall seconds)."""
+    loads = multiprocessing.Value("i", 0)
+    procs = [
+        multiprocessing.Process(
+            target=cold_worker, args=(address, keys, w * len(keys) // workers, load_ms, shared, loads)
+        )
+        for w in range(workers)
+    ]
+    started = time.perf_counter()
+    for p in procs:
+        p.start()
+    for p in procs:
+        p.join()
+    return loads.value, time.perf_counter() - started
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Shared cache benchmark")
+    parser.add_argument("--workers", type=int, default=4, help="Worker processes in the cold-start run")
+    parser.add_argument("--keys", type=int, default=200, help="Distinct catalog keys")
+    parser.add_argument("--load-ms", type=float, default=2.0, help="Simulated catalog query latency")
+    parser.add_argument("--rounds", type=int, default=20, help="Passes over the keys in the latency run")
+    args = parser.parse_args()
+
+    keys = [f"syscat_columns:TABLE_{i}" for i in range(args.keys)]
+
+    # 1. Hit latency: in-process L1 vs. a round-trip to the shared server
+    server = SharedCacheServer(("127.0.0.1", 0), AUTHKEY, CacheManager(sweep_interval=0))
+    server.start()
+    local = CacheManager(sweep_interval=0)
+    client = SharedCacheClient(server.address, AUTHKEY)
+    for i, key in enumerate(keys):
+        local.set(key, catalog_row(i), ttl=300)
+        client.set(key, catalog_row(i), ttl=300, soft_ttl=300)
+
+    print("Hit latency")
+    print(f"  in-process CacheManager: {hit_latency(local, keys, args.rounds):8.1f} us")
+    print(f"  shared cache server:     {hit_latency(client, keys, args.rounds):8.1f} us")
+    client.clear()
+    client.close()
+
+    # 2. Cold start of several workers
+    print(f"\nCold start: {args.workers} workers x {args.keys} keys, {args.load_ms} ms per catalog query")
+    print(f"{'cache':>12} {'catalog loads':>14} {'wall s':>8}")
+    for shared in (False, True):
+        loads, elapsed = cold_start(server.address, args.workers, keys, args.load_ms, shared)
+        print(f"{'shared' if shared else 'in-process':>12} {loads:>14} {elapsed:>8.2f}")
+    server.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,79 @@
+#!/usr/bin/env python3
+"""
+Table Metadata Cache Hit Benchmark
+
+Measures the cost of a TableMetadataStorage cache hit on a wide table. The
+previous implementation cached ``metadata.dict()`` and rebuilt the model with
+``TableMetadata(**cached)`` on every hit; the storage now caches a frozen
+instance and returns it as is.
+
+Usage:
+    python benchmarks/table_metadata_hits.py [--columns 500] [--hits 2000]
+"""
+
+import argparse
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+# Add the src directory to the Python path
+src_path = Path(__file__).parent.parent / "src"
+sys.path.insert(0, str(src_path))
+
+from db2_mcp_server.cache import CacheManager
+from db2_mcp_server.storage.table_metadata import FieldInfo, TableMetadata, TableMetadataStorage
+
+
+def wide_table(columns: int) -> TableMetadata:
+    return TableMetadata(
+        table_name="WIDE_TABLE",
+        schema_name="APP",
+        fields=[
+            FieldInfo(
+                name=f"COL_{i}",
+                data_type="VARCHAR",
+                description=f"Column {i}",
+                max_length=255,
+                constraints=["NOT NULL"],
+                business_context="Benchmark column",
+            )
+            for i in range(columns)
+        ],
+    )
+
+
+def per_hit_us(fn, hits: int) -> float:
+    started = time.perf_counter()
+    for _ in range(hits):
+        fn()
+    return (time.perf_counter() - started) * 1e6 / hits
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Table metadata cache hit benchmark")
+    parser.add_argument("--columns", type=int, default=500, help="Columns in the table")
+    parser.add_argument("--hits", type=int, default=2000, help="Cache hits to time")
+    args = parser.parse_args()
+
+    metadata = wide_table(args.columns)
+    with tempfile.TemporaryDirectory() as storage_dir:
+        storage = TableMetadataStorage(storage_dir, CacheManager(sweep_interval=0))
+        storage.store_table_metadata(metadata)
+
+        # Old behaviour: a dict in the cache, validated into a model on each hit
+        dict_cache = CacheManager(sweep_interval=0)
+        dict_cache.set("table_metadata:APP:WIDE_TABLE", metadata.model_dump())
+        revalidate = per_hit_us(
+            lambda: TableMetadata(**dict_cache.get("table_metadata:APP:WIDE_TABLE")), args.hits
+        )
+        frozen = per_hit_us(lambda: storage.get_table_metadata("WIDE_TABLE", "APP"), args.hits)
+
+    print(f"{args.columns}-column table, {args.hits} hits")
+    print(f"  re-validated dict: {revalidate:10.1f} us/hit")
+    print(f"  frozen instance:   {frozen:10.1f} us/hit")
+    print(f"  speedup:           {revalidate / frozen:10.1f}x")
+
+
+if __name__ == "__main__":
+    main()
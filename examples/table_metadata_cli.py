@@ -23,6 +23,7 @@ from db2_mcp_server.storage import (
     parse_field_descriptions,
     extract_table_name_from_context
 )
+from db2_mcp_server.storage.jsonl import is_jsonl_path
 from db2_mcp_server.prompts.db2_prompts import (
     store_table_metadata_from_context,
     get_stored_table_info,
@@ -200,9 +201,18 @@ def delete_table_metadata(table_name: str, schema_name: Optional[str] = None) ->
         print(f"✗ Error deleting metadata: {e}")
         return False
 
+def print_progress(action: str):
+    """Return a progress callback that rewrites one status line on stderr."""
+    def report(count: int) -> None:
+        print(f"\r  {action} {count} tables...", end="", file=sys.stderr, flush=True)
+    return report
+
 def export_metadata(output_path: str, table_names: Optional[List[str]] = None) -> bool:
     """Export table metadata to a file.
     
+    Files named *.jsonl, *.jsonl.gz or *.jsonl.zst are streamed one table
+    per line, with progress on stderr.
+    
     Args:
         output_path: Path to export file
         table_names: Optional list of table names to export
@@ -212,6 +222,16 @@ def export_metadata(output_path: str, table_names: Optional[List[str]] = None) -
     """
     try:
         storage = get_table_metadata_storage()
+        if is_jsonl_path(output_path):
+            count = storage.export_metadata_jsonl(output_path, table_names, progress=print_progress("exported"))
+            print(file=sys.stderr)
+            if count is None:
+                print(f"✗ Failed to export metadata to '{output_path}'")
+                return False
+            file_size = os.path.getsize(output_path)
+            print(f"✓ Exported metadata for {count} tables to '{output_path}' ({file_size} bytes)")
+            return True
+        
         success = storage.export_metadata(output_path, table_names)
         if success:
             file_size = os.path.getsize(output_path)
@@ -226,17 +246,30 @@ def export_metadata(output_path: str, table_names: Optional[List[str]] = None) -
         print(f"✗ Error exporting metadata: {e}")
         return False
 
-def import_metadata(input_path: str) -> bool:
+def import_metadata(input_path: str, workers: int = 1, batch_size: int = 500) -> bool:
     """Import table metadata from a file.
     
     Args:
         input_path: Path to import file
+        workers: Validation processes for JSON Lines files
+        batch_size: Tables per commit for JSON Lines files
         
     Returns:
         bool: True if imported successfully
     """
     try:
         storage = get_table_metadata_storage()
+        if is_jsonl_path(input_path):
+            count = storage.import_metadata_jsonl(
+                input_path, batch_size=batch_size, workers=workers, progress=print_progress("imported")
+            )
+            print(file=sys.stderr)
+            if count:
+                print(f"✓ Imported metadata for {count} tables from '{input_path}'")
+            else:
+                print(f"✗ Failed to import metadata from '{input_path}'")
+            return count > 0
+        
         success = storage.import_metadata(input_path)
         if success:
             print(f"✓ Imported metadata from '{input_path}'")
@@ -308,6 +341,10 @@ Examples:
   # Import metadata from a file
   python table_metadata_cli.py import --input metadata_backup.json
   
+  # Stream a large catalog as compressed JSON Lines
+  python table_metadata_cli.py export --output metadata_backup.jsonl.gz
+  python table_metadata_cli.py import --input metadata_backup.jsonl.gz --workers 4
+  
   # Create a sample file template
   python table_metadata_cli.py sample --output sample_table.txt
 """
@@ -339,12 +376,18 @@ Examples:
     
     # Export command
     export_parser = subparsers.add_parser('export', help='Export metadata to file')
-    export_parser.add_argument('--output', '-o', required=True, help='Output file path')
+    export_parser.add_argument('--output', '-o', required=True,
+                               help='Output file path (.json, or .jsonl[.gz|.zst] to stream)')
     export_parser.add_argument('--tables', '-t', nargs='+', help='Specific tables to export')
     
     # Import command
     import_parser = subparsers.add_parser('import', help='Import metadata from file')
-    import_parser.add_argument('--input', '-i', required=True, help='Input file path')
+    import_parser.add_argument('--input', '-i', required=True,
+                               help='Input file path (.json, or .jsonl[.gz|.zst] to stream)')
+    import_parser.add_argument('--workers', '-w', type=int, default=1,
+                               help='Validation processes for JSON Lines imports')
+    import_parser.add_argument('--batch-size', type=int, default=500,
+                               help='Tables per commit for JSON Lines imports')
     
     # Sample command
     sample_parser = subparsers.add_parser('sample', help='Create sample field descriptions file')
@@ -387,7 +430,7 @@ Examples:
             return 0 if success else 1
             
         elif args.command == 'import':
-            success = import_metadata(args.input)
+            success = import_metadata(args.input, args.workers, args.batch_size)
             return 0 if success else 1
             
         elif args.command == 'sample':
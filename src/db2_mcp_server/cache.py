@@ -1,57 +1,1065 @@
 """In-memory cache module for DevOps MCP Server."""
 
+import asyncio
+import heapq
+import itertools
 import logging
-from typing import Any, Optional, Dict
-from datetime import datetime, timedelta
+import os
+import sys
+import time
+import weakref
+from collections import OrderedDict
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Any, Awaitable, Callable, Dict, FrozenSet, Iterable, List, Optional, Set, Tuple
 import threading
 
+from .cache_backend import BackendEntry, CacheBackend, create_backend_from_env
+
 logger = logging.getLogger(__name__)
 
+# Limits can be configured via environment variables (0 disables a limit)
+DEFAULT_MAX_ENTRIES = int(os.getenv("CACHE_MAX_ENTRIES", "10000"))
+DEFAULT_MAX_BYTES = int(os.getenv("CACHE_MAX_BYTES", str(64 * 1024 * 1024)))
+DEFAULT_SWEEP_INTERVAL = float(os.getenv("CACHE_SWEEP_INTERVAL", "30"))
+# Shards of the caches built by create_cache_manager; 0 or 1 keeps a single
+# CacheManager, which is as fast under the GIL
+DEFAULT_SHARDS = int(os.getenv("CACHE_SHARDS", "0"))
+# Shards of a ShardedCacheManager created without an explicit count
+SHARDED_CACHE_SHARDS = 16
+# Fraction of an entry's fresh lifetime during which hot keys are refreshed ahead
+DEFAULT_REFRESH_AHEAD_RATIO = float(os.getenv("CACHE_REFRESH_AHEAD_RATIO", "0.2"))
+# Reads since the last write before a key counts as hot for refresh-ahead
+REFRESH_AHEAD_MIN_HITS = int(os.getenv("CACHE_REFRESH_AHEAD_MIN_HITS", "3"))
 
-class CacheManager:
-  """In-memory cache manager for MCP server."""
+# DB2 catalog lookups cached by the tools: fresh for CATALOG_CACHE_TTL seconds,
+# then served stale while revalidating until CATALOG_CACHE_HARD_TTL
+CATALOG_CACHE_TTL = int(os.getenv("CATALOG_CACHE_TTL", "300"))
+CATALOG_CACHE_HARD_TTL = int(os.getenv("CATALOG_CACHE_HARD_TTL", "3600"))
+
+# Lookup states returned by CacheManager._lookup
+_MISS = "miss"
+_FRESH = "fresh"
+_REFRESH_AHEAD = "refresh_ahead"
+_STALE = "stale"
+
+# Maximum expired entries reclaimed per lock acquisition while sweeping
+SWEEP_BATCH_SIZE = 1000
+
+# Reasons passed to eviction callbacks
+EVICT_SIZE = "size"
+EVICT_EXPIRED = "expired"
+EVICT_REPLACED = "replaced"
+EVICT_DELETED = "deleted"
+EVICT_INVALIDATED = "invalidated"
+
+EvictionCallback = Callable[[str, Any, str], None]
+
+# Namespace for keys without a "prefix:" part
+DEFAULT_NAMESPACE = "default"
+
+
+def key_namespace(key: str) -> str:
+  """Return the namespace of a cache key, the text before its first ``:``."""
+  namespace, sep, _ = key.partition(":")
+  return namespace if sep else DEFAULT_NAMESPACE
+
+
+def namespace_tag(namespace: str) -> str:
+  """Tag shared by every entry of a key namespace."""
+  return f"namespace:{namespace}"
+
+
+def schema_tag(schema: str) -> str:
+  """Tag for entries derived from a schema's catalog."""
+  return f"schema:{schema.upper()}"
+
+
+def table_tag(schema: Optional[str], table: str) -> str:
+  """Tag for entries derived from one table's catalog (``*`` for any schema)."""
+  return f"table:{(schema or '*').upper()}.{table.upper()}"
+
+
+class CacheStats:
+  """Thread-safe cache counters and gauges kept per key namespace.
+
+  Counters: hits (including stale and L2 hits), stale_hits, l2_hits, misses, evictions
+  (size-limit), expirations, invalidations (by tag), loads and load_errors. Gauges: entries and
+  bytes currently cached. Loader latency is accumulated per namespace.
+  """
+
+  _COUNTERS = ("hits", "stale_hits", "l2_hits", "misses", "evictions", "expirations", "invalidations", "loads", "load_errors")
+  _GAUGES = ("entries", "bytes")
 
   def __init__(self):
-    """Initialize in-memory cache."""
-    self._cache: Dict[str, Dict[str, Any]] = {}
+    self._lock = threading.Lock()
+    self._namespaces: Dict[str, Dict[str, float]] = {}
+
+  def record(self, namespace: str, counter: str, amount: float = 1) -> None:
+    """Add ``amount`` to a counter or gauge of a namespace."""
+    with self._lock:
+      self._counters(namespace)[counter] += amount
+
+  def record_load(self, namespace: str, seconds: float, error: bool = False) -> None:
+    """Record one loader call and its latency."""
+    with self._lock:
+      counters = self._counters(namespace)
+      counters["load_errors" if error else "loads"] += 1
+      counters["load_seconds_total"] += seconds
+      counters["load_seconds_max"] = max(counters["load_seconds_max"], seconds)
+
+  def snapshot(self) -> Dict[str, Dict[str, Any]]:
+    """Return a copy of the statistics of every namespace with derived ratios."""
+    with self._lock:
+      namespaces = {ns: dict(counters) for ns, counters in self._namespaces.items()}
+    for counters in namespaces.values():
+      lookups = counters["hits"] + counters["misses"]
+      calls = counters["loads"] + counters["load_errors"]
+      counters["hit_ratio"] = counters["hits"] / lookups if lookups else 0.0
+      counters["avg_load_ms"] = counters["load_seconds_total"] * 1000 / calls if calls else 0.0
+      counters["max_load_ms"] = counters.pop("load_seconds_max") * 1000
+      del counters["load_seconds_total"]
+    return namespaces
+
+  def reset(self) -> None:
+    """Zero every counter; the entry and byte gauges are kept."""
+    with self._lock:
+      for counters in self._namespaces.values():
+        for name in counters:
+          if name not in self._GAUGES:
+            counters[name] = 0
+
+  def _counters(self, namespace: str) -> Dict[str, float]:
+    counters = self._namespaces.get(namespace)
+    if counters is None:
+      counters = dict.fromkeys(self._COUNTERS + self._GAUGES, 0)
+      counters["load_seconds_total"] = 0.0
+      counters["load_seconds_max"] = 0.0
+      self._namespaces[namespace] = counters
+    return counters
+
+
+def estimate_size(value: Any, _depth: int = 0) -> int:
+  """Estimate the memory footprint of a cached value in bytes.
+
+  Walks containers and pydantic models a few levels deep; the result is an
+  approximation intended for budgeting, not exact accounting.
+  """
+  size = sys.getsizeof(value)
+  if _depth >= 4:
+    return size
+  if isinstance(value, dict):
+    size += sum(
+      estimate_size(k, _depth + 1) + estimate_size(v, _depth + 1)
+      for k, v in value.items()
+    )
+  elif isinstance(value, (list, tuple, set, frozenset)):
+    size += sum(estimate_size(item, _depth + 1) for item in value)
+  elif hasattr(value, "__dict__") and not isinstance(value, type):
+    size += estimate_size(vars(value), _depth + 1)
+  return size
+
+
+class _CacheEntry:
+  """A cached value with its monotonic expiry times and estimated size.
+
+  ``stale_at`` is the soft expiry after which the value is served stale while
+  it is revalidated, ``refresh_at`` is when hot keys start refreshing ahead of
+  that, and ``expires`` is the hard expiry after which the value is dropped.
+  """
+
+  __slots__ = ("value", "expires", "stale_at", "refresh_at", "size", "seq", "hits", "tags")
+
+  def __init__(
+    self,
+    value: Any,
+    expires: float,
+    stale_at: float,
+    refresh_at: float,
+    size: int,
+    seq: int,
+    tags: FrozenSet[str] = frozenset(),
+  ):
+    self.value = value
+    self.expires = expires
+    self.stale_at = stale_at
+    self.refresh_at = refresh_at
+    self.size = size
+    self.seq = seq  # identifies this write in the expiry heap
+    self.hits = 0
+    self.tags = tags
+
+
+_refresh_executor: Optional[ThreadPoolExecutor] = None
+_refresh_executor_lock = threading.Lock()
+
+
+def _get_refresh_executor() -> ThreadPoolExecutor:
+  """Shared worker pool running background revalidation of sync loaders."""
+  global _refresh_executor
+  with _refresh_executor_lock:
+    if _refresh_executor is None:
+      _refresh_executor = ThreadPoolExecutor(max_workers=4, thread_name_prefix="cache-refresh")
+    return _refresh_executor
+
+
+def _sweep_loop(cache_ref: "weakref.ref[CacheManager]", stop: threading.Event, interval: float) -> None:
+  """Periodically purge expired entries until stopped or the cache is gone."""
+  while not stop.wait(interval):
+    cache = cache_ref()
+    if cache is None:
+      return
+    try:
+      cache.purge_expired()
+    except Exception as e:
+      logger.warning(f"Cache expiry sweep failed: {e}")
+    del cache
+
+
+class CacheManager:
+  """In-memory cache manager for MCP server.
+
+  Entries are kept in least-recently-used order. When ``max_entries`` or
+  ``max_bytes`` would be exceeded, the least recently used entries are
+  evicted and registered eviction callbacks are notified.
+
+  Expiry uses the monotonic clock. Every write is pushed onto a min-heap
+  ordered by expiry time, and a background sweeper thread pops expired
+  entries off the heap. Keys that are never read again are therefore
+  reclaimed in O(log n) per entry without scanning the whole cache.
+
+  Entries may carry tags (e.g. ``schema_tag("HR")``). A tag-to-keys index
+  lets ``invalidate_tag`` drop every entry with a tag in time proportional
+  to the number of such entries.
+
+  With an optional ``l2`` CacheBackend (an on-disk file or a cache server
+  shared by all workers on the host), writes go through to it and L1 misses
+  are looked up there before being reported as misses, so restarted or
+  newly started workers start warm.
+  """
+
+  def __init__(
+    self,
+    max_entries: Optional[int] = None,
+    max_bytes: Optional[int] = None,
+    on_evict: Optional[EvictionCallback] = None,
+    sizeof: Callable[[Any], int] = estimate_size,
+    sweep_interval: Optional[float] = None,
+    clock: Callable[[], float] = time.monotonic,
+    refresh_ahead_ratio: float = DEFAULT_REFRESH_AHEAD_RATIO,
+    stats: Optional[CacheStats] = None,
+    l2: Optional[CacheBackend] = None,
+  ):
+    """Initialize in-memory cache.
+
+    Args:
+        max_entries: Maximum number of entries (0 for unlimited)
+        max_bytes: Maximum estimated total size in bytes (0 for unlimited)
+        on_evict: Optional callback ``(key, value, reason)`` run on eviction
+        sizeof: Function estimating the size of a value in bytes
+        sweep_interval: Seconds between background expiry sweeps (0 disables
+            the sweeper thread; expired entries are then reclaimed on access)
+        clock: Monotonic time source, in seconds
+        refresh_ahead_ratio: Fraction of an entry's fresh lifetime, at its end,
+            during which ``get_or_load`` refreshes hot keys in the background
+            (0 disables refresh-ahead)
+        stats: Per-namespace statistics to update; a private instance is
+            used if omitted
+        l2: Optional second-level backend consulted on L1 misses and written through
+    """
+    self._cache: "OrderedDict[str, _CacheEntry]" = OrderedDict()
     self._lock = threading.Lock()
     self.default_ttl = 600  # 1 hour default
+    self.max_entries = DEFAULT_MAX_ENTRIES if max_entries is None else max_entries
+    self.max_bytes = DEFAULT_MAX_BYTES if max_bytes is None else max_bytes
+    self._sizeof = sizeof
+    self._total_bytes = 0
+    self._eviction_callbacks: List[EvictionCallback] = []
+    if on_evict:
+      self._eviction_callbacks.append(on_evict)
+    self._clock = clock
+    self._expiry_heap: List[Tuple[float, int, str]] = []
+    self._seq = itertools.count()
+    self.sweep_interval = DEFAULT_SWEEP_INTERVAL if sweep_interval is None else sweep_interval
+    self._sweeper: Optional[threading.Thread] = None
+    self._sweeper_stop = threading.Event()
+    self._auto_sweep = True  # start the sweeper on first write
+    self._inflight: Dict[str, Future] = {}  # single-flight loads by key
+    self.refresh_ahead_ratio = refresh_ahead_ratio
+    self._refresh_tasks: set = set()  # strong refs to async background refreshes
+    self._stats = stats if stats is not None else CacheStats()
+    self._tag_index: Dict[str, Set[str]] = {}  # tag -> keys carrying it
+    self._l2 = l2
     logger.info("Initialized in-memory cache")
 
   def get(self, key: str) -> Optional[Any]:
-    """Get cached value by key."""
-    with self._lock:
-      item = self._cache.get(key)
-      if item:
-        if datetime.now() < item["expires"]:
-          return item["value"]
-        # Auto cleanup expired item
-        del self._cache[key]
-      return None
+    """Get cached value by key.
+
+    Values past their soft TTL but within their hard TTL are still returned.
+    """
+    return self._lookup(key)[0]
+
+  def set(
+    self,
+    key: str,
+    value: Any,
+    ttl: Optional[int] = None,
+    soft_ttl: Optional[int] = None,
+    tags: Optional[Iterable[str]] = None,
+  ) -> bool:
+    """Set cached value with optional TTL.
 
-  def set(self, key: str, value: Any, ttl: Optional[int] = None) -> bool:
-    """Set cached value with optional TTL."""
+    Args:
+        key: Cache key
+        value: Value to cache
+        ttl: Hard time-to-live; the entry is dropped after it
+        soft_ttl: Fresh lifetime (defaults to ``ttl``). Between ``soft_ttl``
+            and ``ttl``, ``get_or_load`` serves the stale value and refreshes
+            it in the background.
+        tags: Tags under which ``invalidate_tag`` can drop the entry
+
+    Returns:
+        bool: False if the value alone exceeds ``max_bytes``; it is not cached
+            and any previous value of ``key`` is dropped
+    """
+    return self._store(key, value, ttl, soft_ttl, tags, write_through=True)
+
+  def _store(
+    self,
+    key: str,
+    value: Any,
+    ttl: Optional[float],
+    soft_ttl: Optional[float],
+    tags: Optional[Iterable[str]],
+    write_through: bool,
+  ) -> bool:
+    """Insert into L1, and into the disk tier when ``write_through`` is set."""
+    size = self._sizeof(value)
+    evicted = []
     with self._lock:
-      ttl = ttl if ttl is not None else self.default_ttl
-      self._cache[key] = {
-        "value": value,
-        "expires": datetime.now() + timedelta(seconds=ttl),
-      }
-      return True
+      old = self._remove(key)
+      if self.max_bytes and size > self.max_bytes:
+        logger.debug(f"Not caching {key}: {size} bytes exceeds cache limit")
+        # The previous value is stale now; drop it rather than keep serving it
+        if old is not None:
+          evicted.append((key, old.value, EVICT_DELETED))
+        entry = None
+      else:
+        if old is not None:
+          evicted.append((key, old.value, EVICT_REPLACED))
+        ttl = ttl if ttl is not None else self.default_ttl
+        now = self._clock()
+        soft_ttl = ttl if soft_ttl is None else min(soft_ttl, ttl)
+        expires = now + ttl
+        stale_at = now + soft_ttl
+        refresh_at = stale_at - soft_ttl * self.refresh_ahead_ratio if self.refresh_ahead_ratio > 0 else stale_at
+        seq = next(self._seq)
+        entry = _CacheEntry(value, expires, stale_at, refresh_at, size, seq, frozenset(tags or ()))
+        self._cache[key] = entry
+        self._total_bytes += size
+        self._track(key, 1, size)
+        for tag in entry.tags:
+          self._tag_index.setdefault(tag, set()).add(key)
+        heapq.heappush(self._expiry_heap, (expires, seq, key))
+        evicted.extend(self._enforce_limits())
+        self._compact_heap()
+    self._notify(evicted)
+    if entry is None:
+      if write_through and self._l2 is not None:
+        self._l2.delete(key)
+      return False
+    self._ensure_sweeper()
+    if write_through and self._l2 is not None:
+      self._l2.set(key, value, ttl, soft_ttl, entry.tags)
+    return True
 
   def delete(self, key: str) -> bool:
     """Delete cached value."""
     with self._lock:
-      if key in self._cache:
-        del self._cache[key]
-        return True
-      return False
+      item = self._remove(key)
+    on_disk = self._l2.delete(key) if self._l2 is not None else False
+    if item is None:
+      return on_disk
+    self._notify([(key, item.value, EVICT_DELETED)])
+    return True
+
+  def invalidate_tag(self, tag: str) -> int:
+    """Delete every entry carrying ``tag``.
+
+    Returns:
+        int: Number of entries removed
+    """
+    removed = self._invalidate_tag_l1(tag)
+    if self._l2 is not None:
+      self._l2.invalidate_tag(tag)
+    return removed
+
+  def _invalidate_tag_l1(self, tag: str) -> int:
+    evicted = []
+    with self._lock:
+      for key in self._tag_index.pop(tag, ()):
+        item = self._remove(key)
+        if item is not None:
+          evicted.append((key, item.value, EVICT_INVALIDATED))
+    self._notify(evicted)
+    return len(evicted)
 
   def clear(self) -> None:
     """Clear all cached values."""
+    self._clear_l1()
+    if self._l2 is not None:
+      self._l2.clear()
+
+  def _clear_l1(self) -> None:
     with self._lock:
+      for key, item in self._cache.items():
+        self._track(key, -1, -item.size)
       self._cache.clear()
+      self._expiry_heap.clear()
+      self._tag_index.clear()
+      self._total_bytes = 0
+
+  def get_or_load(
+    self,
+    key: str,
+    loader: Callable[[], Any],
+    ttl: Optional[int] = None,
+    soft_ttl: Optional[int] = None,
+    tags: Optional[Iterable[str]] = None,
+  ) -> Optional[Any]:
+    """Get a cached value, loading it on a miss with request coalescing.
+
+    Concurrent callers that miss on the same key share one ``loader`` call:
+    the first caller runs it and caches the result, the others wait for it.
+    A ``None`` result is returned but not cached; loader exceptions are
+    raised in every waiting caller.
+
+    Stale values (past ``soft_ttl``) are returned immediately while one
+    background refresh reloads them. Hot keys are also refreshed ahead of
+    their soft expiry, so popular entries rarely go stale at all.
+
+    Args:
+        key: Cache key
+        loader: Callable producing the value on a miss
+        ttl: Hard time-to-live for the loaded value
+        soft_ttl: Fresh lifetime for the loaded value (defaults to ``ttl``)
+        tags: Tags attached to the loaded value
+
+    Returns:
+        The cached or freshly loaded value
+    """
+    value, state = self._lookup(key)
+    if state != _MISS:
+      if state != _FRESH:
+        self._refresh_in_background(key, loader, ttl, soft_ttl, tags)
+      return value
+
+    flight, leader = self._join_flight(key)
+    if not leader:
+      return flight.result()
+
+    try:
+      value = self._lookup(key, record=False)[0]  # a previous leader may have just stored it
+      if value is None:
+        value = self._timed_load(key, loader)
+        if value is not None:
+          self.set(key, value, ttl, soft_ttl, tags)
+    except BaseException as e:
+      self._end_flight(key, flight, error=e)
+      raise
+    self._end_flight(key, flight, value=value)
+    return value
+
+  async def aget_or_load(
+    self,
+    key: str,
+    loader: Callable[[], Awaitable[Any]],
+    ttl: Optional[int] = None,
+    soft_ttl: Optional[int] = None,
+    tags: Optional[Iterable[str]] = None,
+  ) -> Optional[Any]:
+    """Async variant of ``get_or_load`` taking a coroutine function as loader.
+
+    Async and sync callers for the same key share a single in-flight load.
+    """
+    value, state = self._lookup(key)
+    if state != _MISS:
+      if state != _FRESH:
+        self._arefresh_in_background(key, loader, ttl, soft_ttl, tags)
+      return value
+
+    flight, leader = self._join_flight(key)
+    if not leader:
+      return await asyncio.wrap_future(flight)
+
+    try:
+      value = self._lookup(key, record=False)[0]
+      if value is None:
+        start = time.perf_counter()
+        try:
+          value = await loader()
+        except BaseException:
+          self._stats.record_load(key_namespace(key), time.perf_counter() - start, error=True)
+          raise
+        self._stats.record_load(key_namespace(key), time.perf_counter() - start)
+        if value is not None:
+          self.set(key, value, ttl, soft_ttl, tags)
+    except BaseException as e:
+      self._end_flight(key, flight, error=e)
+      raise
+    self._end_flight(key, flight, value=value)
+    return value
+
+  def purge_expired(self) -> int:
+    """Remove every expired entry using the expiry heap.
+
+    Works in batches so the lock is never held for long.
+
+    Returns:
+        int: Number of entries removed
+    """
+    removed = self._purge_expired_l1()
+    if self._l2 is not None:
+      self._l2.purge_expired()
+    return removed
+
+  def _purge_expired_l1(self) -> int:
+    removed = 0
+    while True:
+      evicted = []
+      with self._lock:
+        now = self._clock()
+        heap = self._expiry_heap
+        while heap and heap[0][0] <= now and len(evicted) < SWEEP_BATCH_SIZE:
+          _, seq, key = heapq.heappop(heap)
+          item = self._cache.get(key)
+          # Skip heap records superseded by a later write or removal
+          if item is None or item.seq != seq:
+            continue
+          self._remove(key)
+          evicted.append((key, item.value, EVICT_EXPIRED))
+        done = not heap or heap[0][0] > now
+      self._notify(evicted)
+      removed += len(evicted)
+      if done:
+        return removed
+
+  def start_sweeper(self) -> None:
+    """Start the background expiry sweeper thread if it is not running."""
+    with self._lock:
+      self._auto_sweep = False
+      if self.sweep_interval <= 0 or (self._sweeper and self._sweeper.is_alive()):
+        return
+      self._sweeper_stop = threading.Event()
+      self._sweeper = threading.Thread(
+        target=_sweep_loop,
+        args=(weakref.ref(self), self._sweeper_stop, self.sweep_interval),
+        name="cache-expiry-sweeper",
+        daemon=True,
+      )
+      self._sweeper.start()
+
+  def stop_sweeper(self) -> None:
+    """Stop the background expiry sweeper thread."""
+    with self._lock:
+      self._auto_sweep = False
+      sweeper = self._sweeper
+      self._sweeper = None
+      self._sweeper_stop.set()
+    if sweeper and sweeper is not threading.current_thread():
+      sweeper.join(timeout=1)
+
+  def add_eviction_listener(self, callback: EvictionCallback) -> None:
+    """Register a callback ``(key, value, reason)`` run when entries leave the cache."""
+    with self._lock:
+      self._eviction_callbacks.append(callback)
+
+  def __len__(self) -> int:
+    with self._lock:
+      return len(self._cache)
+
+  @property
+  def total_bytes(self) -> int:
+    """Estimated total size of all cached values in bytes."""
+    with self._lock:
+      return self._total_bytes
+
+  def get_entry(self, key: str) -> Optional[BackendEntry]:
+    """Return an L1 value with its remaining hard and soft lifetimes, or None.
+
+    Lets a CacheManager serve as the store of a shared cache server.
+    """
+    value, state = self._lookup(key)
+    if state == _MISS:
+      return None
+    with self._lock:
+      item = self._cache.get(key)
+      if item is None:
+        return None
+      now = self._clock()
+      return BackendEntry(value, item.expires - now, max(item.stale_at - now, 0), sorted(item.tags))
+
+  def stats(self) -> Dict[str, Any]:
+    """Return occupancy, limits and per-namespace statistics.
+
+    Namespaces are key prefixes up to the first ``:``, e.g. ``table_metadata``.
+    """
+    with self._lock:
+      snapshot = {
+        "entries": len(self._cache),
+        "bytes": self._total_bytes,
+        "max_entries": self.max_entries,
+        "max_bytes": self.max_bytes,
+      }
+    snapshot["namespaces"] = self._stats.snapshot()
+    return snapshot
+
+  def reset_stats(self) -> None:
+    """Zero the hit, miss, eviction and load counters."""
+    self._stats.reset()
+
+  # --- Internal helpers (call with the lock held) ---
+
+  def _remove(self, key: str) -> Optional[_CacheEntry]:
+    item = self._cache.pop(key, None)
+    if item is not None:
+      self._total_bytes -= item.size
+      self._track(key, -1, -item.size)
+      self._unindex(key, item)
+    return item
+
+  def _unindex(self, key: str, item: _CacheEntry) -> None:
+    for tag in item.tags:
+      keys = self._tag_index.get(tag)
+      if keys is not None:
+        keys.discard(key)
+        if not keys:
+          del self._tag_index[tag]
+
+  def _track(self, key: str, entries: int, size: int) -> None:
+    namespace = key_namespace(key)
+    self._stats.record(namespace, "entries", entries)
+    self._stats.record(namespace, "bytes", size)
+
+  def _lookup(self, key: str, record: bool = True) -> Tuple[Optional[Any], str]:
+    """Return ``(value, state)`` for a key, dropping it if hard-expired."""
+    evicted = []
+    with self._lock:
+      item = self._cache.get(key)
+      if item is None:
+        state = _MISS
+      elif self._clock() >= item.expires:
+        # Auto cleanup expired item
+        self._remove(key)
+        evicted.append((key, item.value, EVICT_EXPIRED))
+        state = _MISS
+      else:
+        now = self._clock()
+        self._cache.move_to_end(key)
+        item.hits += 1
+        if now >= item.stale_at:
+          state = _STALE
+        elif now >= item.refresh_at and item.hits >= REFRESH_AHEAD_MIN_HITS:
+          state = _REFRESH_AHEAD
+        else:
+          state = _FRESH
+    self._notify(evicted)
+    value = None if state == _MISS else item.value
+    l2_hit = False
+    if state == _MISS and self._l2 is not None:
+      disk_entry = self._l2.get(key)
+      if disk_entry is not None:
+        # Promote to L1 with the remaining lifetimes
+        value, l2_hit = disk_entry.value, True
+        state = _STALE if disk_entry.soft_ttl <= 0 else _FRESH
+        self._store(key, value, disk_entry.ttl, max(disk_entry.soft_ttl, 0), disk_entry.tags, write_through=False)
+    if record:
+      namespace = key_namespace(key)
+      self._stats.record(namespace, "misses" if state == _MISS else "hits")
+      if state == _STALE:
+        self._stats.record(namespace, "stale_hits")
+      if l2_hit:
+        self._stats.record(namespace, "l2_hits")
+    return value, state
+
+  def _timed_load(self, key: str, loader: Callable[[], Any]) -> Any:
+    """Run a sync loader, recording its latency under the key's namespace."""
+    start = time.perf_counter()
+    try:
+      value = loader()
+    except BaseException:
+      self._stats.record_load(key_namespace(key), time.perf_counter() - start, error=True)
+      raise
+    self._stats.record_load(key_namespace(key), time.perf_counter() - start)
+    return value
+
+  def _refresh_in_background(
+    self,
+    key: str,
+    loader: Callable[[], Any],
+    ttl: Optional[int],
+    soft_ttl: Optional[int],
+    tags: Optional[Iterable[str]],
+  ) -> None:
+    """Reload a stale or hot key on the refresh pool unless a load is in flight."""
+    flight, leader = self._join_flight(key)
+    if not leader:
+      return
+
+    def refresh():
+      try:
+        value = self._timed_load(key, loader)
+        if value is not None:
+          self.set(key, value, ttl, soft_ttl, tags)
+      except BaseException as e:
+        logger.warning(f"Background refresh of cache key {key} failed: {e}")
+        self._end_flight(key, flight, error=e)
+        return
+      self._end_flight(key, flight, value=value)
+
+    try:
+      _get_refresh_executor().submit(refresh)
+    except RuntimeError as e:  # interpreter shutting down
+      self._end_flight(key, flight, error=e)
+
+  def _arefresh_in_background(
+    self,
+    key: str,
+    loader: Callable[[], Awaitable[Any]],
+    ttl: Optional[int],
+    soft_ttl: Optional[int],
+    tags: Optional[Iterable[str]],
+  ) -> None:
+    """Schedule an async reload of a stale or hot key on the running loop."""
+    flight, leader = self._join_flight(key)
+    if not leader:
+      return
+
+    async def refresh():
+      start = time.perf_counter()
+      try:
+        value = await loader()
+        self._stats.record_load(key_namespace(key), time.perf_counter() - start)
+        if value is not None:
+          self.set(key, value, ttl, soft_ttl, tags)
+      except BaseException as e:
+        self._stats.record_load(key_namespace(key), time.perf_counter() - start, error=True)
+        logger.warning(f"Background refresh of cache key {key} failed: {e}")
+        self._end_flight(key, flight, error=e)
+        return
+      self._end_flight(key, flight, value=value)
+
+    task = asyncio.get_running_loop().create_task(refresh())
+    self._refresh_tasks.add(task)
+    task.add_done_callback(self._refresh_tasks.discard)
+
+  def _join_flight(self, key: str) -> Tuple[Future, bool]:
+    """Return the in-flight load for ``key`` and whether the caller leads it."""
+    with self._lock:
+      flight = self._inflight.get(key)
+      if flight is not None:
+        return flight, False
+      flight = Future()
+      self._inflight[key] = flight
+      return flight, True
+
+  def _end_flight(self, key: str, flight: Future, value: Any = None, error: Optional[BaseException] = None) -> None:
+    """Publish a load result to waiters and retire the flight."""
+    with self._lock:
+      if self._inflight.get(key) is flight:
+        del self._inflight[key]
+    if error is not None:
+      flight.set_exception(error)
+    else:
+      flight.set_result(value)
+
+  def _compact_heap(self) -> None:
+    """Rebuild the expiry heap when superseded records dominate it."""
+    if len(self._expiry_heap) > 2 * len(self._cache) + 64:
+      self._expiry_heap = [
+        (item.expires, item.seq, key) for key, item in self._cache.items()
+      ]
+      heapq.heapify(self._expiry_heap)
+
+  def _ensure_sweeper(self) -> None:
+    # Started lazily so caches that are never written to cost no thread
+    if self._auto_sweep and self.sweep_interval > 0:
+      self.start_sweeper()
+
+  def _enforce_limits(self) -> list:
+    """Evict least recently used entries until both limits are satisfied."""
+    evicted = []
+    while self._cache and (
+      (self.max_entries and len(self._cache) > self.max_entries)
+      or (self.max_bytes and self._total_bytes > self.max_bytes)
+    ):
+      key, item = self._cache.popitem(last=False)
+      self._total_bytes -= item.size
+      self._track(key, -1, -item.size)
+      self._unindex(key, item)
+      evicted.append((key, item.value, EVICT_SIZE))
+    return evicted
+
+  def _notify(self, evicted: list) -> None:
+    """Count evictions and run eviction callbacks outside the lock."""
+    if not evicted:
+      return
+    for key, _, reason in evicted:
+      if reason == EVICT_SIZE:
+        self._stats.record(key_namespace(key), "evictions")
+      elif reason == EVICT_EXPIRED:
+        self._stats.record(key_namespace(key), "expirations")
+      elif reason == EVICT_INVALIDATED:
+        self._stats.record(key_namespace(key), "invalidations")
+    if not self._eviction_callbacks:
+      return
+    for key, value, reason in evicted:
+      for callback in list(self._eviction_callbacks):
+        try:
+          callback(key, value, reason)
+        except Exception as e:
+          logger.warning(f"Cache eviction callback failed for {key}: {e}")
+
+
+class ShardedCacheManager:
+  """Lock-striped cache made of independently locked CacheManager shards.
+
+  Each key is routed to one shard by its hash, so threads working on
+  different keys rarely contend for the same lock. The entry and byte limits
+  are split evenly across shards, and LRU order is tracked per shard. A single
+  background sweeper purges expired entries from every shard.
+
+  Shards reach the second level only for the keys they own. Tag
+  invalidation, purging and clearing span every shard, so they run on the
+  shards' L1 only and then once on the second level.
+  """
+
+  def __init__(
+    self,
+    shards: int = SHARDED_CACHE_SHARDS,
+    max_entries: Optional[int] = None,
+    max_bytes: Optional[int] = None,
+    on_evict: Optional[EvictionCallback] = None,
+    sizeof: Callable[[Any], int] = estimate_size,
+    sweep_interval: Optional[float] = None,
+    clock: Callable[[], float] = time.monotonic,
+    refresh_ahead_ratio: float = DEFAULT_REFRESH_AHEAD_RATIO,
+    l2: Optional[CacheBackend] = None,
+  ):
+    """Initialize the sharded cache.
+
+    Args:
+        shards: Number of independently locked segments
+        max_entries: Maximum number of entries across all shards (0 for unlimited)
+        max_bytes: Maximum estimated total size across all shards (0 for unlimited)
+        on_evict: Optional callback ``(key, value, reason)`` run on eviction
+        sizeof: Function estimating the size of a value in bytes
+        sweep_interval: Seconds between background expiry sweeps (0 disables)
+        clock: Monotonic time source, in seconds
+        refresh_ahead_ratio: Refresh-ahead window as a fraction of fresh lifetime
+        l2: Optional second-level backend shared by every shard
+    """
+    if shards < 1:
+      raise ValueError("shards must be at least 1")
+    max_entries = DEFAULT_MAX_ENTRIES if max_entries is None else max_entries
+    max_bytes = DEFAULT_MAX_BYTES if max_bytes is None else max_bytes
+    self.max_entries = max_entries
+    self.max_bytes = max_bytes
+    self._stats = CacheStats()  # shared by every shard
+    self._l2 = l2
+    self._shards = [
+      CacheManager(
+        max_entries=-(-max_entries // shards) if max_entries else 0,
+        max_bytes=-(-max_bytes // shards) if max_bytes else 0,
+        on_evict=on_evict,
+        sizeof=sizeof,
+        sweep_interval=0,  # swept by this manager's single thread
+        clock=clock,
+        refresh_ahead_ratio=refresh_ahead_ratio,
+        stats=self._stats,
+        l2=l2,
+      )
+      for _ in range(shards)
+    ]
+    self.sweep_interval = DEFAULT_SWEEP_INTERVAL if sweep_interval is None else sweep_interval
+    self._sweeper_lock = threading.Lock()
+    self._sweeper: Optional[threading.Thread] = None
+    self._sweeper_stop = threading.Event()
+    self._auto_sweep = True
+
+  @property
+  def default_ttl(self) -> int:
+    return self._shards[0].default_ttl
+
+  @default_ttl.setter
+  def default_ttl(self, ttl: int) -> None:
+    for shard in self._shards:
+      shard.default_ttl = ttl
+
+  def shard_for(self, key: str) -> CacheManager:
+    """Return the shard responsible for ``key``."""
+    return self._shards[hash(key) % len(self._shards)]
+
+  def get(self, key: str) -> Optional[Any]:
+    """Get cached value by key."""
+    return self.shard_for(key).get(key)
+
+  def set(
+    self,
+    key: str,
+    value: Any,
+    ttl: Optional[int] = None,
+    soft_ttl: Optional[int] = None,
+    tags: Optional[Iterable[str]] = None,
+  ) -> bool:
+    """Set cached value with optional hard and soft TTL and tags."""
+    stored = self.shard_for(key).set(key, value, ttl, soft_ttl, tags)
+    self._ensure_sweeper()
+    return stored
+
+  def get_or_load(
+    self,
+    key: str,
+    loader: Callable[[], Any],
+    ttl: Optional[int] = None,
+    soft_ttl: Optional[int] = None,
+    tags: Optional[Iterable[str]] = None,
+  ) -> Optional[Any]:
+    """Get a cached value, loading it on a miss with request coalescing."""
+    value = self.shard_for(key).get_or_load(key, loader, ttl, soft_ttl, tags)
+    self._ensure_sweeper()
+    return value
+
+  async def aget_or_load(
+    self,
+    key: str,
+    loader: Callable[[], Awaitable[Any]],
+    ttl: Optional[int] = None,
+    soft_ttl: Optional[int] = None,
+    tags: Optional[Iterable[str]] = None,
+  ) -> Optional[Any]:
+    """Async variant of ``get_or_load`` taking a coroutine function as loader."""
+    value = await self.shard_for(key).aget_or_load(key, loader, ttl, soft_ttl, tags)
+    self._ensure_sweeper()
+    return value
+
+  def delete(self, key: str) -> bool:
+    """Delete cached value."""
+    return self.shard_for(key).delete(key)
+
+  def invalidate_tag(self, tag: str) -> int:
+    """Delete every entry carrying ``tag`` from every shard."""
+    removed = sum(shard._invalidate_tag_l1(tag) for shard in self._shards)
+    if self._l2 is not None:
+      self._l2.invalidate_tag(tag)
+    return removed
+
+  def clear(self) -> None:
+    """Clear all cached values."""
+    for shard in self._shards:
+      shard._clear_l1()
+    if self._l2 is not None:
+      self._l2.clear()
+
+  def purge_expired(self) -> int:
+    """Remove expired entries from every shard."""
+    removed = sum(shard._purge_expired_l1() for shard in self._shards)
+    if self._l2 is not None:
+      self._l2.purge_expired()
+    return removed
+
+  def add_eviction_listener(self, callback: EvictionCallback) -> None:
+    """Register a callback ``(key, value, reason)`` run when entries leave the cache."""
+    for shard in self._shards:
+      shard.add_eviction_listener(callback)
+
+  def start_sweeper(self) -> None:
+    """Start the background expiry sweeper thread if it is not running."""
+    with self._sweeper_lock:
+      self._auto_sweep = False
+      if self.sweep_interval <= 0 or (self._sweeper and self._sweeper.is_alive()):
+        return
+      self._sweeper_stop = threading.Event()
+      self._sweeper = threading.Thread(
+        target=_sweep_loop,
+        args=(weakref.ref(self), self._sweeper_stop, self.sweep_interval),
+        name="cache-expiry-sweeper",
+        daemon=True,
+      )
+      self._sweeper.start()
+
+  def stop_sweeper(self) -> None:
+    """Stop the background expiry sweeper thread."""
+    with self._sweeper_lock:
+      self._auto_sweep = False
+      sweeper = self._sweeper
+      self._sweeper = None
+      self._sweeper_stop.set()
+    if sweeper and sweeper is not threading.current_thread():
+      sweeper.join(timeout=1)
+
+  def _ensure_sweeper(self) -> None:
+    if self._auto_sweep and self.sweep_interval > 0:
+      self.start_sweeper()
+
+  def __len__(self) -> int:
+    return sum(len(shard) for shard in self._shards)
+
+  @property
+  def shard_count(self) -> int:
+    return len(self._shards)
+
+  @property
+  def total_bytes(self) -> int:
+    """Estimated total size of all cached values in bytes."""
+    return sum(shard.total_bytes for shard in self._shards)
+
+  def stats(self) -> Dict[str, Any]:
+    """Return occupancy, limits and per-namespace statistics across all shards."""
+    return {
+      "entries": len(self),
+      "bytes": self.total_bytes,
+      "max_entries": self.max_entries,
+      "max_bytes": self.max_bytes,
+      "shards": len(self._shards),
+      "namespaces": self._stats.snapshot(),
+    }
+
+  def reset_stats(self) -> None:
+    """Zero the hit, miss, eviction and load counters."""
+    self._stats.reset()
+
+
+# Caches reported by get_cache_stats, by name
+_registry: "weakref.WeakValueDictionary[str, Any]" = weakref.WeakValueDictionary()
+_registry_lock = threading.Lock()
+
+
+def register_cache(name: str, manager: Any) -> None:
+  """Make a CacheManager or ShardedCacheManager visible to ``get_cache_stats``.
+
+  The registry holds weak references, so registering does not keep a cache alive.
+  """
+  with _registry_lock:
+    _registry[name] = manager
+
+
+def get_cache_stats() -> Dict[str, Dict[str, Any]]:
+  """Return the statistics of every registered cache, keyed by cache name."""
+  with _registry_lock:
+    managers = dict(_registry)
+  return {name: manager.stats() for name, manager in sorted(managers.items())}
+
+
+def create_cache_manager(**kwargs: Any) -> Any:
+  """Create a CacheManager, or a ShardedCacheManager when CACHE_SHARDS is above 1.
+
+  Keyword arguments are passed to the constructor.
+  """
+  if DEFAULT_SHARDS > 1:
+    return ShardedCacheManager(shards=DEFAULT_SHARDS, **kwargs)
+  return CacheManager(**kwargs)
 
 
-# Global cache instance
-cache = CacheManager()
+# Global cache instance, backed by the second level selected by CACHE_BACKEND
+cache = create_cache_manager(l2=create_backend_from_env())
+register_cache("shared", cache)
@@ -0,0 +1,81 @@
+"""Pluggable second-level backends for the in-memory cache.
+
+A CacheManager can sit in front of a CacheBackend: writes go through to the
+backend and L1 misses are looked up there before the loader runs. Two
+backends ship with the server:
+
+- ``disk``: DiskCache, a local SQLite file that survives restarts
+- ``shared``: SharedCacheClient, a cache server process shared by every
+  worker on the host
+
+The backend is chosen with ``CACHE_BACKEND`` (``memory``, ``disk`` or
+``shared``). It defaults to ``disk`` when ``CACHE_L2_PATH`` is set, and to
+``memory`` (no second level) otherwise.
+"""
+
+import logging
+import os
+from abc import ABC, abstractmethod
+from typing import Any, Iterable, List, NamedTuple, Optional
+
+logger = logging.getLogger(__name__)
+
+
+class BackendEntry(NamedTuple):
+  """A value read from a backend with its remaining lifetimes in seconds."""
+
+  value: Any
+  ttl: float
+  soft_ttl: float
+  tags: List[str]
+
+
+class CacheBackend(ABC):
+  """Interface of a second-level cache store.
+
+  Backends must be thread-safe. A backend that fails should log, then
+  behave like a miss rather than raise, so a broken second level never
+  fails a tool call.
+  """
+
+  @abstractmethod
+  def get(self, key: str) -> Optional[BackendEntry]:
+    """Return the unexpired entry for ``key``, or None."""
+
+  @abstractmethod
+  def set(self, key: str, value: Any, ttl: float, soft_ttl: float, tags: Iterable[str] = ()) -> bool:
+    """Store a value that expires ``ttl`` seconds from now."""
+
+  @abstractmethod
+  def delete(self, key: str) -> bool:
+    """Delete an entry."""
+
+  @abstractmethod
+  def invalidate_tag(self, tag: str) -> int:
+    """Delete every entry carrying ``tag`` and return how many were removed."""
+
+  @abstractmethod
+  def clear(self) -> None:
+    """Delete every entry."""
+
+  def purge_expired(self) -> int:
+    """Delete expired entries; backends that expire on their own return 0."""
+    return 0
+
+  def close(self) -> None:
+    """Release connections or file handles held by the backend."""
+
+
+def create_backend_from_env() -> Optional[CacheBackend]:
+  """Create the backend selected by ``CACHE_BACKEND``, or None for memory only."""
+  name = os.getenv("CACHE_BACKEND", "disk" if os.getenv("CACHE_L2_PATH") else "memory").strip().lower()
+  if name == "memory":
+    return None
+  if name == "disk":
+    from .disk_cache import DiskCache
+    return DiskCache.from_env()
+  if name == "shared":
+    from .shared_cache import SharedCacheClient
+    return SharedCacheClient.from_env()
+  logger.warning(f"Unknown CACHE_BACKEND '{name}', using the in-memory cache only")
+  return None
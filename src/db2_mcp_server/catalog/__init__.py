@@ -0,0 +1,25 @@
+#!/usr/bin/env python3
+"""
+Catalog module for DB2 MCP Server
+
+This module reads table metadata from the DB2 system catalog (SYSCAT) in
+bulk, publishes it to the table metadata storage and keeps it in sync.
+"""
+
+from .snapshot import (
+    CatalogSnapshotLoader,
+    merge_curated,
+    normalize_identifier
+)
+from .sync import (
+    CatalogSync,
+    SyncResult
+)
+
+__all__ = [
+    'CatalogSnapshotLoader',
+    'CatalogSync',
+    'SyncResult',
+    'merge_curated',
+    'normalize_identifier'
+]
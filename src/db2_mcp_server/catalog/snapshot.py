@@ -0,0 +1,279 @@
+"""Bulk loader building table metadata for whole schemas from the DB2 catalog.
+
+Looking tables up one at a time costs one SYSCAT.COLUMNS round-trip per
+table. CatalogSnapshotLoader instead reads SYSCAT.TABLES, COLUMNS, INDEXES,
+KEYCOLUSE (with TABCONST for the constraint type) and REFERENCES once per
+batch of schemas. It assembles complete TableMetadata objects in memory
+and publishes them to TableMetadataStorage in one batch.
+"""
+
+import logging
+import re
+from collections import defaultdict
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Sequence, Tuple
+
+import ibm_db
+
+from ..db import get_connection_pool, get_db_connection_string
+from ..storage.table_metadata import FieldInfo, TableMetadata, TableMetadataStorage, get_table_metadata_storage
+
+logger = logging.getLogger(__name__)
+
+# Bound parameters per IN list; longer lists are split into several queries
+MAX_IN_LIST = 200
+
+TABLES_QUERY = (
+    "SELECT TABSCHEMA, TABNAME, TYPE, REMARKS, CARD, CREATE_TIME, ALTER_TIME FROM SYSCAT.TABLES "
+    "WHERE TABSCHEMA IN ({schemas}){tables}"
+)
+COLUMNS_QUERY = (
+    "SELECT TABSCHEMA, TABNAME, COLNAME, TYPENAME, LENGTH, SCALE, NULLS, DEFAULT, REMARKS "
+    "FROM SYSCAT.COLUMNS WHERE TABSCHEMA IN ({schemas}){tables} ORDER BY TABSCHEMA, TABNAME, COLNO"
+)
+INDEXES_QUERY = (
+    "SELECT TABSCHEMA, TABNAME, INDNAME, UNIQUERULE, COLNAMES FROM SYSCAT.INDEXES "
+    "WHERE TABSCHEMA IN ({schemas}){tables} ORDER BY TABSCHEMA, TABNAME, INDNAME"
+)
+KEYCOLUSE_QUERY = (
+    "SELECT K.TABSCHEMA, K.TABNAME, K.CONSTNAME, K.COLNAME, C.TYPE FROM SYSCAT.KEYCOLUSE K "
+    "JOIN SYSCAT.TABCONST C ON C.TABSCHEMA = K.TABSCHEMA AND C.TABNAME = K.TABNAME AND C.CONSTNAME = K.CONSTNAME "
+    "WHERE K.TABSCHEMA IN ({schemas}){tables} ORDER BY K.TABSCHEMA, K.TABNAME, K.CONSTNAME, K.COLSEQ"
+)
+REFERENCES_QUERY = (
+    "SELECT TABSCHEMA, TABNAME, CONSTNAME, REFTABSCHEMA, REFTABNAME, FK_COLNAMES, PK_COLNAMES "
+    "FROM SYSCAT.REFERENCES WHERE TABSCHEMA IN ({schemas}){tables}"
+)
+
+# SYSCAT.TABCONST.TYPE codes of key constraints
+_CONSTRAINT_LABELS = {"P": "PRIMARY KEY", "U": "UNIQUE", "F": "FOREIGN KEY"}
+_INDEX_COLUMN = re.compile(r"([+-])([^+-]+)")
+# Joins the two sides of a foreign key relationship loaded from the catalog
+_REFERENCES = " REFERENCES "
+
+TableKey = Tuple[str, str]
+
+
+def _clean(value: Any) -> Any:
+    """Strip the blank padding DB2 returns on CHAR catalog columns."""
+    return value.strip() if isinstance(value, str) else value
+
+
+def normalize_identifier(name: str) -> str:
+    """Return the catalog spelling of a user-supplied identifier.
+
+    As in DB2 SQL, an undelimited name is folded to upper case. A name in
+    double quotes keeps its case, and ``""`` inside it stands for one quote.
+    """
+    name = name.strip()
+    if len(name) >= 2 and name[0] == name[-1] == '"':
+        return name[1:-1].replace('""', '"')
+    return name.upper()
+
+
+def placeholders(count: int) -> str:
+    return ", ".join("?" for _ in range(count))
+
+
+def fetch_rows(pooled, sql: str, params: tuple) -> List[tuple]:
+    """Run ``sql`` on the connection's prepared statement and return stripped rows."""
+    stmt = pooled.statements.prepare(sql)
+    try:
+        if not ibm_db.execute(stmt, params):
+            raise RuntimeError(f"Failed to execute SQL statement: {ibm_db.stmt_errormsg()}")
+        rows = []
+        row = ibm_db.fetch_tuple(stmt)
+        while row:
+            rows.append(tuple(_clean(value) for value in row))
+            row = ibm_db.fetch_tuple(stmt)
+        return rows
+    finally:
+        pooled.statements.release(stmt)
+
+
+def _format_index(name: str, colnames: str, uniquerule: str) -> str:
+    """Render ``+COL1-COL2`` as ``NAME (COL1, COL2 DESC)``."""
+    columns = ", ".join(
+        column if order == "+" else f"{column} DESC" for order, column in _INDEX_COLUMN.findall(colnames or "")
+    )
+    unique = " UNIQUE" if uniquerule in ("U", "P") else ""
+    return f"{name} ({columns}){unique}"
+
+
+class CatalogSnapshotLoader:
+    """Builds TableMetadata for every table of some schemas in a few catalog queries."""
+
+    def __init__(self, pool=None, storage: Optional[TableMetadataStorage] = None):
+        """Initialize the loader.
+
+        Args:
+            pool: Connection pool (the shared pool by default)
+            storage: Storage that ``publish`` writes to (the global storage by default)
+        """
+        self.pool = pool if pool is not None else get_connection_pool(get_db_connection_string())
+        self.storage = storage
+
+    def load(self, schemas: Iterable[str], table_names: Optional[Iterable[str]] = None) -> List[TableMetadata]:
+        """Read complete metadata for the tables of ``schemas``.
+
+        Args:
+            schemas: Schema names as spelled in the catalog
+            table_names: Only these tables of the schemas (all by default),
+                as spelled in the catalog
+
+        Returns:
+            TableMetadata per table, ordered by schema and table name
+        """
+        # Names are matched exactly; see normalize_identifier for user input
+        schemas = sorted({schema.strip() for schema in schemas})
+        names = sorted({name.strip() for name in table_names}) if table_names is not None else None
+        if not schemas or names == []:
+            return []
+
+        rows: Dict[str, List[tuple]] = defaultdict(list)
+        with self.pool.pooled_connection() as pooled:
+            for schema_chunk in self._chunks(schemas):
+                for name_chunk in self._chunks(names) if names is not None else [None]:
+                    for label, query in (
+                        ("tables", TABLES_QUERY),
+                        ("columns", COLUMNS_QUERY),
+                        ("indexes", INDEXES_QUERY),
+                        ("keys", KEYCOLUSE_QUERY),
+                        ("references", REFERENCES_QUERY),
+                    ):
+                        rows[label].extend(self._query(pooled, query, schema_chunk, name_chunk))
+
+        tables = self._assemble(rows)
+        logger.info(f"Loaded catalog metadata for {len(tables)} tables in {len(schemas)} schemas")
+        return tables
+
+    def publish(self, schemas: Iterable[str], table_names: Optional[Iterable[str]] = None,
+                preserve_curated: bool = True) -> int:
+        """Load the schemas and store every table in one batch.
+
+        Args:
+            schemas: Schema names
+            table_names: Only these tables of the schemas (all by default)
+            preserve_curated: Keep descriptions, business context and notes
+                entered by users where the catalog has none
+
+        Returns:
+            int: Number of tables stored
+        """
+        storage = self.storage if self.storage is not None else get_table_metadata_storage()
+        tables = self.load(schemas, table_names)
+        if preserve_curated:
+            tables = [merge_curated(table, storage.get_table_metadata(table.table_name, table.schema_name))
+                      for table in tables]
+        return storage.store_many(tables)
+
+    @staticmethod
+    def _chunks(values: Optional[Sequence[str]]) -> List[Sequence[str]]:
+        return [values[i:i + MAX_IN_LIST] for i in range(0, len(values), MAX_IN_LIST)]
+
+    @staticmethod
+    def _query(pooled, template: str, schemas: Sequence[str], names: Optional[Sequence[str]]) -> Iterator[tuple]:
+        """Run one catalog query on the connection's prepared statement."""
+        alias = "K." if template is KEYCOLUSE_QUERY else ""
+        tables = f" AND {alias}TABNAME IN ({placeholders(len(names))})" if names else ""
+        sql = template.format(schemas=placeholders(len(schemas)), tables=tables)
+        return iter(fetch_rows(pooled, sql, tuple(schemas) + tuple(names or ())))
+
+    @staticmethod
+    def _assemble(rows: Dict[str, List[tuple]]) -> List[TableMetadata]:
+        tables: Dict[TableKey, TableMetadata] = {}
+        for schema, name, table_type, remarks, card, create_time, alter_time in rows["tables"]:
+            tables[(schema, name)] = TableMetadata(
+                table_name=name,
+                schema_name=schema,
+                table_type=table_type,
+                description=remarks or None,
+                # CARD is -1 until RUNSTATS has run
+                row_count=card if card is not None and card >= 0 else None,
+                created_date=create_time,
+                # Catalog version of the table; storage stamps its own time on publish
+                last_updated=alter_time or create_time,
+            )
+
+        # Key constraints per column, and foreign key columns per constraint
+        key_labels: Dict[Tuple[str, str, str], List[str]] = defaultdict(list)
+        fk_columns: Dict[Tuple[str, str, str], List[str]] = defaultdict(list)
+        for schema, name, constname, colname, const_type in rows["keys"]:
+            label = _CONSTRAINT_LABELS.get(const_type)
+            if label:
+                key_labels[(schema, name, colname)].append(label if const_type == "P" else f"{label} {constname}")
+            if const_type == "F":
+                fk_columns[(schema, name, constname)].append(colname)
+
+        foreign_tables: Dict[Tuple[str, str, str], str] = {}
+        for schema, name, constname, ref_schema, ref_name, fk_colnames, pk_colnames in rows["references"]:
+            table = tables.get((schema, name))
+            if table is None:
+                continue
+            ref_table = f"{ref_schema}.{ref_name}"
+            columns = fk_columns.get((schema, name, constname)) or (fk_colnames or "").split()
+            for colname in columns:
+                foreign_tables[(schema, name, colname)] = ref_table
+            table.relationships[constname] = (
+                f"{schema}.{name}({', '.join(columns)}){_REFERENCES}{ref_table}({', '.join((pk_colnames or '').split())})"
+            )
+
+        for schema, name, colname, typename, length, scale, nulls, default, remarks in rows["columns"]:
+            table = tables.get((schema, name))
+            if table is None:
+                continue
+            labels = key_labels.get((schema, name, colname), [])
+            constraints = ([] if nulls == "Y" else ["NOT NULL"]) + labels
+            data_type = f"{typename}({length},{scale})" if typename == "DECIMAL" else typename
+            table.fields.append(FieldInfo(
+                name=colname,
+                data_type=data_type,
+                description=remarks or None,
+                is_nullable=nulls == "Y",
+                is_primary_key="PRIMARY KEY" in labels,
+                is_foreign_key=(schema, name, colname) in foreign_tables,
+                foreign_table=foreign_tables.get((schema, name, colname)),
+                max_length=length if typename != "DECIMAL" else None,
+                default_value=default,
+                constraints=constraints,
+            ))
+
+        for schema, name, indname, uniquerule, colnames in rows["indexes"]:
+            table = tables.get((schema, name))
+            if table is not None:
+                table.indexes.append(_format_index(indname, colnames, uniquerule))
+
+        return [tables[key] for key in sorted(tables)]
+
+
+def _is_foreign_key(table: TableMetadata, definition: str) -> bool:
+    """Whether a relationship of ``table`` has the form ``_assemble`` gives catalog foreign keys."""
+    return definition.startswith(f"{table.schema_name}.{table.table_name}(") and f"){_REFERENCES}" in definition
+
+
+def merge_curated(loaded: TableMetadata, existing: Optional[TableMetadata]) -> TableMetadata:
+    """Carry user-entered metadata over to a table freshly loaded from the catalog.
+
+    Catalog values win; descriptions and business context are kept where the
+    catalog has no REMARKS, and purpose, notes, sample queries and
+    user-entered relationships are kept as they are. Foreign keys loaded
+    from the catalog before are replaced by the ones loaded now, so a
+    dropped constraint disappears.
+    """
+    if existing is None:
+        return loaded
+    loaded.description = loaded.description or existing.description
+    loaded.business_purpose = existing.business_purpose
+    loaded.data_quality_notes = list(existing.data_quality_notes)
+    loaded.sample_queries = list(existing.sample_queries)
+    curated = {
+        name: definition for name, definition in existing.relationships.items()
+        if not _is_foreign_key(existing, definition)
+    }
+    loaded.relationships = {**curated, **loaded.relationships}
+    existing_fields = {field.name: field for field in existing.fields}
+    for field in loaded.fields:
+        previous = existing_fields.get(field.name)
+        if previous is not None:
+            field.description = field.description or previous.description
+            field.business_context = previous.business_context
+    return loaded
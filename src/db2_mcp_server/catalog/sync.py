@@ -0,0 +1,275 @@
+"""Incremental sync of stored table metadata with the DB2 catalog.
+
+DB2 moves SYSCAT.TABLES.ALTER_TIME forward on DDL (it starts at
+CREATE_TIME) and STATS_TIME on RUNSTATS. CatalogSync remembers the highest
+of each per schema, plus the table count. Every cycle starts with one
+aggregate query over all synced schemas. Only schemas whose high-water
+marks moved run a delta query, and only the tables it returns are read
+in full and published. Drops do not move any timestamp, so a table count
+that no longer adds up triggers a name-only reconcile of that schema.
+Every table that changes is invalidated in the shared cache.
+
+DB2 stamps ALTER_TIME when a DDL statement runs, not when it commits. A
+table altered before another one but committed after it would fall behind
+the high-water mark. Delta queries therefore look ``overlap`` seconds back
+from the marks. For ``overlap`` seconds after a schema changes, every
+cycle runs the delta query even when the marks did not move. Tables whose
+timestamps in that window were already seen are not republished.
+
+Marks are kept in ``.catalog_sync`` next to the stored metadata, so a
+restart resumes with deltas instead of a full load.
+"""
+
+import json
+import logging
+import os
+import threading
+import time
+from datetime import datetime, timedelta
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterable, NamedTuple, Optional, Tuple
+
+from ..cache import cache, namespace_tag, schema_tag, table_tag
+from ..storage.backends import atomic_write
+from ..storage.table_metadata import TableMetadataStorage, get_table_metadata_storage
+from .snapshot import CatalogSnapshotLoader, fetch_rows, normalize_identifier, placeholders
+
+logger = logging.getLogger(__name__)
+
+# Comma-separated schemas synced in the background by the server (none by default)
+DEFAULT_SYNC_SCHEMAS = [s.strip() for s in os.getenv("CATALOG_SYNC_SCHEMAS", "").split(",") if s.strip()]
+# Seconds between sync cycles
+DEFAULT_SYNC_INTERVAL = float(os.getenv("CATALOG_SYNC_INTERVAL", "60"))
+# Seconds a DDL or RUNSTATS may stay uncommitted and still be picked up
+DEFAULT_SYNC_OVERLAP = float(os.getenv("CATALOG_SYNC_OVERLAP", "300"))
+
+STATE_FILENAME = ".catalog_sync"
+
+MARKS_QUERY = (
+    "SELECT TABSCHEMA, COUNT(*), MAX(ALTER_TIME), MAX(STATS_TIME) FROM SYSCAT.TABLES "
+    "WHERE TABSCHEMA IN ({schemas}) GROUP BY TABSCHEMA"
+)
+DELTA_QUERY = (
+    "SELECT TABNAME, ALTER_TIME, STATS_TIME FROM SYSCAT.TABLES "
+    "WHERE TABSCHEMA = ? AND (ALTER_TIME > ? OR STATS_TIME > ?)"
+)
+NAMES_QUERY = "SELECT TABNAME FROM SYSCAT.TABLES WHERE TABSCHEMA = ?"
+
+# Compared against when a schema has no STATS_TIME yet
+_NEVER = datetime(1, 1, 1)
+
+# (ALTER_TIME, STATS_TIME) of a table
+Stamps = Tuple[datetime, Optional[datetime]]
+
+
+class SyncResult(NamedTuple):
+    """Outcome of one sync cycle."""
+
+    updated: int
+    deleted: int
+
+
+def _later(a: Optional[datetime], b: Optional[datetime]) -> Optional[datetime]:
+    if a is None or b is None:
+        return a or b
+    return max(a, b)
+
+
+class CatalogSync:
+    """Keeps TableMetadataStorage in step with the catalog of some schemas."""
+
+    def __init__(
+        self,
+        schemas: Iterable[str],
+        loader: Optional[CatalogSnapshotLoader] = None,
+        storage: Optional[TableMetadataStorage] = None,
+        cache_manager=None,
+        state_path: Optional[Path] = None,
+        interval: float = DEFAULT_SYNC_INTERVAL,
+        overlap: float = DEFAULT_SYNC_OVERLAP,
+        clock: Callable[[], float] = time.time,
+    ):
+        """Initialize the sync; call ``sync_once`` or ``start``.
+
+        Args:
+            schemas: Schemas to keep in sync; undelimited names are folded
+                to upper case (see normalize_identifier)
+            loader: Catalog loader (one on the shared pool by default)
+            storage: Storage to update (the global storage by default)
+            cache_manager: Cache whose entries are invalidated on change
+                (the shared cache by default)
+            state_path: File keeping the high-water marks
+            interval: Seconds between cycles of the background thread
+            overlap: Seconds delta queries look back past the marks, and
+                keep running after a change
+            clock: Wall-clock time source, in seconds; persisted with the marks
+        """
+        self.schemas = sorted({normalize_identifier(schema) for schema in schemas})
+        self.storage = storage if storage is not None else get_table_metadata_storage()
+        self.loader = loader if loader is not None else CatalogSnapshotLoader(storage=self.storage)
+        self.cache_manager = cache_manager if cache_manager is not None else cache
+        self.state_path = Path(state_path) if state_path else self.storage.storage_path / STATE_FILENAME
+        self.interval = interval
+        self.overlap = timedelta(seconds=overlap)
+        self._clock = clock
+        self._state: Dict[str, Dict[str, Any]] = self._read_state()
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def sync_once(self) -> SyncResult:
+        """Bring every schema up to date with the catalog.
+
+        Returns:
+            SyncResult: Tables published and tables deleted
+        """
+        with self._lock:
+            if not self.schemas:
+                return SyncResult(0, 0)
+            with self.loader.pool.pooled_connection() as pooled:
+                marks = {
+                    schema: (count, alter_time, stats_time)
+                    for schema, count, alter_time, stats_time in fetch_rows(
+                        pooled, MARKS_QUERY.format(schemas=placeholders(len(self.schemas))), tuple(self.schemas)
+                    )
+                }
+            updated = deleted = 0
+            for schema in self.schemas:
+                count, alter_time, stats_time = marks.get(schema, (0, None, None))
+                schema_updated, schema_deleted = self._sync_schema(schema, count, alter_time, stats_time)
+                updated += schema_updated
+                deleted += schema_deleted
+            if updated or deleted:
+                logger.info(f"Catalog sync published {updated} and deleted {deleted} tables")
+            return SyncResult(updated, deleted)
+
+    def start(self) -> None:
+        """Run ``sync_once`` every ``interval`` seconds on a daemon thread."""
+        if self._thread is not None:
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name="catalog-sync", daemon=True)
+        self._thread.start()
+
+    def stop(self) -> None:
+        """Stop the background thread, waiting for a running cycle to finish."""
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+
+    def _run(self) -> None:
+        while not self._stop.is_set():
+            try:
+                self.sync_once()
+            except Exception as e:
+                logger.error(f"Catalog sync failed: {e}")
+            self._stop.wait(self.interval)
+
+    def _sync_schema(self, schema: str, count: int, alter_time: Optional[datetime],
+                     stats_time: Optional[datetime]) -> SyncResult:
+        state = self._state.get(schema)
+        now = self._clock()
+        if state is None:
+            # First sync of the schema: load it whole, then drop leftovers. The
+            # window is read first, so anything changed during the load is
+            # republished on a later cycle.
+            recent = self._fetch_delta(schema, alter_time or _NEVER, stats_time or _NEVER)
+            updated = self.loader.publish([schema])
+            deleted = self._reconcile(schema)
+            self.cache_manager.invalidate_tag(schema_tag(schema))
+            self.cache_manager.invalidate_tag(namespace_tag("list_tables"))
+            settle_until = now + self.overlap.total_seconds()
+        else:
+            moved = (alter_time or _NEVER) > state["alter_time"] or (stats_time or _NEVER) > state["stats_time"]
+            settling = now < state["settle_until"]
+            if not moved and not settling and count == state["tables"]:
+                return SyncResult(0, 0)
+            recent = state["recent"]
+            changed = []
+            if moved or settling:
+                # Late commits land behind the marks, so look back by the overlap
+                rows = self._fetch_delta(schema, state["alter_time"], state["stats_time"])
+                changed = sorted(name for name, stamps in rows.items() if recent.get(name) != stamps)
+                recent = rows
+            settle_until = now + self.overlap.total_seconds() if moved or changed or count != state["tables"] \
+                else state["settle_until"]
+            new = [name for name in changed if self.storage.get_table_metadata(name, schema) is None]
+            updated = self.loader.publish([schema], changed) if changed else 0
+            # Drops move no timestamp; they show as a count that does not add up
+            deleted = self._reconcile(schema) if count != state["tables"] + len(new) else 0
+            for name in changed:
+                self._invalidate_table(schema, name)
+            if new or deleted:
+                # Table listings are only affected by creates and drops
+                self.cache_manager.invalidate_tag(namespace_tag("list_tables"))
+
+        marks = {
+            "alter_time": _later(state and state["alter_time"], alter_time) or _NEVER,
+            "stats_time": _later(state and state["stats_time"], stats_time) or _NEVER,
+        }
+        self._state[schema] = {
+            "tables": count,
+            **marks,
+            # Only stamps inside the next cycle's window are worth remembering
+            "recent": {
+                name: stamps for name, stamps in recent.items()
+                if stamps[0] > self._behind(marks["alter_time"])
+                or (stamps[1] is not None and stamps[1] > self._behind(marks["stats_time"]))
+            },
+            "settle_until": settle_until,
+        }
+        self._write_state()
+        return SyncResult(updated, deleted)
+
+    def _behind(self, mark: datetime) -> datetime:
+        """``mark`` moved back by the overlap."""
+        return mark - self.overlap if mark - _NEVER > self.overlap else _NEVER
+
+    def _fetch_delta(self, schema: str, alter_mark: datetime, stats_mark: datetime) -> Dict[str, Stamps]:
+        """Stamps of the tables altered or RUNSTATed within the overlap before the marks, or later."""
+        params = (schema, self._behind(alter_mark), self._behind(stats_mark))
+        with self.loader.pool.pooled_connection() as pooled:
+            rows = fetch_rows(pooled, DELTA_QUERY, params)
+        return {name: (alter, stats) for name, alter, stats in rows}
+
+    def _reconcile(self, schema: str) -> int:
+        """Delete stored tables of ``schema`` that no longer exist in the catalog."""
+        with self.loader.pool.pooled_connection() as pooled:
+            existing = {name for (name,) in fetch_rows(pooled, NAMES_QUERY, (schema,))}
+        dropped = sorted(set(self.storage.list_stored_tables(schema)) - existing)
+        for name in dropped:
+            self.storage.delete_table_metadata(name, schema)
+            self._invalidate_table(schema, name)
+        return len(dropped)
+
+    def _invalidate_table(self, schema: str, name: str) -> None:
+        self.cache_manager.invalidate_tag(table_tag(schema, name))
+        # Lookups resolved through CURRENT SCHEMA are tagged without a schema
+        self.cache_manager.invalidate_tag(table_tag(None, name))
+
+    def _read_state(self) -> Dict[str, Dict[str, Any]]:
+        try:
+            raw = json.loads(self.state_path.read_text())
+            return {
+                schema: {
+                    "tables": marks["tables"],
+                    "alter_time": datetime.fromisoformat(marks["alter_time"]),
+                    "stats_time": datetime.fromisoformat(marks["stats_time"]),
+                    "recent": {
+                        name: (datetime.fromisoformat(alter), datetime.fromisoformat(stats) if stats else None)
+                        for name, (alter, stats) in marks.get("recent", {}).items()
+                    },
+                    "settle_until": marks.get("settle_until", 0.0),
+                }
+                for schema, marks in raw.items()
+            }
+        except FileNotFoundError:
+            return {}
+        except (ValueError, KeyError, TypeError, AttributeError) as e:
+            logger.warning(f"Ignoring unreadable catalog sync state {self.state_path}: {e}")
+            return {}
+
+    def _write_state(self) -> None:
+        content = json.dumps(self._state, default=lambda value: value.isoformat(), indent=2)
+        atomic_write(self.state_path, content.encode("utf-8"))
@@ -2,6 +2,7 @@ import logging
 import os
 import sys
 import argparse
+import threading
 import logging
 
 # Third-party imports
@@ -20,9 +21,20 @@ logger = logging.getLogger(__name__)
 load_dotenv()  # Load .env file
 
 # Import modules after mcp instance is created to avoid circular imports
-from .tools import list_tables  # Import existing tools
+from .tools import list_tables, metadata_retrieval, search_metadata, search_tables  # Import existing tools
 from .prompts import db2_prompts  # Import prompts
 from .resources import db2_resources  # Import resources
+from .catalog.sync import DEFAULT_SYNC_INTERVAL, DEFAULT_SYNC_SCHEMAS, CatalogSync
+from .db import get_connection_pool
+
+def warm_up_pool():
+  """Open the pool's DB2_POOL_MIN_SIZE connections; failures are only logged."""
+  try:
+    opened = get_connection_pool().warm_up()
+    logger.info(f"Opened {opened} pooled DB2 connections")
+  except Exception as e:
+    logger.warning(f"Could not warm up the DB2 connection pool: {e}")
+
 
 def main():
   """Entry point for the CLI."""
@@ -62,6 +74,14 @@ def main():
   logger.info(f"DB2_DATABASE: {os.getenv('DB2_DATABASE', 'not set')}")
   logger.info(f"DB2_USERNAME: {os.getenv('DB2_USERNAME', 'not set')}")
 
+  # Connect in the background so the first tool call finds idle connections
+  threading.Thread(target=warm_up_pool, name="db2-pool-warm-up", daemon=True).start()
+
+  if DEFAULT_SYNC_SCHEMAS:
+    # Keep stored metadata of these schemas in step with the catalog
+    logger.info(f"Syncing catalog of schemas {', '.join(DEFAULT_SYNC_SCHEMAS)} every {DEFAULT_SYNC_INTERVAL:g}s")
+    CatalogSync(DEFAULT_SYNC_SCHEMAS).start()
+
   if args.transport == "stream_http":
     # For HTTP transport, use 'streamable-http'
     # Note: host/port are configured in mcp_instance.py
@@ -0,0 +1,44 @@
+#!/usr/bin/env python3
+"""
+Database access module for DB2 MCP Server
+
+This module provides shared DB2 connection management for the MCP tools,
+including a pooled connection subsystem so tools reuse live connections
+and their prepared statements, and a bounded executor that keeps blocking driver calls off the event loop.
+"""
+
+from .pool import (
+    ConnectionPool,
+    PooledConnection,
+    PoolTimeoutError,
+    PoolClosedError,
+    get_connection_pool,
+    get_db_connection_string,
+    close_all_pools
+)
+from .statement_cache import (
+    StatementCache,
+    StatementCacheStats
+)
+from .executor import (
+    DBExecutor,
+    ExecutorSaturatedError,
+    get_db_executor,
+    run_db_call
+)
+
+__all__ = [
+    'ConnectionPool',
+    'PooledConnection',
+    'PoolTimeoutError',
+    'PoolClosedError',
+    'get_connection_pool',
+    'get_db_connection_string',
+    'close_all_pools',
+    'StatementCache',
+    'StatementCacheStats',
+    'DBExecutor',
+    'ExecutorSaturatedError',
+    'get_db_executor',
+    'run_db_call'
+]
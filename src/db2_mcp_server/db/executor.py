@@ -0,0 +1,187 @@
+"""Bounded executor for blocking DB2 driver calls.
+
+``ibm_db`` calls block the calling thread. When they run directly inside an
+MCP tool they stall the event loop, so one slow catalog query delays every
+other session. This module dispatches driver work to a dedicated, sized
+thread pool with a bounded backlog and per-call timeouts.
+"""
+
+import asyncio
+import functools
+import logging
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Dict, Optional, TypeVar
+
+from .pool import DEFAULT_MAX_SIZE
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar("T")
+
+# --- Executor configuration (overridable via environment variables) ---
+# Default to one worker per pooled connection so workers never wait on the pool
+DEFAULT_WORKERS = int(os.getenv("DB2_EXECUTOR_WORKERS", str(DEFAULT_MAX_SIZE)))
+DEFAULT_MAX_QUEUE = int(os.getenv("DB2_EXECUTOR_MAX_QUEUE", "100"))
+DEFAULT_CALL_TIMEOUT = float(os.getenv("DB2_CALL_TIMEOUT", "60"))
+
+
+class ExecutorSaturatedError(RuntimeError):
+    """Raised when the DB executor backlog is full."""
+
+
+class DBExecutor:
+    """Runs blocking DB2 work on a dedicated thread pool.
+
+    At most ``max_workers`` calls run concurrently and at most ``max_queue``
+    more wait for a worker; further submissions are rejected immediately
+    rather than piling up behind a slow database.
+    """
+
+    def __init__(
+        self,
+        max_workers: int = DEFAULT_WORKERS,
+        max_queue: int = DEFAULT_MAX_QUEUE,
+        timeout: Optional[float] = DEFAULT_CALL_TIMEOUT,
+    ):
+        """Initialize the executor.
+
+        Args:
+            max_workers: Number of worker threads running driver calls
+            max_queue: Number of calls allowed to wait for a free worker
+            timeout: Default per-call timeout in seconds (None or 0 to disable)
+        """
+        if max_workers < 1:
+            raise ValueError("max_workers must be at least 1")
+        if max_queue < 0:
+            raise ValueError("max_queue must not be negative")
+
+        self.max_workers = max_workers
+        self.max_queue = max_queue
+        self.timeout = timeout
+        self._executor = ThreadPoolExecutor(
+            max_workers=max_workers, thread_name_prefix="db2-executor"
+        )
+        self._lock = threading.Lock()
+        self._pending = 0  # running + queued calls
+        self._stats = {
+            "submitted": 0,
+            "completed": 0,
+            "failed": 0,
+            "rejected": 0,
+            "timeouts": 0,
+        }
+
+    async def run(
+        self, fn: Callable[..., T], *args: Any, timeout: Optional[float] = None, **kwargs: Any
+    ) -> T:
+        """Run ``fn(*args, **kwargs)`` on a worker thread and await its result.
+
+        Args:
+            fn: Blocking callable to execute
+            timeout: Per-call timeout in seconds (defaults to executor timeout)
+
+        Returns:
+            The callable's return value
+
+        Raises:
+            ExecutorSaturatedError: If the backlog is full
+            TimeoutError: If the call did not finish in time. The worker thread
+                keeps running the driver call to completion in the background.
+        """
+        timeout = self.timeout if timeout is None else timeout
+        self._reserve()
+
+        loop = asyncio.get_running_loop()
+        try:
+            future = loop.run_in_executor(
+                self._executor, functools.partial(self._invoke, fn, *args, **kwargs)
+            )
+        except BaseException:
+            self._finish(failed=True)
+            raise
+
+        try:
+            # shield() so a timeout or cancelled caller never cancels a call that
+            # the backlog accounting still expects to run
+            return await asyncio.wait_for(asyncio.shield(future), timeout or None)
+        except asyncio.TimeoutError:
+            with self._lock:
+                self._stats["timeouts"] += 1
+            name = getattr(fn, "__name__", repr(fn))
+            logger.warning(f"DB call {name} exceeded {timeout}s timeout")
+            raise TimeoutError(f"DB call {name} timed out after {timeout}s") from None
+
+    def submit(self, fn: Callable[..., T], *args: Any, **kwargs: Any):
+        """Submit blocking work from synchronous code.
+
+        Returns:
+            concurrent.futures.Future: Future for the call's result
+        """
+        self._reserve()
+        try:
+            return self._executor.submit(self._invoke, fn, *args, **kwargs)
+        except BaseException:
+            self._finish(failed=True)
+            raise
+
+    def stats(self) -> Dict[str, int]:
+        """Return a snapshot of executor counters and current backlog."""
+        with self._lock:
+            snapshot = dict(self._stats)
+            snapshot["pending"] = self._pending
+            snapshot["max_workers"] = self.max_workers
+            snapshot["max_queue"] = self.max_queue
+            return snapshot
+
+    def shutdown(self, wait: bool = True) -> None:
+        """Stop accepting work and optionally wait for running calls."""
+        self._executor.shutdown(wait=wait, cancel_futures=True)
+
+    # --- Internal helpers ---
+
+    def _reserve(self) -> None:
+        with self._lock:
+            if self._pending >= self.max_workers + self.max_queue:
+                self._stats["rejected"] += 1
+                raise ExecutorSaturatedError(
+                    f"DB executor is saturated ({self._pending} calls pending)"
+                )
+            self._pending += 1
+            self._stats["submitted"] += 1
+
+    def _finish(self, failed: bool) -> None:
+        with self._lock:
+            self._pending -= 1
+            self._stats["failed" if failed else "completed"] += 1
+
+    def _invoke(self, fn: Callable[..., T], *args: Any, **kwargs: Any) -> T:
+        try:
+            result = fn(*args, **kwargs)
+        except BaseException:
+            self._finish(failed=True)
+            raise
+        self._finish(failed=False)
+        return result
+
+
+# Global executor instance for easy access
+_executor_instance: Optional[DBExecutor] = None
+_executor_lock = threading.Lock()
+
+
+def get_db_executor() -> DBExecutor:
+    """Get the global DB executor instance."""
+    global _executor_instance
+    with _executor_lock:
+        if _executor_instance is None:
+            _executor_instance = DBExecutor()
+        return _executor_instance
+
+
+async def run_db_call(
+    fn: Callable[..., T], *args: Any, timeout: Optional[float] = None, **kwargs: Any
+) -> T:
+    """Run blocking DB2 work on the global DB executor."""
+    return await get_db_executor().run(fn, *args, timeout=timeout, **kwargs)
@@ -0,0 +1,365 @@
+"""Connection pool for DB2 connections.
+
+Opening a DB2 connection costs a TCP round-trip plus authentication, which
+dominates the latency of short catalog queries. This module keeps a bounded
+set of live connections that every tool borrows from instead of calling
+``ibm_db.connect``/``ibm_db.close`` per invocation.
+"""
+
+import logging
+import os
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+from typing import Any, Deque, Dict, Iterator, Optional
+
+import ibm_db
+
+from .statement_cache import DEFAULT_STATEMENT_CACHE_SIZE, StatementCache, StatementCacheStats
+
+logger = logging.getLogger(__name__)
+
+# --- Pool configuration (overridable via environment variables) ---
+DEFAULT_MIN_SIZE = int(os.getenv("DB2_POOL_MIN_SIZE", "1"))
+DEFAULT_MAX_SIZE = int(os.getenv("DB2_POOL_MAX_SIZE", "10"))
+DEFAULT_TIMEOUT = float(os.getenv("DB2_POOL_TIMEOUT", "30"))
+DEFAULT_MAX_LIFETIME = float(os.getenv("DB2_POOL_MAX_LIFETIME", "1800"))
+DEFAULT_VALIDATION_INTERVAL = float(os.getenv("DB2_POOL_VALIDATION_INTERVAL", "30"))
+
+VALIDATION_QUERY = "SELECT 1 FROM SYSIBM.SYSDUMMY1"
+
+
+def get_db_connection_string() -> str:
+    """Build DB2 connection string from environment variables."""
+    host = os.getenv("DB2_HOST", "localhost")
+    port = os.getenv("DB2_PORT", "50000")
+    database = os.getenv("DB2_DATABASE", "")
+    username = os.getenv("DB2_USERNAME", "")
+    password = os.getenv("DB2_PASSWORD", "")
+
+    if not database or not username:
+        raise ValueError("DB2_DATABASE and DB2_USERNAME must be set in environment variables")
+
+    return f"DATABASE={database};HOSTNAME={host};PORT={port};PROTOCOL=TCPIP;UID={username};PWD={password};"
+
+
+class PoolTimeoutError(TimeoutError):
+    """Raised when no pooled connection becomes available in time."""
+
+
+class PoolClosedError(RuntimeError):
+    """Raised when borrowing from a pool that has been closed."""
+
+
+class PooledConnection:
+    """A DB2 connection handle tracked by a ConnectionPool.
+
+    Each pooled connection carries its own prepared statement cache, which
+    lives exactly as long as the connection.
+    """
+
+    def __init__(self, conn: Any, statements: Optional[StatementCache] = None):
+        self.conn = conn
+        self.statements = statements if statements is not None else StatementCache(conn)
+        self.created_at = time.monotonic()
+        self.last_used = self.created_at
+
+    def age(self) -> float:
+        """Seconds since the underlying connection was opened."""
+        return time.monotonic() - self.created_at
+
+    def idle_time(self) -> float:
+        """Seconds since the connection was last returned to the pool."""
+        return time.monotonic() - self.last_used
+
+
+class ConnectionPool:
+    """Thread-safe pool of DB2 connections.
+
+    Connections are opened lazily up to ``max_size``. Borrowers wait up to
+    ``timeout`` seconds for a free connection. Each borrowed connection is
+    health-checked, and connections older than ``max_lifetime`` are recycled.
+    """
+
+    def __init__(
+        self,
+        connection_string: str,
+        min_size: int = DEFAULT_MIN_SIZE,
+        max_size: int = DEFAULT_MAX_SIZE,
+        timeout: float = DEFAULT_TIMEOUT,
+        max_lifetime: float = DEFAULT_MAX_LIFETIME,
+        validation_interval: float = DEFAULT_VALIDATION_INTERVAL,
+        validation_query: Optional[str] = VALIDATION_QUERY,
+        statement_cache_size: int = DEFAULT_STATEMENT_CACHE_SIZE,
+    ):
+        """Initialize the pool.
+
+        Args:
+            connection_string: DB2 connection string passed to ``ibm_db.connect``
+            min_size: Number of connections kept open once the pool is warm
+            max_size: Hard upper bound on open connections
+            timeout: Default seconds to wait for a free connection
+            max_lifetime: Seconds after which a connection is closed and replaced
+            validation_interval: Idle seconds after which a borrowed connection
+                is validated with ``validation_query``
+            validation_query: Lightweight query used to validate idle connections
+            statement_cache_size: Prepared statements cached per connection
+        """
+        if max_size < 1:
+            raise ValueError("max_size must be at least 1")
+        if min_size < 0 or min_size > max_size:
+            raise ValueError("min_size must be between 0 and max_size")
+
+        self.connection_string = connection_string
+        self.min_size = min_size
+        self.max_size = max_size
+        self.timeout = timeout
+        self.max_lifetime = max_lifetime
+        self.validation_interval = validation_interval
+        self.validation_query = validation_query
+        self.statement_cache_size = statement_cache_size
+        self.statement_stats = StatementCacheStats()
+
+        self._idle: Deque[PooledConnection] = deque()
+        self._size = 0  # open connections, idle + borrowed
+        self._closed = False
+        self._cond = threading.Condition(threading.Lock())
+        self._stats = {
+            "created": 0,
+            "closed": 0,
+            "borrowed": 0,
+            "recycled": 0,
+            "invalidated": 0,
+            "timeouts": 0,
+        }
+
+    # --- Public API ---
+
+    def acquire(self, timeout: Optional[float] = None) -> PooledConnection:
+        """Borrow a healthy connection from the pool.
+
+        Args:
+            timeout: Seconds to wait for a free connection (defaults to pool timeout)
+
+        Returns:
+            PooledConnection: A validated connection; return it with ``release``
+
+        Raises:
+            PoolTimeoutError: If no connection became available in time
+            PoolClosedError: If the pool has been closed
+            ConnectionError: If a new connection could not be opened
+        """
+        timeout = self.timeout if timeout is None else timeout
+        deadline = time.monotonic() + timeout
+
+        while True:
+            pooled = None
+            with self._cond:
+                while True:
+                    if self._closed:
+                        raise PoolClosedError("Connection pool is closed")
+                    if self._idle:
+                        pooled = self._idle.pop()
+                        break
+                    if self._size < self.max_size:
+                        # Reserve a slot, then connect outside the lock
+                        self._size += 1
+                        break
+                    remaining = deadline - time.monotonic()
+                    if remaining <= 0:
+                        self._stats["timeouts"] += 1
+                        raise PoolTimeoutError(
+                            f"Timed out after {timeout}s waiting for a DB2 connection "
+                            f"(pool size {self.max_size})"
+                        )
+                    self._cond.wait(remaining)
+
+            if pooled is None:
+                pooled = self._open_reserved()
+            elif not self._is_usable(pooled):
+                self._discard(pooled)
+                continue
+
+            with self._cond:
+                self._stats["borrowed"] += 1
+            return pooled
+
+    def release(self, pooled: PooledConnection, discard: bool = False) -> None:
+        """Return a borrowed connection to the pool.
+
+        Args:
+            pooled: Connection previously obtained from ``acquire``
+            discard: Close the connection instead of reusing it
+        """
+        if discard or self._closed or self._expired(pooled):
+            if not discard and not self._closed:
+                with self._cond:
+                    self._stats["recycled"] += 1
+            self._discard(pooled)
+            return
+
+        pooled.last_used = time.monotonic()
+        with self._cond:
+            self._idle.append(pooled)
+            self._cond.notify()
+
+    @contextmanager
+    def pooled_connection(self, timeout: Optional[float] = None) -> Iterator[PooledConnection]:
+        """Context manager yielding a PooledConnection with its statement cache."""
+        pooled = self.acquire(timeout)
+        try:
+            yield pooled
+        except BaseException:
+            # The connection may have been broken by the failure; drop it if so
+            self.release(pooled, discard=not self._is_active(pooled.conn))
+            raise
+        else:
+            self.release(pooled)
+
+    @contextmanager
+    def connection(self, timeout: Optional[float] = None) -> Iterator[Any]:
+        """Context manager yielding a raw ``ibm_db`` connection handle."""
+        with self.pooled_connection(timeout) as pooled:
+            yield pooled.conn
+
+    def warm_up(self) -> int:
+        """Open connections until at least ``min_size`` are available.
+
+        Returns:
+            int: Number of connections opened
+        """
+        opened = 0
+        while True:
+            with self._cond:
+                if self._closed or self._size >= self.min_size:
+                    return opened
+                self._size += 1
+            pooled = self._open_reserved()
+            self.release(pooled)
+            opened += 1
+
+    def close(self) -> None:
+        """Close all idle connections and reject further borrows.
+
+        Borrowed connections are closed when they are released.
+        """
+        with self._cond:
+            self._closed = True
+            idle = list(self._idle)
+            self._idle.clear()
+            self._cond.notify_all()
+        for pooled in idle:
+            self._discard(pooled)
+        logger.info("Closed DB2 connection pool")
+
+    def stats(self) -> Dict[str, Any]:
+        """Return a snapshot of pool counters, occupancy and statement cache counters."""
+        with self._cond:
+            snapshot = dict(self._stats)
+            snapshot["size"] = self._size
+            snapshot["idle"] = len(self._idle)
+            snapshot["in_use"] = self._size - len(self._idle)
+            snapshot["max_size"] = self.max_size
+        snapshot["statement_cache"] = self.statement_stats.snapshot()
+        return snapshot
+
+    # --- Internal helpers ---
+
+    def _open_reserved(self) -> PooledConnection:
+        """Open a connection for a slot already reserved in ``_size``."""
+        try:
+            conn = ibm_db.connect(self.connection_string, "", "")
+            if not conn:
+                raise ConnectionError("Failed to connect to the DB2 database.")
+        except Exception:
+            with self._cond:
+                self._size -= 1
+                self._cond.notify()
+            raise
+
+        with self._cond:
+            self._stats["created"] += 1
+        logger.debug("Opened new pooled DB2 connection")
+        statements = StatementCache(conn, self.statement_cache_size, self.statement_stats)
+        return PooledConnection(conn, statements)
+
+    def _discard(self, pooled: PooledConnection) -> None:
+        """Close a connection and free its slot."""
+        pooled.statements.clear()
+        try:
+            ibm_db.close(pooled.conn)
+        except Exception as e:
+            logger.warning(f"Error closing pooled DB2 connection: {e}")
+        with self._cond:
+            self._size -= 1
+            self._stats["closed"] += 1
+            self._cond.notify()
+
+    def _expired(self, pooled: PooledConnection) -> bool:
+        return self.max_lifetime > 0 and pooled.age() >= self.max_lifetime
+
+    def _is_active(self, conn: Any) -> bool:
+        try:
+            return bool(ibm_db.active(conn))
+        except Exception:
+            return False
+
+    def _is_usable(self, pooled: PooledConnection) -> bool:
+        """Validate an idle connection before handing it out."""
+        if self._expired(pooled):
+            with self._cond:
+                self._stats["recycled"] += 1
+            return False
+
+        if not self._is_active(pooled.conn):
+            with self._cond:
+                self._stats["invalidated"] += 1
+            return False
+
+        if self.validation_query and pooled.idle_time() >= self.validation_interval:
+            try:
+                stmt = ibm_db.exec_immediate(pooled.conn, self.validation_query)
+                if not stmt:
+                    raise RuntimeError(ibm_db.stmt_errormsg())
+                ibm_db.free_stmt(stmt)
+            except Exception as e:
+                logger.warning(f"Pooled DB2 connection failed validation: {e}")
+                with self._cond:
+                    self._stats["invalidated"] += 1
+                return False
+
+        return True
+
+
+# Shared pools keyed by connection string
+_pools: Dict[str, ConnectionPool] = {}
+_pools_lock = threading.Lock()
+
+
+def get_connection_pool(connection_string: Optional[str] = None) -> ConnectionPool:
+    """Get the shared connection pool for a connection string.
+
+    Args:
+        connection_string: DB2 connection string (defaults to the one built from
+            environment variables)
+
+    Returns:
+        ConnectionPool: Process-wide pool for that connection string
+    """
+    connection_string = connection_string or get_db_connection_string()
+    with _pools_lock:
+        pool = _pools.get(connection_string)
+        if pool is None:
+            pool = ConnectionPool(connection_string)
+            _pools[connection_string] = pool
+        return pool
+
+
+def close_all_pools() -> None:
+    """Close and forget every shared connection pool."""
+    with _pools_lock:
+        pools = list(_pools.values())
+        _pools.clear()
+    for pool in pools:
+        pool.close()
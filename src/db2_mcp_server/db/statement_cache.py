@@ -0,0 +1,118 @@
+"""Per-connection cache of prepared DB2 statements.
+
+Tools run the same few SQL shapes over and over. Preparing a statement costs
+a round-trip to the server, so each pooled connection keeps an LRU of
+prepared statement handles keyed by SQL text and re-executes them instead.
+"""
+
+import logging
+import os
+import threading
+from collections import OrderedDict
+from typing import Any, Dict, Optional
+
+import ibm_db
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_STATEMENT_CACHE_SIZE = int(os.getenv("DB2_STATEMENT_CACHE_SIZE", "32"))
+
+
+class StatementCacheStats:
+    """Thread-safe hit/miss/evict counters shared by many statement caches."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._counters = {"hits": 0, "misses": 0, "evictions": 0}
+
+    def record(self, counter: str) -> None:
+        """Increment a counter by one."""
+        with self._lock:
+            self._counters[counter] += 1
+
+    def snapshot(self) -> Dict[str, int]:
+        """Return a copy of the current counters."""
+        with self._lock:
+            return dict(self._counters)
+
+
+class StatementCache:
+    """LRU of prepared statement handles for a single connection.
+
+    A pooled connection is only ever used by one borrower at a time, so the
+    cache itself needs no locking; only the shared counters are synchronized.
+    """
+
+    def __init__(
+        self,
+        conn: Any,
+        capacity: int = DEFAULT_STATEMENT_CACHE_SIZE,
+        stats: Optional[StatementCacheStats] = None,
+    ):
+        """Initialize the statement cache.
+
+        Args:
+            conn: ``ibm_db`` connection handle the statements belong to
+            capacity: Maximum number of prepared statements kept (0 disables caching)
+            stats: Counters to update; a private instance is used if omitted
+        """
+        self.conn = conn
+        self.capacity = capacity
+        self.stats = stats or StatementCacheStats()
+        self._statements: "OrderedDict[str, Any]" = OrderedDict()
+
+    def prepare(self, sql: str) -> Any:
+        """Return a prepared statement for ``sql``, preparing it on a miss.
+
+        Raises:
+            RuntimeError: If DB2 rejects the statement
+        """
+        stmt = self._statements.get(sql)
+        if stmt is not None:
+            self._statements.move_to_end(sql)
+            self.stats.record("hits")
+            return stmt
+
+        self.stats.record("misses")
+        stmt = ibm_db.prepare(self.conn, sql)
+        if not stmt:
+            raise RuntimeError(f"Failed to prepare SQL statement: {ibm_db.stmt_errormsg()}")
+
+        if self.capacity > 0:
+            self._statements[sql] = stmt
+            while len(self._statements) > self.capacity:
+                _, evicted = self._statements.popitem(last=False)
+                self.stats.record("evictions")
+                self._free(evicted)
+        return stmt
+
+    def release(self, stmt: Any) -> None:
+        """Close the statement's cursor so it can be executed again.
+
+        Statements that are not cached (capacity 0) are freed entirely.
+        """
+        try:
+            if self.capacity > 0 and any(cached is stmt for cached in self._statements.values()):
+                ibm_db.free_result(stmt)
+            else:
+                ibm_db.free_stmt(stmt)
+        except Exception as e:
+            logger.debug(f"Error releasing prepared statement: {e}")
+
+    def clear(self) -> None:
+        """Free every cached statement."""
+        while self._statements:
+            _, stmt = self._statements.popitem()
+            self._free(stmt)
+
+    def __len__(self) -> int:
+        return len(self._statements)
+
+    def __contains__(self, sql: str) -> bool:
+        return sql in self._statements
+
+    def _free(self, stmt: Any) -> None:
+        try:
+            ibm_db.free_stmt(stmt)
+        except Exception as e:
+            logger.debug(f"Error freeing prepared statement: {e}")
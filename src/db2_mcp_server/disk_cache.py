@@ -0,0 +1,197 @@
+"""On-disk second-level cache tier backed by SQLite.
+
+The in-memory CacheManager starts cold on every restart, so the first wave
+of clients hits the DB2 catalog views. A DiskCache keeps a copy of cached
+values in a local SQLite file; L1 misses fall through to it before the
+loader runs. Expiry times are stored as wall-clock timestamps so they stay
+meaningful across restarts.
+
+Values are serialized with pickle. The file is written and read only by
+this server, so it must live in a directory other users cannot write to.
+"""
+
+import json
+import logging
+import os
+import pickle
+import sqlite3
+import threading
+import time
+from pathlib import Path
+from typing import Any, Callable, Iterable, Optional, Union
+
+from .cache_backend import BackendEntry, CacheBackend
+
+logger = logging.getLogger(__name__)
+
+# The L2 tier is disabled unless CACHE_L2_PATH is set
+DEFAULT_L2_PATH = os.getenv("CACHE_L2_PATH", "")
+DEFAULT_L2_MAX_ENTRIES = int(os.getenv("CACHE_L2_MAX_ENTRIES", "100000"))
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS entries (
+  key TEXT PRIMARY KEY,
+  value BLOB NOT NULL,
+  expires REAL NOT NULL,
+  stale_at REAL NOT NULL,
+  tags TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS entries_expires ON entries (expires);
+CREATE TABLE IF NOT EXISTS entry_tags (
+  tag TEXT NOT NULL,
+  key TEXT NOT NULL,
+  PRIMARY KEY (tag, key)
+);
+CREATE INDEX IF NOT EXISTS entry_tags_key ON entry_tags (key);
+"""
+
+
+class DiskCache(CacheBackend):
+  """Thread-safe persistent key-value store with TTLs and tags.
+
+  A single SQLite connection in WAL mode is shared by all threads behind a
+  lock. Expired rows are ignored on read and deleted by ``purge_expired``.
+  """
+
+  def __init__(
+    self,
+    path: Union[str, Path],
+    max_entries: int = DEFAULT_L2_MAX_ENTRIES,
+    clock: Callable[[], float] = time.time,
+  ):
+    """Open (or create) the on-disk cache.
+
+    Args:
+        path: SQLite database file
+        max_entries: Rows kept after a purge, soonest-expiring dropped first
+            (0 for unlimited)
+        clock: Wall-clock time source, in seconds since the epoch
+    """
+    self.path = Path(path)
+    self.path.parent.mkdir(parents=True, exist_ok=True)
+    self.max_entries = max_entries
+    self._clock = clock
+    self._lock = threading.Lock()
+    self._conn = sqlite3.connect(str(self.path), check_same_thread=False, isolation_level=None)
+    self._conn.execute("PRAGMA journal_mode=WAL")
+    self._conn.execute("PRAGMA synchronous=NORMAL")
+    self._conn.executescript(_SCHEMA)
+    logger.info(f"Initialized on-disk cache at {self.path}")
+
+  @classmethod
+  def from_env(cls) -> Optional["DiskCache"]:
+    """Create the disk tier configured by ``CACHE_L2_PATH``, or None if unset."""
+    if not DEFAULT_L2_PATH:
+      logger.warning("CACHE_BACKEND is disk but CACHE_L2_PATH is not set")
+      return None
+    try:
+      return cls(DEFAULT_L2_PATH)
+    except (OSError, sqlite3.Error) as e:
+      logger.warning(f"On-disk cache disabled, cannot open {DEFAULT_L2_PATH}: {e}")
+      return None
+
+  def get(self, key: str) -> Optional[BackendEntry]:
+    """Return the unexpired entry for ``key``, or None."""
+    try:
+      with self._lock:
+        row = self._conn.execute(
+          "SELECT value, expires, stale_at, tags FROM entries WHERE key = ?", (key,)
+        ).fetchone()
+      if row is None:
+        return None
+      now = self._clock()
+      if row[1] <= now:
+        return None
+      return BackendEntry(pickle.loads(row[0]), row[1] - now, row[2] - now, json.loads(row[3]))
+    except Exception as e:
+      logger.warning(f"On-disk cache read failed for {key}: {e}")
+      return None
+
+  def set(self, key: str, value: Any, ttl: float, soft_ttl: float, tags: Iterable[str] = ()) -> bool:
+    """Store a value that expires ``ttl`` seconds from now."""
+    try:
+      blob = pickle.dumps(value, protocol=pickle.HIGHEST_PROTOCOL)
+    except Exception as e:
+      logger.debug(f"Not persisting {key}: {e}")
+      return False
+    tags = sorted(set(tags))
+    now = self._clock()
+    try:
+      with self._lock, self._conn:
+        self._conn.execute("BEGIN")
+        self._conn.execute("DELETE FROM entry_tags WHERE key = ?", (key,))
+        self._conn.execute(
+          "INSERT OR REPLACE INTO entries (key, value, expires, stale_at, tags) VALUES (?, ?, ?, ?, ?)",
+          (key, blob, now + ttl, now + soft_ttl, json.dumps(tags)),
+        )
+        self._conn.executemany("INSERT INTO entry_tags (tag, key) VALUES (?, ?)", [(tag, key) for tag in tags])
+      return True
+    except sqlite3.Error as e:
+      logger.warning(f"On-disk cache write failed for {key}: {e}")
+      return False
+
+  def delete(self, key: str) -> bool:
+    """Delete an entry."""
+    try:
+      with self._lock, self._conn:
+        self._conn.execute("BEGIN")
+        self._conn.execute("DELETE FROM entry_tags WHERE key = ?", (key,))
+        return self._conn.execute("DELETE FROM entries WHERE key = ?", (key,)).rowcount > 0
+    except sqlite3.Error as e:
+      logger.warning(f"On-disk cache delete failed for {key}: {e}")
+      return False
+
+  def invalidate_tag(self, tag: str) -> int:
+    """Delete every entry carrying ``tag``."""
+    try:
+      with self._lock, self._conn:
+        self._conn.execute("BEGIN")
+        keys = [row[0] for row in self._conn.execute("SELECT key FROM entry_tags WHERE tag = ?", (tag,))]
+        self._conn.executemany("DELETE FROM entry_tags WHERE key = ?", [(key,) for key in keys])
+        self._conn.executemany("DELETE FROM entries WHERE key = ?", [(key,) for key in keys])
+        return len(keys)
+    except sqlite3.Error as e:
+      logger.warning(f"On-disk cache invalidation of {tag} failed: {e}")
+      return 0
+
+  def purge_expired(self) -> int:
+    """Delete expired rows, then trim to ``max_entries``.
+
+    Returns:
+        int: Number of rows removed
+    """
+    try:
+      with self._lock, self._conn:
+        self._conn.execute("BEGIN")
+        removed = self._conn.execute("DELETE FROM entries WHERE expires <= ?", (self._clock(),)).rowcount
+        if self.max_entries:
+          removed += self._conn.execute(
+            "DELETE FROM entries WHERE key IN ("
+            "SELECT key FROM entries ORDER BY expires DESC LIMIT -1 OFFSET ?)",
+            (self.max_entries,),
+          ).rowcount
+        if removed:
+          self._conn.execute("DELETE FROM entry_tags WHERE key NOT IN (SELECT key FROM entries)")
+        return removed
+    except sqlite3.Error as e:
+      logger.warning(f"On-disk cache purge failed: {e}")
+      return 0
+
+  def clear(self) -> None:
+    """Delete every entry."""
+    try:
+      with self._lock, self._conn:
+        self._conn.execute("BEGIN")
+        self._conn.execute("DELETE FROM entry_tags")
+        self._conn.execute("DELETE FROM entries")
+    except sqlite3.Error as e:
+      logger.warning(f"On-disk cache clear failed: {e}")
+
+  def close(self) -> None:
+    """Close the underlying SQLite connection."""
+    with self._lock:
+      self._conn.close()
+
+  def __len__(self) -> int:
+    with self._lock:
+      return self._conn.execute("SELECT COUNT(*) FROM entries").fetchone()[0]
@@ -3,6 +3,7 @@ from typing import List, Optional, Dict, Any
 from fastmcp import FastMCP
 import json
 from ..mcp_instance import mcp  # Import the shared mcp instance
+from ..cache import get_cache_stats
 
 class ResourceInput(BaseModel):
     """Input schema for DB2 resources."""
@@ -70,4 +71,15 @@ def db2_query_templates() -> ResourceResult:
         content=json.dumps(templates, indent=2),
         metadata={"type": "query_templates", "count": len(templates)},
         mime_type="application/json"
-    )
\ No newline at end of file
+    )
+
+@mcp.resource(name="db2_cache_stats", uri="db2://cache-stats")
+def db2_cache_stats() -> ResourceResult:
+    """Provide hit, miss, eviction and load latency statistics per cache namespace."""
+    stats = get_cache_stats()
+
+    return ResourceResult(
+        content=json.dumps(stats, indent=2),
+        metadata={"type": "cache_stats", "caches": sorted(stats)},
+        mime_type="application/json"
+    )
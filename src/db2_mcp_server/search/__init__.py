@@ -0,0 +1,27 @@
+#!/usr/bin/env python3
+"""
+Search module for DB2 MCP Server
+
+This module provides in-memory indexes over stored table metadata for
+the search tools.
+"""
+
+from .name_index import (
+    NameIndex,
+    NameMatch,
+    get_name_index
+)
+from .text_index import (
+    TextIndex,
+    TextMatch,
+    get_text_index
+)
+
+__all__ = [
+    'NameIndex',
+    'NameMatch',
+    'TextIndex',
+    'TextMatch',
+    'get_name_index',
+    'get_text_index'
+]
@@ -0,0 +1,415 @@
+"""In-memory index of schema, table and column names.
+
+NameIndex answers "which table or column is called something like X"
+without a catalog query. Each distinct lower-cased name is kept once,
+together with the tables and columns that carry it, so a column name
+shared by thousands of tables costs one index entry. Three kinds of
+match are tried, best first:
+
+- exact: the name itself
+- prefix: a binary search over the sorted names
+- fuzzy: names sharing trigrams with the query, ranked by Jaccard
+  similarity as in pg_trgm
+
+Prefix search looks at no more than MAX_PREFIX_SCAN completions. Fuzzy
+search never visits names one by one. Names get integer ids, and each
+trigram posting is a bitmap over those ids: a Python int with bit i set
+for name i. The number of query trigrams every name shares is summed
+for all names at once, as bit-sliced counters built from big-integer
+operations. Only names that can reach the similarity threshold, judging
+by that count and their length, are then looked at. A search thus costs
+a few hundred big-integer operations, each linear in the number of
+distinct names but running in C (about a microsecond per 50,000 names).
+
+The index is filled from TableMetadataStorage and follows its changes
+through a change listener. Catalog lookups are cached per table with a
+TTL, so the cache never holds the whole catalog; the stored metadata,
+kept in step by CatalogSync, does.
+"""
+
+import bisect
+import logging
+import math
+import threading
+from typing import Any, Dict, Iterable, Iterator, List, NamedTuple, Optional, Set, Tuple
+
+from ..catalog.snapshot import normalize_identifier
+from ..storage.table_metadata import TableMetadataStorage, get_table_metadata_storage
+
+logger = logging.getLogger(__name__)
+
+# Prefix candidates examined before ranking; bounds the cost of one-letter queries
+MAX_PREFIX_SCAN = 1000
+# Bitmaps of trigram postings holding at least 1/BITMAP_DENSITY of the name
+# ids, and so no larger than their id sets, are kept between searches; the
+# others are built per search. Names are at most 128 characters long, so the
+# bitmaps of all lengths are kept.
+BITMAP_DENSITY = 256
+# Trigram similarity thresholds tried in turn; weaker fuzzy matches are only
+# looked for when no name reaches a stronger threshold
+FUZZY_THRESHOLDS = (0.6, 0.45, 0.3)
+
+MATCH_EXACT = "exact"
+MATCH_PREFIX = "prefix"
+MATCH_FUZZY = "fuzzy"
+
+KIND_TABLE = "table"
+KIND_COLUMN = "column"
+
+TableKey = Tuple[Optional[str], str]
+
+
+class NameRef(NamedTuple):
+    """A table (``column_name`` None) or column carrying an indexed name."""
+
+    schema_name: Optional[str]
+    table_name: str
+    column_name: Optional[str]
+
+
+class NameMatch(NamedTuple):
+    """One search result."""
+
+    schema_name: Optional[str]
+    table_name: str
+    column_name: Optional[str]
+    score: float
+    match: str
+
+
+def trigrams(name: str) -> Set[str]:
+    """Trigrams of a lower-cased name padded like pg_trgm (two blanks before, one after)."""
+    padded = f"  {name} "
+    return {padded[i:i + 3] for i in range(len(padded) - 2)}
+
+
+class NameIndex:
+    """Prefix and trigram search over the names of stored tables and their columns."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        # Lower-cased name -> tables and columns carrying it
+        self._refs: Dict[str, Set[NameRef]] = {}
+        # Table -> its refs, so a table can be replaced or removed
+        self._tables: Dict[TableKey, List[Tuple[str, NameRef]]] = {}
+        # Name ids; freed ids are reused so bitmaps stay as short as possible
+        self._ids: Dict[str, int] = {}
+        self._names: List[Optional[str]] = []
+        self._free_ids: List[int] = []
+        # Trigram and name length -> ids of the names having it
+        self._trigrams: Dict[str, Set[int]] = {}
+        self._lengths: Dict[int, Set[int]] = {}
+        # Bitmaps of the kept postings, built on first search and kept up to date
+        self._trigram_bitmaps: Dict[str, int] = {}
+        self._length_bitmaps: Dict[int, int] = {}
+        # Sorted lengths and the bitmaps of the names up to each; built on search
+        self._up_to_lengths: Optional[Tuple[List[int], List[int]]] = None
+        # Refs of a name in result order, overall and per schema; built on first search
+        self._ordered: Dict[str, Tuple[List[NameRef], Dict[str, List[NameRef]]]] = {}
+        self._sorted: List[str] = []
+        self._sorted_stale = False
+        # Latest change per table while from_storage scans; None once it is done
+        self._pending: Optional[Dict[TableKey, Any]] = None
+
+    @classmethod
+    def from_storage(cls, storage: TableMetadataStorage) -> "NameIndex":
+        """Index every stored table and follow later changes to ``storage``."""
+        index = cls()
+        # Subscribe first so changes made while the index is built are not
+        # missed. They are held back until the scan is done, as the scan may
+        # still read an older copy of a changed table.
+        index._pending = {}
+        storage.add_change_listener(index.on_change)
+        storage.flush()
+        count = 0
+        for data in storage.backend.iter_tables():
+            index.add_table(
+                data["table_name"],
+                data.get("schema_name"),
+                [field["name"] for field in data.get("fields") or ()],
+            )
+            count += 1
+        index._apply_pending()
+        logger.info(f"Indexed names of {count} tables")
+        return index
+
+    def add_table(self, table_name: str, schema_name: Optional[str], columns: Iterable[str]) -> None:
+        """Index a table and its columns, replacing what was indexed for it before."""
+        entries = [(table_name.lower(), NameRef(schema_name, table_name, None))]
+        entries.extend((column.lower(), NameRef(schema_name, table_name, column)) for column in columns)
+        with self._lock:
+            self._remove((schema_name, table_name))
+            self._tables[(schema_name, table_name)] = entries
+            for name, ref in entries:
+                refs = self._refs.get(name)
+                if refs is None:
+                    refs = self._refs[name] = set()
+                    self._add_name(name)
+                    self._sorted_stale = True
+                refs.add(ref)
+                self._ordered.pop(name, None)
+
+    def remove_table(self, table_name: str, schema_name: Optional[str] = None) -> None:
+        """Drop a table and its columns from the index."""
+        with self._lock:
+            self._remove((schema_name, table_name))
+
+    def on_change(self, table_name: str, schema_name: Optional[str], metadata: Any) -> None:
+        """TableMetadataStorage change listener."""
+        with self._lock:
+            if self._pending is not None:
+                self._pending[(schema_name, table_name)] = metadata
+                return
+        self._apply_change(table_name, schema_name, metadata)
+
+    def _apply_change(self, table_name: str, schema_name: Optional[str], metadata: Any) -> None:
+        if metadata is None:
+            self.remove_table(table_name, schema_name)
+        else:
+            self.add_table(table_name, schema_name, [field.name for field in metadata.fields])
+
+    def _apply_pending(self) -> None:
+        """Apply the changes held back during the initial scan, then stop holding them."""
+        while True:
+            with self._lock:
+                if not self._pending:
+                    self._pending = None
+                    return
+                (schema_name, table_name), metadata = self._pending.popitem()
+            # A change arriving meanwhile is held back again, so it is applied after this one
+            self._apply_change(table_name, schema_name, metadata)
+
+    def search(self, query: str, limit: int = 10, schema_name: Optional[str] = None,
+               kind: Optional[str] = None) -> List[NameMatch]:
+        """Return the best ``limit`` tables and columns named like ``query``.
+
+        Fuzzy matches are only looked for when exact and prefix matches do
+        not fill ``limit``.
+
+        Args:
+            query: Name or part of a name; ``SCHEMA.NAME`` also filters by schema
+            limit: Maximum number of matches
+            schema_name: Only tables of this schema, folded to upper case
+                unless double-quoted
+            kind: ``table`` or ``column`` to return only that kind
+
+        Returns:
+            Matches, best first
+        """
+        query = query.strip()
+        if "." in query:
+            schema_part, query = query.rsplit(".", 1)
+            schema_name = schema_name or schema_part
+        query = query.lower()
+        if not query or limit <= 0:
+            return []
+        schema_filter = normalize_identifier(schema_name) if schema_name else None
+
+        with self._lock:
+            if self._sorted_stale:
+                self._sorted = sorted(self._refs)
+                self._sorted_stale = False
+            matches: List[NameMatch] = []
+            self._collect(matches, self._exact_and_prefix(query), limit, schema_filter, kind)
+            if len(matches) >= limit:
+                return matches
+            query_grams = trigrams(query)
+            shared = self._count_shared(query_grams)
+            for threshold in FUZZY_THRESHOLDS:
+                found = len(matches)
+                self._collect(matches, self._fuzzy(query, len(query_grams), shared, threshold), limit,
+                              schema_filter, kind)
+                if len(matches) > found:
+                    # Weaker fuzzy matches would only add noise
+                    break
+        return matches
+
+    def __len__(self) -> int:
+        with self._lock:
+            return len(self._tables)
+
+    def _exact_and_prefix(self, query: str) -> Iterator[Tuple[str, float, str]]:
+        if query in self._refs:
+            yield query, 1.0, MATCH_EXACT
+        start = bisect.bisect_left(self._sorted, query)
+        # The prefix range ends before the first name past every completion
+        end = bisect.bisect_left(self._sorted, query + "\uffff", start, min(start + MAX_PREFIX_SCAN, len(self._sorted)))
+        # Shorter completions rank higher; the sort is stable, so ties stay alphabetical
+        for name in sorted(self._sorted[start:end], key=len):
+            if name != query:
+                yield name, 0.5 + 0.4 * len(query) / len(name), MATCH_PREFIX
+
+    def _fuzzy(self, query: str, size: int, shared: List[int],
+               threshold: float) -> Iterator[Tuple[str, float, str]]:
+        """Names reaching ``threshold``, given the bit-sliced counts of ``_count_shared``."""
+        scored = []
+        for count in range(max(1, math.ceil(threshold * size)), size + 1):
+            # A name of length n has n + 1 trigrams, so count / (size + n + 1 - count)
+            # reaches the threshold only up to this length
+            longest = math.floor(count * (1 + threshold) / threshold + 1e-9) - size - 1
+            # Names up to that length sharing exactly ``count`` trigrams
+            found = self._up_to_length(longest)
+            for bit, counts in enumerate(shared):
+                if not found:
+                    break
+                found &= counts if count >> bit & 1 else ~counts
+            for name_id in _set_bits(found):
+                name = self._names[name_id]
+                similarity = count / (size + len(name) + 1 - count)
+                # Prefix completions were already returned
+                if similarity >= threshold and not name.startswith(query):
+                    # Below any prefix match
+                    scored.append((-0.5 * similarity, name))
+        for score, name in sorted(scored):
+            yield name, -score, MATCH_FUZZY
+
+    def _collect(self, matches: List[NameMatch], ranked: Iterable[Tuple[str, float, str]], limit: int,
+                 schema_filter: Optional[str], kind: Optional[str]) -> None:
+        """Append refs of the ranked names until ``limit``; the caller holds the lock."""
+        for name, score, match in ranked:
+            for ref in self._ordered_refs(name, schema_filter):
+                if kind is not None and (kind == KIND_TABLE) != (ref.column_name is None):
+                    continue
+                matches.append(NameMatch(ref.schema_name, ref.table_name, ref.column_name, round(score, 4), match))
+                if len(matches) >= limit:
+                    return
+
+    def _ordered_refs(self, name: str, schema_filter: Optional[str]) -> List[NameRef]:
+        """Refs of a name in result order, optionally of one schema only."""
+        ordered = self._ordered.get(name)
+        if ordered is None:
+            # Tables before columns, then alphabetical
+            refs = sorted(self._refs[name], key=_ref_order)
+            by_schema: Dict[str, List[NameRef]] = {}
+            for ref in refs:
+                by_schema.setdefault(ref.schema_name or "", []).append(ref)
+            ordered = self._ordered[name] = (refs, by_schema)
+        refs, by_schema = ordered
+        return refs if schema_filter is None else by_schema.get(schema_filter, [])
+
+    def _count_shared(self, query_grams: Set[str]) -> List[int]:
+        """Count the query trigrams of every name at once, as bit-sliced counters.
+
+        Bit i of element b is bit b of the count of name i. Each posting is
+        added with a ripple carry over the whole bitmaps, so the cost is a
+        few big-integer operations per query trigram.
+        """
+        counts = [0] * len(query_grams).bit_length()
+        for gram in query_grams:
+            carry = self._bitmap(self._trigrams, self._trigram_bitmaps, gram)
+            for bit, bits in enumerate(counts):
+                if not carry:
+                    break
+                counts[bit] = bits ^ carry
+                carry &= bits
+        return counts
+
+    def _up_to_length(self, longest: int) -> int:
+        """Bitmap of the names no longer than ``longest``."""
+        if self._up_to_lengths is None:
+            lengths = sorted(self._lengths)
+            bitmaps = []
+            bitmap = 0
+            for length in lengths:
+                bitmap |= self._bitmap(self._lengths, self._length_bitmaps, length, keep=True)
+                bitmaps.append(bitmap)
+            self._up_to_lengths = (lengths, bitmaps)
+        lengths, bitmaps = self._up_to_lengths
+        position = bisect.bisect_right(lengths, longest)
+        return bitmaps[position - 1] if position else 0
+
+    def _bitmap(self, postings: Dict[Any, Set[int]], bitmaps: Dict[Any, int], key: Any,
+                keep: bool = False) -> int:
+        """Bitmap of the ids in ``postings[key]``, kept in ``bitmaps`` when dense or ``keep``."""
+        bitmap = bitmaps.get(key)
+        if bitmap is None:
+            ids = postings.get(key)
+            if not ids:
+                return 0
+            packed = bytearray(len(self._names) // 8 + 1)
+            for name_id in ids:
+                packed[name_id >> 3] |= 1 << (name_id & 7)
+            bitmap = int.from_bytes(packed, "little")
+            if keep or len(ids) * BITMAP_DENSITY >= len(self._names):
+                bitmaps[key] = bitmap
+        return bitmap
+
+    def _add_name(self, name: str) -> None:
+        name_id = self._free_ids.pop() if self._free_ids else len(self._names)
+        if name_id == len(self._names):
+            self._names.append(name)
+        else:
+            self._names[name_id] = name
+        self._ids[name] = name_id
+        self._up_to_lengths = None
+        bit = 1 << name_id
+        for postings, bitmaps, key in self._postings_of(name):
+            postings.setdefault(key, set()).add(name_id)
+            if key in bitmaps:
+                bitmaps[key] |= bit
+
+    def _remove_name(self, name: str) -> None:
+        name_id = self._ids.pop(name)
+        self._names[name_id] = None
+        self._free_ids.append(name_id)
+        self._up_to_lengths = None
+        bit = 1 << name_id
+        for postings, bitmaps, key in self._postings_of(name):
+            ids = postings[key]
+            ids.discard(name_id)
+            if not ids:
+                del postings[key]
+                bitmaps.pop(key, None)
+            elif key in bitmaps:
+                bitmaps[key] &= ~bit
+
+    def _postings_of(self, name: str) -> Iterator[Tuple[Dict[Any, Set[int]], Dict[Any, int], Any]]:
+        for gram in trigrams(name):
+            yield self._trigrams, self._trigram_bitmaps, gram
+        yield self._lengths, self._length_bitmaps, len(name)
+
+    def _remove(self, key: TableKey) -> None:
+        for name, ref in self._tables.pop(key, ()):
+            refs = self._refs.get(name)
+            if refs is None:
+                continue
+            refs.discard(ref)
+            self._ordered.pop(name, None)
+            if not refs:
+                del self._refs[name]
+                self._remove_name(name)
+                self._sorted_stale = True
+
+
+def _set_bits(bitmap: int) -> Iterator[int]:
+    """Positions of the set bits of a non-negative int, lowest first."""
+    if not bitmap:
+        return
+    # Reversed binary digits without the "0b", so string index == bit position
+    digits = bin(bitmap)[:1:-1]
+    position = digits.find("1")
+    while position >= 0:
+        yield position
+        position = digits.find("1", position + 1)
+
+
+def _ref_order(ref: NameRef) -> Tuple[bool, str, str, str]:
+    return ref.column_name is not None, ref.schema_name or "", ref.table_name, ref.column_name or ""
+
+
+_name_index: Optional[NameIndex] = None
+_name_index_lock = threading.Lock()
+
+
+def get_name_index() -> NameIndex:
+    """Return the index over the global table metadata storage, building it on first use."""
+    global _name_index
+    with _name_index_lock:
+        if _name_index is None:
+            _name_index = NameIndex.from_storage(get_table_metadata_storage())
+        return _name_index
+
+
+def name_index_built() -> bool:
+    """Whether ``get_name_index`` would return without reading storage."""
+    return _name_index is not None
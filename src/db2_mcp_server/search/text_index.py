@@ -0,0 +1,251 @@
+"""Inverted full-text index over the human-written text of stored table metadata.
+
+TextIndex turns each table into one document made of its description,
+business purpose, and the descriptions and business context of its
+fields. Documents are tokenized into lower-case words with plural ``s``
+stripped and stop words dropped, and kept in per-term postings. Queries
+are ranked with Okapi BM25. A TableMetadataStorage change listener
+re-indexes one table per store or delete, so the index never needs a
+rebuild.
+
+Query terms are scored rarest first, as in MaxScore. A term adds less
+than ``idf * (k1 + 1)`` to any table. Once the terms left cannot lift a
+new table above the current ``limit``-th score, only tables already found
+are scored further. The top matches are the same as with a full scan.
+"""
+
+import heapq
+import logging
+import math
+import re
+import threading
+from collections import Counter
+from typing import Any, Dict, List, NamedTuple, Optional, Set, Tuple
+
+from ..catalog.snapshot import normalize_identifier
+from ..storage.table_metadata import TableMetadataStorage, get_table_metadata_storage
+
+logger = logging.getLogger(__name__)
+
+# BM25 term frequency saturation and length normalization
+BM25_K1 = 1.2
+BM25_B = 0.75
+STOP_WORDS = frozenset(
+    "a an and are as at be by for from has have in is it of on or that the this "
+    "to was were which who with what where when".split()
+)
+_WORD = re.compile(r"[a-z0-9]+")
+
+TableKey = Tuple[Optional[str], str]
+
+
+class TextMatch(NamedTuple):
+    """One search result."""
+
+    schema_name: Optional[str]
+    table_name: str
+    score: float
+    matched_fields: List[str]
+    description: Optional[str]
+
+
+def tokenize(text: Optional[str]) -> List[str]:
+    """Lower-case words of ``text`` without stop words, plurals folded to the singular."""
+    if not text:
+        return []
+    tokens = []
+    for word in _WORD.findall(text.lower()):
+        if word in STOP_WORDS:
+            continue
+        if len(word) > 3 and word.endswith("s") and not word.endswith("ss"):
+            word = word[:-1]
+        tokens.append(word)
+    return tokens
+
+
+def _value(obj: Any, key: str) -> Any:
+    return obj.get(key) if isinstance(obj, dict) else getattr(obj, key, None)
+
+
+class _Document(NamedTuple):
+    terms: Counter
+    length: int
+    # Field name -> terms of its description and business context
+    field_terms: Dict[str, Set[str]]
+    description: Optional[str]
+
+
+def _document(metadata: Any) -> _Document:
+    """Build the document of a TableMetadata or its dictionary form."""
+    terms = Counter(tokenize(_value(metadata, "description")))
+    terms.update(tokenize(_value(metadata, "business_purpose")))
+    field_terms: Dict[str, Set[str]] = {}
+    for field in _value(metadata, "fields") or ():
+        tokens = tokenize(_value(field, "description")) + tokenize(_value(field, "business_context"))
+        if tokens:
+            terms.update(tokens)
+            field_terms[_value(field, "name")] = set(tokens)
+    description = _value(metadata, "description") or _value(metadata, "business_purpose")
+    return _Document(terms, sum(terms.values()), field_terms, description)
+
+
+class TextIndex:
+    """BM25-ranked search over table and field descriptions."""
+
+    def __init__(self, k1: float = BM25_K1, b: float = BM25_B):
+        self.k1 = k1
+        self.b = b
+        self._lock = threading.Lock()
+        self._documents: Dict[TableKey, _Document] = {}
+        # Term -> table -> term frequency
+        self._postings: Dict[str, Dict[TableKey, int]] = {}
+        self._total_length = 0
+        # Latest change per table while from_storage scans; None once it is done
+        self._pending: Optional[Dict[TableKey, Any]] = None
+
+    @classmethod
+    def from_storage(cls, storage: TableMetadataStorage) -> "TextIndex":
+        """Index every stored table and follow later changes to ``storage``."""
+        index = cls()
+        # Subscribe first so changes made while the index is built are not
+        # missed. They are held back until the scan is done, as the scan may
+        # still read an older copy of a changed table.
+        index._pending = {}
+        storage.add_change_listener(index.on_change)
+        storage.flush()
+        count = 0
+        for data in storage.backend.iter_tables():
+            index.add_table(data)
+            count += 1
+        index._apply_pending()
+        logger.info(f"Indexed descriptions of {count} tables")
+        return index
+
+    def add_table(self, metadata: Any) -> None:
+        """Index a TableMetadata (or its dictionary), replacing its previous document."""
+        key = (_value(metadata, "schema_name"), _value(metadata, "table_name"))
+        document = _document(metadata)
+        with self._lock:
+            self._remove(key)
+            if not document.length:
+                return
+            self._documents[key] = document
+            self._total_length += document.length
+            for term, frequency in document.terms.items():
+                self._postings.setdefault(term, {})[key] = frequency
+
+    def remove_table(self, table_name: str, schema_name: Optional[str] = None) -> None:
+        """Drop a table's document from the index."""
+        with self._lock:
+            self._remove((schema_name, table_name))
+
+    def on_change(self, table_name: str, schema_name: Optional[str], metadata: Any) -> None:
+        """TableMetadataStorage change listener."""
+        with self._lock:
+            if self._pending is not None:
+                self._pending[(schema_name, table_name)] = metadata
+                return
+        self._apply_change(table_name, schema_name, metadata)
+
+    def _apply_change(self, table_name: str, schema_name: Optional[str], metadata: Any) -> None:
+        if metadata is None:
+            self.remove_table(table_name, schema_name)
+        else:
+            self.add_table(metadata)
+
+    def _apply_pending(self) -> None:
+        """Apply the changes held back during the initial scan, then stop holding them."""
+        while True:
+            with self._lock:
+                if not self._pending:
+                    self._pending = None
+                    return
+                (schema_name, table_name), metadata = self._pending.popitem()
+            # A change arriving meanwhile is held back again, so it is applied after this one
+            self._apply_change(table_name, schema_name, metadata)
+
+    def search(self, query: str, limit: int = 10, schema_name: Optional[str] = None) -> List[TextMatch]:
+        """Return the ``limit`` tables whose text best matches ``query``.
+
+        Args:
+            query: Free text
+            limit: Maximum number of matches
+            schema_name: Only tables of this schema, folded to upper case
+                unless double-quoted
+
+        Returns:
+            Matches, best first, with the fields whose text contains a query word
+        """
+        terms = set(tokenize(query))
+        if not terms or limit <= 0:
+            return []
+        schema_filter = normalize_identifier(schema_name) if schema_name else None
+
+        with self._lock:
+            count = len(self._documents)
+            if not count:
+                return []
+            average_length = self._total_length / count
+            # Rarest terms first; they carry most of the score
+            by_rarity = sorted(filter(None, map(self._postings.get, terms)), key=len)
+            idfs = [math.log(1 + (count - len(postings) + 0.5) / (len(postings) + 0.5)) for postings in by_rarity]
+            # Highest score the terms not scored yet can add to one table
+            remaining = sum(idfs) * (self.k1 + 1)
+            scores: Dict[TableKey, float] = {}
+            complete = False
+            for postings, idf in zip(by_rarity, idfs):
+                if not complete and len(scores) >= limit:
+                    # Tables not found yet can no longer reach the top ``limit``
+                    complete = remaining < heapq.nlargest(limit, scores.values())[-1]
+                remaining -= idf * (self.k1 + 1)
+                if complete:
+                    candidates = [(key, postings[key]) for key in scores if key in postings]
+                else:
+                    candidates = postings.items()
+                for key, frequency in candidates:
+                    if schema_filter is not None and (key[0] or "") != schema_filter:
+                        continue
+                    norm = self.k1 * (1 - self.b + self.b * self._documents[key].length / average_length)
+                    scores[key] = scores.get(key, 0.0) + idf * frequency * (self.k1 + 1) / (frequency + norm)
+
+            best = heapq.nlargest(limit, scores.items(), key=lambda item: item[1])
+            matches = []
+            for (schema, table), score in best:
+                document = self._documents[(schema, table)]
+                fields = sorted(name for name, field_terms in document.field_terms.items() if field_terms & terms)
+                matches.append(TextMatch(schema, table, round(score, 4), fields, document.description))
+        return matches
+
+    def __len__(self) -> int:
+        with self._lock:
+            return len(self._documents)
+
+    def _remove(self, key: TableKey) -> None:
+        document = self._documents.pop(key, None)
+        if document is None:
+            return
+        self._total_length -= document.length
+        for term in document.terms:
+            postings = self._postings.get(term)
+            if postings is not None:
+                postings.pop(key, None)
+                if not postings:
+                    del self._postings[term]
+
+
+_text_index: Optional[TextIndex] = None
+_text_index_lock = threading.Lock()
+
+
+def get_text_index() -> TextIndex:
+    """Return the index over the global table metadata storage, building it on first use."""
+    global _text_index
+    with _text_index_lock:
+        if _text_index is None:
+            _text_index = TextIndex.from_storage(get_table_metadata_storage())
+        return _text_index
+
+
+def text_index_built() -> bool:
+    """Whether ``get_text_index`` would return without reading storage."""
+    return _text_index is not None
@@ -0,0 +1,278 @@
+"""Cache server shared by every MCP worker process on a host.
+
+When several ``db2-mcp-server-stream-http`` processes run behind a load
+balancer, each one otherwise keeps its own CacheManager: N copies of the
+catalog cache and N cold misses per key. ``db2-mcp-cache-server`` runs one
+CacheManager in a separate process, and each worker uses a
+SharedCacheClient as the second-level backend of its in-memory cache.
+
+Workers talk to the server over ``multiprocessing.connection`` on a local
+TCP port or a Unix socket. Both sides authenticate with the shared secret
+in ``CACHE_SHARED_AUTHKEY``, because messages are pickled. Values are
+pickled on the client, so the server stores opaque bytes and never imports
+tool modules.
+
+Worker L1 caches are not notified when another worker deletes or
+invalidates a key, so entries there can lag the shared cache by up to
+their TTL.
+"""
+
+import argparse
+import logging
+import os
+import pickle
+import threading
+import time
+from multiprocessing import AuthenticationError
+from multiprocessing.connection import Client, Connection, Listener
+from typing import Any, Iterable, List, Optional, Tuple, Union
+
+from .cache_backend import BackendEntry, CacheBackend
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_SHARED_ADDRESS = os.getenv("CACHE_SHARED_ADDRESS", "127.0.0.1:37211")
+DEFAULT_SHARED_TIMEOUT = float(os.getenv("CACHE_SHARED_TIMEOUT", "1"))
+# Seconds a client stops calling an unreachable server before retrying
+DEFAULT_RETRY_INTERVAL = float(os.getenv("CACHE_SHARED_RETRY_INTERVAL", "5"))
+
+Address = Union[str, Tuple[str, int]]
+
+
+def parse_address(address: str) -> Address:
+  """Parse ``host:port`` into a TCP address; anything else is a Unix socket path."""
+  host, sep, port = address.rpartition(":")
+  if sep and port.isdigit():
+    return host or "127.0.0.1", int(port)
+  return address
+
+
+def _authkey_from_env() -> Optional[bytes]:
+  authkey = os.getenv("CACHE_SHARED_AUTHKEY", "")
+  return authkey.encode() if authkey else None
+
+
+class SharedCacheServer:
+  """Serves one CacheManager to SharedCacheClients, one thread per client."""
+
+  def __init__(self, address: Address, authkey: bytes, cache_manager: Optional[Any] = None):
+    """Start listening.
+
+    Args:
+        address: ``(host, port)`` tuple or Unix socket path
+        authkey: Shared secret clients must present
+        cache_manager: Store for the cached bytes (a new CacheManager by default)
+    """
+    if not authkey:
+      raise ValueError("An authkey is required for the shared cache server")
+    if cache_manager is None:
+      from .cache import CacheManager
+      cache_manager = CacheManager()
+    self.cache = cache_manager
+    self._listener = Listener(address, authkey=authkey)
+    self._closed = threading.Event()
+    self._thread: Optional[threading.Thread] = None
+
+  @property
+  def address(self) -> Address:
+    return self._listener.address
+
+  def serve_forever(self) -> None:
+    """Accept clients until ``close`` is called."""
+    logger.info(f"Shared cache server listening on {self.address}")
+    while not self._closed.is_set():
+      try:
+        conn = self._listener.accept()
+      except AuthenticationError:
+        logger.warning("Rejected shared cache client with a wrong authkey")
+        continue
+      except OSError:
+        if self._closed.is_set():
+          return
+        raise
+      threading.Thread(target=self._handle, args=(conn,), name="shared-cache-client", daemon=True).start()
+
+  def start(self) -> None:
+    """Serve from a background daemon thread."""
+    self._thread = threading.Thread(target=self.serve_forever, name="shared-cache-server", daemon=True)
+    self._thread.start()
+
+  def close(self) -> None:
+    """Stop accepting clients."""
+    self._closed.set()
+    self._listener.close()
+
+  def _handle(self, conn: Connection) -> None:
+    with conn:
+      while True:
+        try:
+          op, args = conn.recv()
+        except (EOFError, OSError):
+          return
+        try:
+          conn.send(("ok", self._dispatch(op, args)))
+        except Exception as e:
+          logger.warning(f"Shared cache request {op} failed: {e}")
+          try:
+            conn.send(("error", str(e)))
+          except OSError:
+            return
+
+  def _dispatch(self, op: str, args: tuple) -> Any:
+    if op == "get":
+      entry = self.cache.get_entry(*args)
+      return tuple(entry) if entry is not None else None
+    if op == "set":
+      key, blob, ttl, soft_ttl, tags = args
+      return self.cache.set(key, blob, ttl, soft_ttl, tags)
+    if op == "delete":
+      return self.cache.delete(*args)
+    if op == "invalidate_tag":
+      return self.cache.invalidate_tag(*args)
+    if op == "clear":
+      return self.cache.clear()
+    if op == "stats":
+      return self.cache.stats()
+    raise ValueError(f"Unknown shared cache operation '{op}'")
+
+
+class SharedCacheClient(CacheBackend):
+  """CacheBackend talking to a SharedCacheServer.
+
+  Keeps a small pool of connections so concurrent threads do not serialize
+  on one socket. If the server is unreachable or slow, calls behave like
+  misses and the server is not contacted again for ``retry_interval`` seconds.
+  """
+
+  def __init__(
+    self,
+    address: Address,
+    authkey: bytes,
+    timeout: float = DEFAULT_SHARED_TIMEOUT,
+    retry_interval: float = DEFAULT_RETRY_INTERVAL,
+  ):
+    """Initialize the client; connections are opened on first use.
+
+    Args:
+        address: Server ``(host, port)`` tuple or Unix socket path
+        authkey: Shared secret of the server
+        timeout: Seconds to wait for each response
+        retry_interval: Seconds to back off after a failed call
+    """
+    self.address = address
+    self.timeout = timeout
+    self.retry_interval = retry_interval
+    self._authkey = authkey
+    self._idle: List[Connection] = []
+    self._lock = threading.Lock()
+    self._down_until = 0.0
+
+  @classmethod
+  def from_env(cls) -> Optional["SharedCacheClient"]:
+    """Create a client for ``CACHE_SHARED_ADDRESS``, or None without an authkey."""
+    authkey = _authkey_from_env()
+    if authkey is None:
+      logger.warning("CACHE_BACKEND is shared but CACHE_SHARED_AUTHKEY is not set")
+      return None
+    return cls(parse_address(DEFAULT_SHARED_ADDRESS), authkey)
+
+  def get(self, key: str) -> Optional[BackendEntry]:
+    result = self._call("get", key)
+    if result is None:
+      return None
+    blob, ttl, soft_ttl, tags = result
+    try:
+      return BackendEntry(pickle.loads(blob), ttl, soft_ttl, tags)
+    except Exception as e:
+      logger.warning(f"Shared cache value for {key} could not be decoded: {e}")
+      return None
+
+  def set(self, key: str, value: Any, ttl: float, soft_ttl: float, tags: Iterable[str] = ()) -> bool:
+    try:
+      blob = pickle.dumps(value, protocol=pickle.HIGHEST_PROTOCOL)
+    except Exception as e:
+      logger.debug(f"Not sharing {key}: {e}")
+      return False
+    return bool(self._call("set", key, blob, ttl, soft_ttl, sorted(tags), default=False))
+
+  def delete(self, key: str) -> bool:
+    return bool(self._call("delete", key, default=False))
+
+  def invalidate_tag(self, tag: str) -> int:
+    return self._call("invalidate_tag", tag, default=0)
+
+  def clear(self) -> None:
+    self._call("clear")
+
+  def server_stats(self) -> Optional[dict]:
+    """Return the server cache's ``stats()``, or None if unreachable."""
+    return self._call("stats")
+
+  def close(self) -> None:
+    with self._lock:
+      idle, self._idle = self._idle, []
+    for conn in idle:
+      conn.close()
+
+  def _call(self, op: str, *args: Any, default: Any = None) -> Any:
+    if time.monotonic() < self._down_until:
+      return default
+    conn = None
+    try:
+      conn = self._checkout()
+      conn.send((op, args))
+      if not conn.poll(self.timeout):
+        raise TimeoutError(f"no response within {self.timeout}s")
+      status, result = conn.recv()
+    except (OSError, EOFError, AuthenticationError) as e:
+      # TimeoutError is an OSError; the connection state is unknown, drop it
+      if conn is not None:
+        conn.close()
+      self._down_until = time.monotonic() + self.retry_interval
+      logger.warning(f"Shared cache at {self.address} unavailable for {op}: {e}")
+      return default
+    self._checkin(conn)
+    if status != "ok":
+      logger.warning(f"Shared cache {op} failed: {result}")
+      return default
+    return result
+
+  def _checkout(self) -> Connection:
+    with self._lock:
+      if self._idle:
+        return self._idle.pop()
+    return Client(self.address, authkey=self._authkey)
+
+  def _checkin(self, conn: Connection) -> None:
+    with self._lock:
+      self._idle.append(conn)
+
+
+def main() -> None:
+  """Entry point for ``db2-mcp-cache-server``."""
+  from dotenv import load_dotenv
+
+  from .logger import setup_logging
+
+  load_dotenv()
+  setup_logging()
+  parser = argparse.ArgumentParser(description="Shared catalog cache for DB2 MCP Server workers")
+  parser.add_argument(
+    "--address",
+    default=DEFAULT_SHARED_ADDRESS,
+    help="host:port or Unix socket path to listen on (default: CACHE_SHARED_ADDRESS)",
+  )
+  args = parser.parse_args()
+
+  authkey = _authkey_from_env()
+  if authkey is None:
+    parser.error("CACHE_SHARED_AUTHKEY must be set")
+  server = SharedCacheServer(parse_address(args.address), authkey)
+  try:
+    server.serve_forever()
+  except KeyboardInterrupt:
+    server.close()
+
+
+if __name__ == "__main__":
+  main()
@@ -6,20 +6,38 @@ This module provides storage and caching functionality for the DB2 MCP server,
 including table metadata storage for the data explainer prompt.
 """
 
+from .backends import (
+    JsonFileBackend,
+    MetadataBackend,
+    SQLiteMetadataBackend,
+    atomic_write,
+    create_metadata_backend
+)
 from .table_metadata import (
     FieldInfo,
+    FrozenFieldInfo,
+    FrozenTableMetadata,
     TableMetadata,
     TableMetadataStorage,
     get_table_metadata_storage,
     parse_field_descriptions,
     extract_table_name_from_context
 )
+from .write_behind import WriteBehindQueue
 
 __all__ = [
+    'JsonFileBackend',
+    'MetadataBackend',
+    'SQLiteMetadataBackend',
+    'atomic_write',
+    'create_metadata_backend',
     'FieldInfo',
+    'FrozenFieldInfo',
+    'FrozenTableMetadata',
     'TableMetadata', 
     'TableMetadataStorage',
     'get_table_metadata_storage',
     'parse_field_descriptions',
-    'extract_table_name_from_context'
+    'extract_table_name_from_context',
+    'WriteBehindQueue'
 ]
\ No newline at end of file
@@ -0,0 +1,771 @@
+#!/usr/bin/env python3
+"""
+Persistence backends for TableMetadataStorage
+
+The ``json`` backend keeps one JSON file per table, plus a small manifest of
+(schema, table, mtime, size, content hash) per file so listing tables does
+not parse every file. Field description updates are appended to a per-table
+journal and compacted into the JSON file periodically. The ``sqlite``
+backend keeps every table in one SQLite database (WAL mode) with tables for
+table metadata, fields and relationships. Listing, schema filtering and
+lookups then become indexed queries instead of reading every file. When the
+SQLite backend opens a directory that still holds JSON files, it migrates
+them automatically.
+
+Backends exchange plain metadata dictionaries (``TableMetadata.model_dump()``)
+so they stay independent of the pydantic models.
+"""
+
+import hashlib
+import json
+import logging
+import os
+import secrets
+import shutil
+import sqlite3
+import threading
+import time
+from abc import ABC, abstractmethod
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Tuple, Union
+
+logger = logging.getLogger(__name__)
+
+# Persistence backend used when none is passed explicitly: json or sqlite
+DEFAULT_METADATA_BACKEND = os.getenv("TABLE_METADATA_BACKEND", "json")
+
+SQLITE_FILENAME = "table_metadata.db"
+MIGRATED_JSON_DIR = "migrated_json"
+# Hidden and without a .json suffix so it is never mistaken for table metadata
+MANIFEST_FILENAME = ".manifest"
+MANIFEST_VERSION = 1
+JOURNAL_SUFFIX = ".journal"
+# Key of a JSON snapshot, and of each journaled patch, naming the snapshot
+# generation the patches apply to
+GENERATION_KEY = "_generation"
+# Directory timestamps closer than this to the present are not trusted to
+# change again on the next write, since file systems store them coarsely
+DIR_MTIME_GRANULARITY_NS = 1_000_000_000
+# Field patches appended to a table's journal before it is compacted
+DEFAULT_JOURNAL_COMPACT_THRESHOLD = int(os.getenv("TABLE_METADATA_JOURNAL_COMPACT", "100"))
+
+# Columns stored in the tables table; list fields go to the ``extra`` JSON column
+_TABLE_COLUMNS = (
+    "table_type",
+    "description",
+    "row_count",
+    "created_date",
+    "last_updated",
+    "business_purpose",
+    "metadata_version",
+)
+_LIST_COLUMNS = ("indexes", "data_quality_notes", "sample_queries")
+_FIELD_COLUMNS = (
+    "name",
+    "data_type",
+    "description",
+    "is_nullable",
+    "is_primary_key",
+    "is_foreign_key",
+    "foreign_table",
+    "max_length",
+    "default_value",
+    "business_context",
+)
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS tables (
+    schema_key TEXT NOT NULL,
+    table_name TEXT NOT NULL,
+    schema_name TEXT,
+    table_type TEXT,
+    description TEXT,
+    row_count INTEGER,
+    created_date TEXT,
+    last_updated TEXT,
+    business_purpose TEXT,
+    metadata_version TEXT,
+    extra TEXT NOT NULL,
+    PRIMARY KEY (schema_key, table_name)
+);
+CREATE INDEX IF NOT EXISTS tables_by_name ON tables (table_name);
+CREATE TABLE IF NOT EXISTS fields (
+    schema_key TEXT NOT NULL,
+    table_name TEXT NOT NULL,
+    position INTEGER NOT NULL,
+    name TEXT NOT NULL,
+    data_type TEXT,
+    description TEXT,
+    is_nullable INTEGER,
+    is_primary_key INTEGER,
+    is_foreign_key INTEGER,
+    foreign_table TEXT,
+    max_length INTEGER,
+    default_value TEXT,
+    constraints TEXT NOT NULL,
+    business_context TEXT,
+    PRIMARY KEY (schema_key, table_name, position),
+    FOREIGN KEY (schema_key, table_name) REFERENCES tables (schema_key, table_name) ON DELETE CASCADE
+);
+CREATE INDEX IF NOT EXISTS fields_by_name ON fields (name);
+CREATE TABLE IF NOT EXISTS relationships (
+    schema_key TEXT NOT NULL,
+    table_name TEXT NOT NULL,
+    name TEXT NOT NULL,
+    definition TEXT NOT NULL,
+    PRIMARY KEY (schema_key, table_name, name),
+    FOREIGN KEY (schema_key, table_name) REFERENCES tables (schema_key, table_name) ON DELETE CASCADE
+);
+"""
+
+
+def _to_text(value: Any) -> Optional[str]:
+    """Store datetimes and other scalars the way the JSON backend does."""
+    if value is None:
+        return None
+    return value.isoformat() if hasattr(value, "isoformat") else str(value)
+
+
+def _to_bool(value: Optional[int]) -> Optional[bool]:
+    return None if value is None else bool(value)
+
+
+def apply_field_patch(data: Dict[str, Any], patch: Dict[str, Any]) -> Dict[str, Any]:
+    """Apply a field description patch to a metadata dictionary in place.
+
+    A patch has ``name``, ``description``, ``business_context`` (kept as is
+    when empty) and ``last_updated``. Unknown fields are appended, so
+    applying a patch twice has the same effect as applying it once.
+    """
+    fields = data.setdefault("fields", [])
+    for field in fields:
+        if field.get("name") == patch["name"]:
+            field["description"] = patch["description"]
+            if patch.get("business_context"):
+                field["business_context"] = patch["business_context"]
+            break
+    else:
+        fields.append({
+            "name": patch["name"],
+            "description": patch["description"],
+            "business_context": patch.get("business_context"),
+        })
+    data["last_updated"] = patch["last_updated"]
+    return data
+
+
+def _as_datetime(value: Any) -> Optional[datetime]:
+    if value is None or isinstance(value, datetime):
+        return value
+    try:
+        return datetime.fromisoformat(str(value))
+    except ValueError:
+        return None
+
+
+def _replay_journal(data: Dict[str, Any], journal_path: Path) -> Dict[str, Any]:
+    """Apply the journal's patches written on top of the snapshot in ``data``.
+
+    Every snapshot gets a new generation and patches carry the generation
+    they were appended to, so patches already folded into a newer snapshot
+    are skipped when a crash left their journal behind. Wall-clock time
+    plays no part, so a clock stepping back cannot hide a patch. Patches
+    from before generations existed fall back to comparing ``last_updated``.
+    The generation is removed from ``data``.
+    """
+    generation = data.pop(GENERATION_KEY, None)
+    try:
+        with open(journal_path, 'r', encoding='utf-8') as f:
+            lines = f.readlines()
+    except FileNotFoundError:
+        return data
+    snapshot_time = _as_datetime(data.get("last_updated"))
+    for line in lines:
+        try:
+            patch = json.loads(line)
+        except ValueError:
+            # A torn final line from a crash during append
+            logger.warning(f"Skipping unreadable patch in {journal_path}")
+            continue
+        if GENERATION_KEY in patch:
+            if patch[GENERATION_KEY] != generation:
+                continue
+        else:
+            patch_time = _as_datetime(patch.get("last_updated"))
+            if snapshot_time is not None and patch_time is not None and patch_time <= snapshot_time:
+                continue
+        apply_field_patch(data, patch)
+    return data
+
+
+def _read_generation(file_path: Path) -> Optional[str]:
+    with open(file_path, 'r', encoding='utf-8') as f:
+        return json.load(f).get(GENERATION_KEY)
+
+
+def _fsync_directory(path: Path) -> None:
+    """Make a file created in ``path`` survive a power failure (POSIX only)."""
+    try:
+        fd = os.open(path, os.O_RDONLY)
+    except OSError:
+        return
+    try:
+        os.fsync(fd)
+    except OSError:
+        pass
+    finally:
+        os.close(fd)
+
+
+def atomic_write(path: Path, content: bytes, durable: bool = True) -> None:
+    """Write ``content`` to a temp file next to ``path`` and rename it over ``path``.
+
+    Readers see either the old or the new file, never a partial write.
+    ``durable`` fsyncs the data before the rename, so a crash cannot leave
+    an empty file behind.
+    """
+    # Unique per process and thread, and never matching *.json
+    tmp_path = path.with_name(f".{path.name}.{os.getpid()}.{threading.get_ident()}.tmp")
+    try:
+        with open(tmp_path, 'wb') as f:
+            f.write(content)
+            if durable:
+                f.flush()
+                os.fsync(f.fileno())
+        os.replace(tmp_path, path)
+    except BaseException:
+        try:
+            tmp_path.unlink()
+        except OSError:
+            pass
+        raise
+
+
+class MetadataBackend(ABC):
+    """Persistent store of table metadata dictionaries keyed by (schema, table)."""
+
+    @abstractmethod
+    def load(self, table_name: str, schema_name: Optional[str] = None) -> Optional[Dict[str, Any]]:
+        """Return the stored metadata for a table, or None."""
+
+    @abstractmethod
+    def save(self, data: Dict[str, Any]) -> None:
+        """Insert or replace the metadata of ``data['table_name']``."""
+
+    @abstractmethod
+    def delete(self, table_name: str, schema_name: Optional[str] = None) -> bool:
+        """Delete a table's metadata; returns False if nothing was stored."""
+
+    @abstractmethod
+    def list_tables(self, schema_name: Optional[str] = None) -> List[str]:
+        """Return sorted table names, optionally only those of one schema."""
+
+    def save_many(self, datas: Iterable[Dict[str, Any]]) -> None:
+        """Insert or replace several tables; backends override it to commit them together."""
+        for data in datas:
+            self.save(data)
+
+    def iter_tables(self) -> Iterator[Dict[str, Any]]:
+        """Yield every stored table's metadata, one table in memory at a time."""
+        raise NotImplementedError(f"{type(self).__name__} does not support streaming")
+
+    def append_field_patch(self, table_name: str, schema_name: Optional[str], patch: Dict[str, Any]) -> None:
+        """Persist one field description change (see ``apply_field_patch``).
+
+        The default rewrites the whole table; backends override it to write
+        only the patch.
+        """
+        data = self.load(table_name, schema_name) or {"table_name": table_name, "schema_name": schema_name}
+        self.save(apply_field_patch(data, patch))
+
+    def close(self) -> None:
+        """Release files or connections held by the backend."""
+
+
+class JsonFileBackend(MetadataBackend):
+    """One pretty-printed JSON file per table in a directory.
+
+    Field description patches are appended as JSON lines to
+    ``<file>.journal`` and fsynced, then replayed on load, so an update
+    writes one line instead of the whole table. Once a journal holds
+    ``compact_threshold`` patches, it is folded into the JSON file and
+    removed.
+
+    ``.manifest`` maps each file name to its schema, table, mtime, size and
+    SHA-256. It is rewritten atomically on save and delete. Listing answers
+    from the parsed manifest after a single ``stat`` of the directory. The
+    directory is only rescanned when its mtime moved since the last scan,
+    which happens whenever a file is created, replaced or removed, by this
+    backend or another process. A rescan re-indexes files whose mtime or
+    size no longer match the manifest and rebuilds a missing or unreadable
+    one. Files edited in place without a rename are picked up by the next
+    rescan or by ``rebuild_manifest``.
+    """
+
+    def __init__(self, storage_path: Union[str, Path], compact_threshold: int = DEFAULT_JOURNAL_COMPACT_THRESHOLD):
+        self.storage_path = Path(storage_path)
+        self.storage_path.mkdir(parents=True, exist_ok=True)
+        self.manifest_path = self.storage_path / MANIFEST_FILENAME
+        self.compact_threshold = compact_threshold
+        self._lock = threading.Lock()
+        # Patches per journal file name, counted on first append
+        self._journal_lengths: Dict[str, int] = {}
+        # Snapshot generation per JSON file name, recorded by writes only: a read
+        # is not serialized with saves and could record a superseded one
+        self._generations: Dict[str, Optional[str]] = {}
+        # Parsed manifest and the (mtime_ns, size) of the file it was read from
+        self._manifest_cache: Optional[Tuple[Tuple[int, int], Dict[str, Dict[str, Any]]]] = None
+        # Directory mtime at the last scan; None until a scan can be trusted
+        self._scanned_dir_mtime: Optional[int] = None
+
+    def load(self, table_name: str, schema_name: Optional[str] = None) -> Optional[Dict[str, Any]]:
+        file_path = self.file_path(table_name, schema_name)
+        if not file_path.exists():
+            return None
+        with open(file_path, 'r', encoding='utf-8') as f:
+            data = json.load(f)
+        return _replay_journal(data, file_path.with_suffix(JOURNAL_SUFFIX))
+
+    def save(self, data: Dict[str, Any]) -> None:
+        self.save_many([data])
+
+    def save_many(self, datas: Iterable[Dict[str, Any]]) -> None:
+        # One manifest rewrite for the whole batch
+        records = {}
+        for data in datas:
+            file_path = self.file_path(data["table_name"], data.get("schema_name"))
+            generation = secrets.token_hex(8)
+            content = json.dumps({**data, GENERATION_KEY: generation}, indent=2, default=str).encode('utf-8')
+            atomic_write(file_path, content)
+            with self._lock:
+                self._generations[file_path.name] = generation
+            # The snapshot supersedes every journaled patch
+            self._remove_journal(file_path)
+            records[file_path.name] = self._manifest_record(file_path, data, content)
+        if not records:
+            return
+        with self._lock:
+            files = self._read_manifest()
+            files.update(records)
+            self._write_manifest(files)
+
+    def delete(self, table_name: str, schema_name: Optional[str] = None) -> bool:
+        file_path = self.file_path(table_name, schema_name)
+        if not file_path.exists():
+            return False
+        file_path.unlink()
+        self._remove_journal(file_path)
+        with self._lock:
+            self._generations.pop(file_path.name, None)
+            files = self._read_manifest()
+            if files.pop(file_path.name, None) is not None:
+                self._write_manifest(files)
+        return True
+
+    def list_tables(self, schema_name: Optional[str] = None) -> List[str]:
+        with self._lock:
+            files = self._listing()
+        return sorted(
+            record["table_name"]
+            for record in files.values()
+            if record["table_name"] is not None
+            and (schema_name is None or record["schema_name"] == schema_name)
+        )
+
+    def iter_tables(self) -> Iterator[Dict[str, Any]]:
+        with self._lock:
+            files = self._listing()
+        for name in sorted(files):
+            if files[name]["table_name"] is None:
+                continue
+            file_path = self.storage_path / name
+            try:
+                with open(file_path, 'r', encoding='utf-8') as f:
+                    data = json.load(f)
+            except FileNotFoundError:
+                # Deleted since the listing
+                continue
+            except ValueError as e:
+                logger.warning(f"Failed to read metadata file {file_path}: {e}")
+                continue
+            yield _replay_journal(data, file_path.with_suffix(JOURNAL_SUFFIX))
+
+    def file_path(self, table_name: str, schema_name: Optional[str] = None) -> Path:
+        """Get the file path for storing table metadata."""
+        if schema_name:
+            filename = f"{schema_name}_{table_name}.json"
+        else:
+            filename = f"{table_name}.json"
+
+        return self.storage_path / filename
+
+    def append_field_patch(self, table_name: str, schema_name: Optional[str], patch: Dict[str, Any]) -> None:
+        file_path = self.file_path(table_name, schema_name)
+        if not file_path.exists():
+            super().append_field_patch(table_name, schema_name, patch)
+            return
+        journal_path = file_path.with_suffix(JOURNAL_SUFFIX)
+        with self._lock:
+            if file_path.name not in self._generations:
+                self._generations[file_path.name] = _read_generation(file_path)
+            generation = self._generations[file_path.name]
+        created = not journal_path.exists()
+        with open(journal_path, 'a', encoding='utf-8') as f:
+            f.write(json.dumps({**patch, GENERATION_KEY: generation}, default=str) + "\n")
+            # The caller treats the update as durable once this returns
+            f.flush()
+            os.fsync(f.fileno())
+        if created:
+            _fsync_directory(self.storage_path)
+        with self._lock:
+            length = self._journal_lengths.get(journal_path.name)
+            if length is None:
+                with open(journal_path, 'rb') as f:
+                    length = sum(1 for _ in f)
+            else:
+                length += 1
+            self._journal_lengths[journal_path.name] = length
+        if length >= self.compact_threshold:
+            self.compact(table_name, schema_name)
+
+    def compact(self, table_name: str, schema_name: Optional[str] = None) -> bool:
+        """Fold a table's journal into its JSON file.
+
+        Returns:
+            bool: False if the table is not stored
+        """
+        data = self.load(table_name, schema_name)
+        if data is None:
+            return False
+        self.save(data)
+        return True
+
+    def rebuild_manifest(self) -> int:
+        """Re-index every JSON file from scratch.
+
+        Returns:
+            int: Number of tables in the new manifest
+        """
+        with self._lock:
+            files = self._refresh_manifest({})
+        return sum(1 for record in files.values() if record["table_name"] is not None)
+
+    def _remove_journal(self, file_path: Path) -> None:
+        journal_path = file_path.with_suffix(JOURNAL_SUFFIX)
+        with self._lock:
+            self._journal_lengths.pop(journal_path.name, None)
+        try:
+            journal_path.unlink()
+        except FileNotFoundError:
+            pass
+
+    def _manifest_record(self, file_path: Path, data: Optional[Dict[str, Any]], content: bytes) -> Dict[str, Any]:
+        stat = file_path.stat()
+        if not isinstance(data, dict):
+            data = {}
+        return {
+            "schema_name": data.get("schema_name"),
+            "table_name": data.get("table_name"),
+            "mtime_ns": stat.st_mtime_ns,
+            "size": stat.st_size,
+            "sha256": hashlib.sha256(content).hexdigest(),
+        }
+
+    def _read_manifest(self) -> Dict[str, Dict[str, Any]]:
+        """Return the manifest's file records, or {} if it is missing or unreadable.
+
+        The parsed manifest is reused until another writer replaces the file.
+        """
+        try:
+            stat = self.manifest_path.stat()
+            signature = (stat.st_mtime_ns, stat.st_size)
+            if self._manifest_cache is not None and self._manifest_cache[0] == signature:
+                return dict(self._manifest_cache[1])
+            with open(self.manifest_path, 'r', encoding='utf-8') as f:
+                manifest = json.load(f)
+            if manifest.get("version") == MANIFEST_VERSION:
+                self._manifest_cache = (signature, manifest["files"])
+                return dict(manifest["files"])
+        except FileNotFoundError:
+            pass
+        except Exception as e:
+            logger.warning(f"Rebuilding unreadable metadata manifest {self.manifest_path}: {e}")
+        return {}
+
+    def _write_manifest(self, files: Dict[str, Dict[str, Any]]) -> None:
+        """Replace the manifest atomically; call with the lock held."""
+        content = json.dumps({"version": MANIFEST_VERSION, "files": files}).encode('utf-8')
+        # The manifest is rebuilt if a crash damages it, so skip the fsync
+        atomic_write(self.manifest_path, content, durable=False)
+        stat = self.manifest_path.stat()
+        self._manifest_cache = ((stat.st_mtime_ns, stat.st_size), dict(files))
+
+    def _listing(self) -> Dict[str, Dict[str, Any]]:
+        """Return the manifest records, rescanning only if the directory changed; call with the lock held."""
+        if self._manifest_cache is not None and self._scanned_dir_mtime == self._dir_mtime():
+            return dict(self._manifest_cache[1])
+        return self._refresh_manifest()
+
+    def _dir_mtime(self) -> int:
+        return self.storage_path.stat().st_mtime_ns
+
+    def _refresh_manifest(self, files: Optional[Dict[str, Dict[str, Any]]] = None) -> Dict[str, Dict[str, Any]]:
+        """Bring the manifest in line with the directory; call with the lock held.
+
+        Only files that are new or whose mtime or size changed are parsed.
+        Unreadable files are recorded without a table name so they are not
+        parsed again until they change.
+        """
+        dir_mtime = self._dir_mtime()
+        if files is None:
+            files = self._read_manifest()
+        current: Dict[str, Dict[str, Any]] = {}
+        changed = False
+        with os.scandir(self.storage_path) as it:
+            for entry in it:
+                if not entry.name.endswith(".json") or not entry.is_file():
+                    continue
+                stat = entry.stat()
+                record = files.get(entry.name)
+                if record is not None and record["mtime_ns"] == stat.st_mtime_ns and record["size"] == stat.st_size:
+                    current[entry.name] = record
+                    continue
+                changed = True
+                file_path = Path(entry.path)
+                try:
+                    content = file_path.read_bytes()
+                    try:
+                        data = json.loads(content)
+                    except ValueError as e:
+                        logger.warning(f"Failed to read metadata file {file_path}: {e}")
+                        data = None
+                    current[entry.name] = self._manifest_record(file_path, data, content)
+                except OSError:
+                    # Deleted since the directory was scanned
+                    continue
+
+        if changed or current.keys() != files.keys() or not self.manifest_path.exists():
+            # Moves the directory mtime, so the next listing checks once more
+            self._write_manifest(current)
+        # A change made in the same timestamp tick as the scan would leave the
+        # mtime as it is, so recent timestamps are not trusted yet
+        recent = time.time_ns() - dir_mtime < DIR_MTIME_GRANULARITY_NS
+        self._scanned_dir_mtime = None if recent else dir_mtime
+        return current
+
+
+class SQLiteMetadataBackend(MetadataBackend):
+    """Table metadata in one SQLite database with indexed lookups.
+
+    A single connection in WAL mode is shared by all threads behind a lock.
+    """
+
+    def __init__(self, storage_path: Union[str, Path], migrate_json: bool = True):
+        """Open (or create) ``table_metadata.db`` in ``storage_path``.
+
+        Args:
+            storage_path: Directory holding the database
+            migrate_json: Import JSON files left by the json backend
+        """
+        self.storage_path = Path(storage_path)
+        self.storage_path.mkdir(parents=True, exist_ok=True)
+        self.db_path = self.storage_path / SQLITE_FILENAME
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(str(self.db_path), check_same_thread=False, isolation_level=None)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute("PRAGMA foreign_keys=ON")
+        self._conn.executescript(_SCHEMA)
+        if migrate_json:
+            self.migrate_json_files()
+
+    def load(self, table_name: str, schema_name: Optional[str] = None) -> Optional[Dict[str, Any]]:
+        key = (schema_name or "", table_name)
+        with self._lock:
+            row = self._conn.execute(
+                f"SELECT schema_name, {', '.join(_TABLE_COLUMNS)}, extra FROM tables "
+                "WHERE schema_key = ? AND table_name = ?",
+                key,
+            ).fetchone()
+            if row is None:
+                return None
+            field_rows = self._conn.execute(
+                f"SELECT {', '.join(_FIELD_COLUMNS)}, constraints FROM fields "
+                "WHERE schema_key = ? AND table_name = ? ORDER BY position",
+                key,
+            ).fetchall()
+            relationship_rows = self._conn.execute(
+                "SELECT name, definition FROM relationships WHERE schema_key = ? AND table_name = ?",
+                key,
+            ).fetchall()
+
+        data: Dict[str, Any] = {"table_name": table_name, "schema_name": row[0]}
+        data.update(zip(_TABLE_COLUMNS, row[1:-1]))
+        data.update(json.loads(row[-1]))
+        data["relationships"] = dict(relationship_rows)
+        data["fields"] = []
+        for field_row in field_rows:
+            field = dict(zip(_FIELD_COLUMNS, field_row[:-1]))
+            for flag in ("is_nullable", "is_primary_key", "is_foreign_key"):
+                field[flag] = _to_bool(field[flag])
+            field["constraints"] = json.loads(field_row[-1])
+            data["fields"].append(field)
+        return data
+
+    def save(self, data: Dict[str, Any]) -> None:
+        with self._lock, self._conn:
+            self._conn.execute("BEGIN")
+            self._save(data)
+
+    def save_many(self, datas: Iterable[Dict[str, Any]]) -> None:
+        with self._lock, self._conn:
+            self._conn.execute("BEGIN")
+            for data in datas:
+                self._save(data)
+
+    def delete(self, table_name: str, schema_name: Optional[str] = None) -> bool:
+        with self._lock, self._conn:
+            self._conn.execute("BEGIN")
+            # Fields and relationships are removed by ON DELETE CASCADE
+            cursor = self._conn.execute(
+                "DELETE FROM tables WHERE schema_key = ? AND table_name = ?",
+                (schema_name or "", table_name),
+            )
+            return cursor.rowcount > 0
+
+    def list_tables(self, schema_name: Optional[str] = None) -> List[str]:
+        with self._lock:
+            if schema_name is None:
+                rows = self._conn.execute("SELECT table_name FROM tables ORDER BY table_name")
+            else:
+                rows = self._conn.execute(
+                    "SELECT table_name FROM tables WHERE schema_key = ? ORDER BY table_name",
+                    (schema_name,),
+                )
+            return [row[0] for row in rows]
+
+    def iter_tables(self, page_size: int = 500) -> Iterator[Dict[str, Any]]:
+        # Keyset pagination keeps one page of keys in memory
+        columns = "SELECT schema_key, table_name, schema_name FROM tables"
+        order = "ORDER BY schema_key, table_name LIMIT ?"
+        after: Optional[Tuple[str, str]] = None
+        while True:
+            with self._lock:
+                if after is None:
+                    rows = self._conn.execute(f"{columns} {order}", (page_size,)).fetchall()
+                else:
+                    rows = self._conn.execute(
+                        f"{columns} WHERE (schema_key, table_name) > (?, ?) {order}", (*after, page_size)
+                    ).fetchall()
+            if not rows:
+                return
+            for _, table_name, schema_name in rows:
+                data = self.load(table_name, schema_name)
+                if data is not None:
+                    yield data
+            after = rows[-1][:2]
+
+    def append_field_patch(self, table_name: str, schema_name: Optional[str], patch: Dict[str, Any]) -> None:
+        key = (schema_name or "", table_name)
+        last_updated = _to_text(patch["last_updated"])
+        with self._lock, self._conn:
+            self._conn.execute("BEGIN")
+            cursor = self._conn.execute(
+                "UPDATE tables SET last_updated = ? WHERE schema_key = ? AND table_name = ?",
+                (last_updated, *key),
+            )
+            if cursor.rowcount == 0:
+                self._save(apply_field_patch({"table_name": table_name, "schema_name": schema_name}, patch))
+                return
+            cursor = self._conn.execute(
+                "UPDATE fields SET description = ?, business_context = COALESCE(?, business_context) "
+                "WHERE schema_key = ? AND table_name = ? AND name = ?",
+                (patch["description"], patch.get("business_context") or None, *key, patch["name"]),
+            )
+            if cursor.rowcount == 0:
+                self._conn.execute(
+                    "INSERT INTO fields (schema_key, table_name, position, name, description, business_context, "
+                    "is_primary_key, is_foreign_key, constraints) "
+                    "SELECT ?, ?, COALESCE(MAX(position) + 1, 0), ?, ?, ?, 0, 0, '[]' FROM fields "
+                    "WHERE schema_key = ? AND table_name = ?",
+                    (*key, patch["name"], patch["description"], patch.get("business_context"), *key),
+                )
+
+    def migrate_json_files(self) -> int:
+        """Import ``*.json`` files from the storage directory.
+
+        Migrated files are moved to ``migrated_json/`` so they are imported
+        only once; unreadable files are left in place.
+
+        Returns:
+            int: Number of files migrated
+        """
+        json_files = sorted(self.storage_path.glob("*.json"))
+        if not json_files:
+            return 0
+
+        migrated_dir = self.storage_path / MIGRATED_JSON_DIR
+        migrated_dir.mkdir(exist_ok=True)
+        migrated = 0
+        for file_path in json_files:
+            journal_path = file_path.with_suffix(JOURNAL_SUFFIX)
+            try:
+                with open(file_path, 'r', encoding='utf-8') as f:
+                    data = json.load(f)
+                self.save(_replay_journal(data, journal_path))
+            except Exception as e:
+                logger.warning(f"Failed to migrate metadata file {file_path}: {e}")
+                continue
+            shutil.move(str(file_path), str(migrated_dir / file_path.name))
+            if journal_path.exists():
+                shutil.move(str(journal_path), str(migrated_dir / journal_path.name))
+            migrated += 1
+
+        logger.info(f"Migrated {migrated} table metadata files to {self.db_path}")
+        return migrated
+
+    def close(self) -> None:
+        with self._lock:
+            self._conn.close()
+
+    def _save(self, data: Dict[str, Any]) -> None:
+        """Replace one table's rows; call inside a transaction."""
+        key = (data.get("schema_name") or "", data["table_name"])
+        # Replacing the parent row cascades to the old fields and relationships
+        self._conn.execute("DELETE FROM tables WHERE schema_key = ? AND table_name = ?", key)
+        extra = {column: list(data.get(column) or []) for column in _LIST_COLUMNS}
+        self._conn.execute(
+            f"INSERT INTO tables (schema_key, table_name, schema_name, {', '.join(_TABLE_COLUMNS)}, extra) "
+            f"VALUES (?, ?, ?, {', '.join('?' for _ in _TABLE_COLUMNS)}, ?)",
+            (
+                *key,
+                data.get("schema_name"),
+                *(_to_text(data.get(column)) if column in ("created_date", "last_updated") else data.get(column)
+                  for column in _TABLE_COLUMNS),
+                json.dumps(extra),
+            ),
+        )
+        self._conn.executemany(
+            f"INSERT INTO fields (schema_key, table_name, position, {', '.join(_FIELD_COLUMNS)}, constraints) "
+            f"VALUES (?, ?, ?, {', '.join('?' for _ in _FIELD_COLUMNS)}, ?)",
+            [
+                (*key, position, *(field.get(column) for column in _FIELD_COLUMNS),
+                 json.dumps(list(field.get("constraints") or [])))
+                for position, field in enumerate(data.get("fields") or [])
+            ],
+        )
+        self._conn.executemany(
+            "INSERT INTO relationships (schema_key, table_name, name, definition) VALUES (?, ?, ?, ?)",
+            [(*key, name, definition) for name, definition in (data.get("relationships") or {}).items()],
+        )
+
+
+def create_metadata_backend(name: str, storage_path: Union[str, Path]) -> MetadataBackend:
+    """Create a backend by name (``json`` or ``sqlite``)."""
+    name = name.strip().lower()
+    if name == "json":
+        return JsonFileBackend(storage_path)
+    if name == "sqlite":
+        return SQLiteMetadataBackend(storage_path)
+    raise ValueError(f"Unknown table metadata backend '{name}'")
@@ -0,0 +1,147 @@
+#!/usr/bin/env python3
+"""
+Streaming JSON Lines files for table metadata export and import
+
+An export file starts with a header line, followed by one table's metadata
+dictionary per line:
+
+    {"format": "db2-mcp-table-metadata", "version": 1, "export_timestamp": "..."}
+    {"table_name": "USERS", "schema_name": "APP", "fields": [...], ...}
+
+Files are read and written one line at a time, so memory stays constant
+however many tables they hold. Names ending in ``.gz`` are gzip-compressed.
+Names ending in ``.zst`` use zstd, which requires the optional
+``zstandard`` package (the ``zstd`` extra).
+"""
+
+import gzip
+import json
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Callable, Dict, IO, Iterable, Iterator, List, Optional, TypeVar, Union
+
+EXPORT_FORMAT = "db2-mcp-table-metadata"
+EXPORT_VERSION = 1
+DEFAULT_BATCH_SIZE = 500
+
+_COMPRESSION_SUFFIXES = {".gz": "gzip", ".gzip": "gzip", ".zst": "zstd", ".zstd": "zstd"}
+_JSONL_SUFFIXES = (".jsonl", ".ndjson")
+
+T = TypeVar("T")
+
+Progress = Callable[[int], None]
+
+
+def detect_compression(path: Union[str, Path]) -> Optional[str]:
+    """Return ``gzip``, ``zstd`` or None from the file name."""
+    return _COMPRESSION_SUFFIXES.get(Path(path).suffix.lower())
+
+
+def is_jsonl_path(path: Union[str, Path]) -> bool:
+    """Whether a file name denotes a (possibly compressed) JSON Lines file."""
+    path = Path(path)
+    if detect_compression(path):
+        path = path.with_suffix("")
+    return path.suffix.lower() in _JSONL_SUFFIXES
+
+
+def open_text(path: Union[str, Path], mode: str, compression: Optional[str] = None) -> IO[str]:
+    """Open a text stream, compressed according to ``compression`` or the file name.
+
+    Args:
+        path: File to open
+        mode: ``r`` or ``w``
+        compression: ``gzip``, ``zstd``, ``none``, or None to detect from the name
+    """
+    if compression is None:
+        compression = detect_compression(path)
+    if compression in (None, "none"):
+        return open(path, mode, encoding="utf-8")
+    if compression == "gzip":
+        return gzip.open(path, f"{mode}t", encoding="utf-8")
+    if compression == "zstd":
+        try:
+            import zstandard
+        except ImportError:
+            raise RuntimeError("zstd compression requires the zstandard package: pip install db2-mcp-server[zstd]")
+        return zstandard.open(path, f"{mode}t", encoding="utf-8")
+    raise ValueError(f"Unknown compression '{compression}'")
+
+
+def write_jsonl(
+    path: Union[str, Path],
+    records: Iterable[Dict[str, Any]],
+    compression: Optional[str] = None,
+    progress: Optional[Progress] = None,
+    batch_size: int = DEFAULT_BATCH_SIZE,
+) -> int:
+    """Write a header and one line per record.
+
+    Args:
+        path: Output file
+        records: Metadata dictionaries, consumed lazily
+        compression: See ``open_text``
+        progress: Called with the running count every ``batch_size`` records
+            and at the end
+        batch_size: Records between progress calls
+
+    Returns:
+        int: Number of records written
+    """
+    count = 0
+    with open_text(path, "w", compression) as f:
+        header = {"format": EXPORT_FORMAT, "version": EXPORT_VERSION, "export_timestamp": datetime.now().isoformat()}
+        f.write(json.dumps(header) + "\n")
+        for record in records:
+            f.write(json.dumps(record, default=str) + "\n")
+            count += 1
+            if progress is not None and count % batch_size == 0:
+                progress(count)
+    if progress is not None and count % batch_size:
+        progress(count)
+    return count
+
+
+def read_jsonl_lines(path: Union[str, Path], compression: Optional[str] = None) -> Iterator[str]:
+    """Yield the record lines of an export file, unparsed.
+
+    The header line is checked and skipped; files without one are accepted.
+    Lines are left as strings so parsing can happen in worker processes.
+    """
+    with open_text(path, "r", compression) as f:
+        first = True
+        for line in f:
+            line = line.strip()
+            if not line:
+                continue
+            if first:
+                first = False
+                if _is_header(line):
+                    continue
+            yield line
+
+
+def batched(items: Iterable[T], size: int) -> Iterator[List[T]]:
+    """Group ``items`` into lists of at most ``size``."""
+    batch: List[T] = []
+    for item in items:
+        batch.append(item)
+        if len(batch) >= size:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
+
+
+def _is_header(line: str) -> bool:
+    if '"format"' not in line:
+        return False
+    try:
+        header = json.loads(line)
+    except ValueError:
+        return False
+    if not isinstance(header, dict) or header.get("format") != EXPORT_FORMAT:
+        return False
+    if header.get("version", EXPORT_VERSION) > EXPORT_VERSION:
+        raise ValueError(f"Unsupported table metadata export version {header['version']}")
+    return True
@@ -9,15 +9,27 @@ storage of table schema information, field descriptions, and analysis results.
 
 import json
 import logging
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from contextlib import ExitStack
 from datetime import datetime, timedelta
 from pathlib import Path
-from typing import Dict, List, Optional, Any, Union
-from pydantic import BaseModel, Field
+from typing import Callable, Dict, List, Optional, Any, Tuple, Union
+from pydantic import BaseModel, ConfigDict, Field
 import threading
-from ..cache import CacheManager
+from .backends import DEFAULT_METADATA_BACKEND, MetadataBackend, create_metadata_backend
+from .jsonl import DEFAULT_BATCH_SIZE, Progress, batched, is_jsonl_path, read_jsonl_lines, write_jsonl
+from .write_behind import DEFAULT_WRITE_BEHIND, WriteBehindQueue
+from ..cache import CacheManager, ShardedCacheManager, create_cache_manager, namespace_tag, register_cache, schema_tag, table_tag
 
 logger = logging.getLogger(__name__)
 
+# Tables hash onto this many locks, so writes to different tables run in parallel
+LOCK_STRIPES = 64
+
+# Called as (table_name, schema_name, metadata) after a change; metadata is None for deletes
+ChangeListener = Callable[[str, Optional[str], Optional["TableMetadata"]], None]
+
 class FieldInfo(BaseModel):
     """Information about a table field/column."""
     name: str = Field(..., description="Field name")
@@ -48,23 +60,98 @@ class TableMetadata(BaseModel):
     data_quality_notes: List[str] = Field(default=[], description="Data quality observations")
     sample_queries: List[str] = Field(default=[], description="Common query patterns")
     metadata_version: str = Field(default="1.0", description="Metadata schema version")
-    
+
+    def freeze(self) -> "FrozenTableMetadata":
+        """Return an immutable snapshot that can be shared between cache hits."""
+        values = {name: getattr(self, name) for name in TableMetadata.model_fields}
+        values["fields"] = tuple(
+            FrozenFieldInfo.model_construct(
+                _fields_set=field.model_fields_set,
+                **{**{name: getattr(field, name) for name in FieldInfo.model_fields},
+                   "constraints": tuple(field.constraints)}
+            )
+            for field in self.fields
+        )
+        values["relationships"] = _ReadOnlyDict(self.relationships)
+        values["indexes"] = tuple(self.indexes)
+        values["data_quality_notes"] = tuple(self.data_quality_notes)
+        values["sample_queries"] = tuple(self.sample_queries)
+        # Already validated, so skip re-validation of every field
+        return FrozenTableMetadata.model_construct(_fields_set=self.model_fields_set, **values)
+
+
+class _ReadOnlyDict(dict):
+    """dict that rejects mutation, used inside frozen models."""
+
+    def _read_only(self, *args, **kwargs):
+        raise TypeError("Frozen table metadata cannot be modified; use thaw() for an editable copy")
+
+    __setitem__ = __delitem__ = __ior__ = _read_only
+    clear = pop = popitem = setdefault = update = _read_only
+
+    def __reduce__(self):
+        return (_ReadOnlyDict, (dict(self),))
+
+
+class FrozenFieldInfo(FieldInfo):
+    """Immutable FieldInfo held by FrozenTableMetadata."""
+    model_config = ConfigDict(frozen=True)
+
+    constraints: Tuple[str, ...] = Field(default=(), description="Field constraints")
+
+
+class FrozenTableMetadata(TableMetadata):
+    """Immutable TableMetadata held in the cache and returned on cache hits.
+
+    Cache hits hand out the same instance instead of re-validating every
+    field, so it cannot be modified. Use ``thaw()`` to get an editable copy.
+    """
+    model_config = ConfigDict(frozen=True)
+
+    fields: Tuple[FrozenFieldInfo, ...] = Field(default=(), description="Table fields/columns")
+    indexes: Tuple[str, ...] = Field(default=(), description="Table indexes")
+    data_quality_notes: Tuple[str, ...] = Field(default=(), description="Data quality observations")
+    sample_queries: Tuple[str, ...] = Field(default=(), description="Common query patterns")
+
+    def freeze(self) -> "FrozenTableMetadata":
+        return self
+
+    def thaw(self) -> TableMetadata:
+        """Return an editable copy."""
+        return TableMetadata(**self.model_dump())
+
+
 class TableMetadataStorage:
     """Storage manager for table metadata with caching and persistence."""
     
-    def __init__(self, storage_path: Optional[Union[str, Path]] = None, cache_manager: Optional[CacheManager] = None):
+    def __init__(self, storage_path: Optional[Union[str, Path]] = None, cache_manager: Optional[Union[CacheManager, ShardedCacheManager]] = None,
+                 backend: Optional[Union[str, MetadataBackend]] = None, write_behind: Optional[bool] = None):
         """Initialize table metadata storage.
         
         Args:
             storage_path: Path to store persistent metadata files
             cache_manager: Cache manager instance for in-memory caching
+            backend: Persistence backend, or its name ("json" or "sqlite");
+                defaults to the TABLE_METADATA_BACKEND environment variable
+            write_behind: Persist stores and deletes from a background thread;
+                defaults to the TABLE_METADATA_WRITE_BEHIND environment variable
         """
         self.storage_path = Path(storage_path) if storage_path else Path.home() / ".db2_mcp" / "table_metadata"
-        self.cache_manager = cache_manager or CacheManager()
-        self._lock = threading.Lock()
+        if cache_manager is None:
+            cache_manager = create_cache_manager()
+            register_cache("table_metadata_storage", cache_manager)
+        self.cache_manager = cache_manager
+        self._locks = [threading.RLock() for _ in range(LOCK_STRIPES)]
+        self._listeners: List[ChangeListener] = []
         
         # Ensure storage directory exists
         self.storage_path.mkdir(parents=True, exist_ok=True)
+        if not isinstance(backend, MetadataBackend):
+            backend = create_metadata_backend(backend or DEFAULT_METADATA_BACKEND, self.storage_path)
+        self.backend = backend
+        if write_behind is None:
+            write_behind = DEFAULT_WRITE_BEHIND
+        self.write_behind = WriteBehindQueue(backend) if write_behind else None
         
         logger.info(f"Initialized table metadata storage at {self.storage_path}")
     
@@ -79,19 +166,29 @@ class TableMetadataStorage:
             bool: True if stored successfully
         """
         try:
-            with self._lock:
+            if isinstance(metadata, FrozenTableMetadata):
+                metadata = metadata.thaw()
+            with self._table_lock(metadata.table_name, metadata.schema_name):
                 # Update timestamp
                 metadata.last_updated = datetime.now()
                 
                 # Cache the metadata
                 cache_key = f"table_metadata:{metadata.schema_name or 'default'}:{metadata.table_name}"
-                self.cache_manager.set(cache_key, metadata.dict(), ttl=cache_ttl)
+                frozen = metadata.freeze()
+                self.cache_manager.set(
+                    cache_key,
+                    frozen,
+                    ttl=cache_ttl,
+                    tags=_metadata_cache_tags(metadata.table_name, metadata.schema_name),
+                )
                 
-                # Persist to file
-                file_path = self._get_metadata_file_path(metadata.table_name, metadata.schema_name)
-                with open(file_path, 'w', encoding='utf-8') as f:
-                    json.dump(metadata.dict(), f, indent=2, default=str)
+                # Persist to the storage backend, or let the writer thread do it
+                if self.write_behind is not None:
+                    self.write_behind.save(frozen)
+                else:
+                    self.backend.save(metadata.model_dump())
                 
+                self._notify(metadata.table_name, metadata.schema_name, frozen)
                 logger.info(f"Stored metadata for table {metadata.table_name}")
                 return True
                 
@@ -107,28 +204,19 @@ class TableMetadataStorage:
             schema_name: Schema name (optional)
             
         Returns:
-            TableMetadata or None if not found
+            FrozenTableMetadata shared with the cache, or None if not found.
+            Call ``thaw()`` on it to get an editable copy.
         """
         try:
-            # Try cache first
+            # Try cache first, falling back to persistent storage; concurrent
+            # misses share one read
             cache_key = f"table_metadata:{schema_name or 'default'}:{table_name}"
-            cached_data = self.cache_manager.get(cache_key)
-            
-            if cached_data:
-                return TableMetadata(**cached_data)
-            
-            # Try persistent storage
-            file_path = self._get_metadata_file_path(table_name, schema_name)
-            if file_path.exists():
-                with open(file_path, 'r', encoding='utf-8') as f:
-                    data = json.load(f)
-                    metadata = TableMetadata(**data)
-                    
-                    # Re-cache the data
-                    self.cache_manager.set(cache_key, data, ttl=3600)
-                    return metadata
-            
-            return None
+            return self.cache_manager.get_or_load(
+                cache_key,
+                lambda: self._load_frozen_metadata(table_name, schema_name),
+                ttl=3600,
+                tags=_metadata_cache_tags(table_name, schema_name),
+            )
             
         except Exception as e:
             logger.error(f"Failed to retrieve metadata for table {table_name}: {e}")
@@ -149,31 +237,27 @@ class TableMetadataStorage:
             bool: True if updated successfully
         """
         try:
-            metadata = self.get_table_metadata(table_name, schema_name)
-            if not metadata:
-                # Create new metadata if it doesn't exist
-                metadata = TableMetadata(table_name=table_name, schema_name=schema_name)
-            
-            # Find and update the field
-            field_found = False
-            for field in metadata.fields:
-                if field.name == field_name:
-                    field.description = description
-                    if business_context:
-                        field.business_context = business_context
-                    field_found = True
-                    break
-            
-            # Add new field if not found
-            if not field_found:
-                new_field = FieldInfo(
-                    name=field_name,
-                    description=description,
-                    business_context=business_context
-                )
-                metadata.fields.append(new_field)
-            
-            return self.store_table_metadata(metadata)
+            # Hold the table lock across read-modify-write so concurrent updates are not lost
+            with self._table_lock(table_name, schema_name):
+                current = self.get_table_metadata(table_name, schema_name)
+                if not current:
+                    # Create new metadata if it doesn't exist
+                    metadata = TableMetadata(table_name=table_name, schema_name=schema_name)
+                    metadata.fields.append(FieldInfo(
+                        name=field_name,
+                        description=description,
+                        business_context=business_context
+                    ))
+                    return self.store_table_metadata(metadata)
+                
+                # Persist only the changed field instead of rewriting the table
+                patch = {
+                    "name": field_name,
+                    "description": description,
+                    "business_context": business_context,
+                    "last_updated": datetime.now(),
+                }
+                return self._store_field_patch(current, patch)
             
         except Exception as e:
             logger.error(f"Failed to update field description for {table_name}.{field_name}: {e}")
@@ -196,24 +280,27 @@ class TableMetadataStorage:
             bool: True if updated successfully
         """
         try:
-            metadata = self.get_table_metadata(table_name, schema_name)
-            if not metadata:
-                metadata = TableMetadata(table_name=table_name, schema_name=schema_name)
+            with self._table_lock(table_name, schema_name):
+                metadata = self.get_table_metadata(table_name, schema_name)
+                if metadata:
+                    metadata = metadata.thaw()
+                else:
+                    metadata = TableMetadata(table_name=table_name, schema_name=schema_name)
             
-            if table_description:
-                metadata.description = table_description
+                if table_description:
+                    metadata.description = table_description
             
-            # Update or add fields
-            existing_fields = {field.name: field for field in metadata.fields}
+                # Update or add fields
+                existing_fields = {field.name: field for field in metadata.fields}
             
-            for field_name, description in field_descriptions.items():
-                if field_name in existing_fields:
-                    existing_fields[field_name].description = description
-                else:
-                    new_field = FieldInfo(name=field_name, description=description)
-                    metadata.fields.append(new_field)
+                for field_name, description in field_descriptions.items():
+                    if field_name in existing_fields:
+                        existing_fields[field_name].description = description
+                    else:
+                        new_field = FieldInfo(name=field_name, description=description)
+                        metadata.fields.append(new_field)
             
-            return self.store_table_metadata(metadata)
+                return self.store_table_metadata(metadata)
             
         except Exception as e:
             logger.error(f"Failed to bulk update metadata for table {table_name}: {e}")
@@ -229,24 +316,10 @@ class TableMetadataStorage:
             List of table names
         """
         try:
-            tables = []
-            pattern = "*.json"
-            
-            for file_path in self.storage_path.glob(pattern):
-                try:
-                    with open(file_path, 'r', encoding='utf-8') as f:
-                        data = json.load(f)
-                        table_schema = data.get('schema_name')
-                        table_name = data.get('table_name')
-                        
-                        if schema_name is None or table_schema == schema_name:
-                            tables.append(table_name)
-                            
-                except Exception as e:
-                    logger.warning(f"Failed to read metadata file {file_path}: {e}")
-                    continue
-            
-            return sorted(tables)
+            if self.write_behind is not None:
+                # Listing comes from the backend, so it must see pending writes
+                self.write_behind.flush()
+            return self.backend.list_tables(schema_name)
             
         except Exception as e:
             logger.error(f"Failed to list stored tables: {e}")
@@ -263,16 +336,18 @@ class TableMetadataStorage:
             bool: True if deleted successfully
         """
         try:
-            with self._lock:
+            with self._table_lock(table_name, schema_name):
                 # Remove from cache
                 cache_key = f"table_metadata:{schema_name or 'default'}:{table_name}"
                 self.cache_manager.delete(cache_key)
                 
                 # Remove from storage
-                file_path = self._get_metadata_file_path(table_name, schema_name)
-                if file_path.exists():
-                    file_path.unlink()
+                if self.write_behind is not None:
+                    self.write_behind.delete(table_name, schema_name)
+                else:
+                    self.backend.delete(table_name, schema_name)
                 
+                self._notify(table_name, schema_name, None)
                 logger.info(f"Deleted metadata for table {table_name}")
                 return True
                 
@@ -283,6 +358,9 @@ class TableMetadataStorage:
     def export_metadata(self, output_path: Union[str, Path], table_names: Optional[List[str]] = None) -> bool:
         """Export table metadata to a JSON file.
         
+        Paths ending in ``.jsonl`` (optionally ``.gz`` or ``.zst``) are
+        written with ``export_metadata_jsonl`` instead.
+        
         Args:
             output_path: Path to export file
             table_names: List of table names to export (None for all)
@@ -290,6 +368,8 @@ class TableMetadataStorage:
         Returns:
             bool: True if exported successfully
         """
+        if is_jsonl_path(output_path):
+            return self.export_metadata_jsonl(output_path, table_names) is not None
         try:
             export_data = {
                 "export_timestamp": datetime.now().isoformat(),
@@ -318,12 +398,17 @@ class TableMetadataStorage:
     def import_metadata(self, input_path: Union[str, Path]) -> bool:
         """Import table metadata from a JSON file.
         
+        Paths ending in ``.jsonl`` (optionally ``.gz`` or ``.zst``) are read
+        with ``import_metadata_jsonl`` instead.
+        
         Args:
             input_path: Path to import file
             
         Returns:
             bool: True if imported successfully
         """
+        if is_jsonl_path(input_path):
+            return bool(self.import_metadata_jsonl(input_path))
         try:
             with open(input_path, 'r', encoding='utf-8') as f:
                 import_data = json.load(f)
@@ -347,22 +432,221 @@ class TableMetadataStorage:
             logger.error(f"Failed to import metadata: {e}")
             return False
     
-    def _get_metadata_file_path(self, table_name: str, schema_name: Optional[str] = None) -> Path:
-        """Get the file path for storing table metadata.
+    def export_metadata_jsonl(self, output_path: Union[str, Path], table_names: Optional[List[str]] = None,
+                              compression: Optional[str] = None, progress: Optional[Progress] = None) -> Optional[int]:
+        """Stream table metadata to a JSON Lines file, one table at a time.
+        
+        Tables are read straight from the backend without validation or
+        caching, so memory use does not grow with the number of tables.
+        
+        Args:
+            output_path: Path to export file
+            table_names: Table names to export (None for all)
+            compression: "gzip", "zstd" or "none"; detected from the file name by default
+            progress: Called with the number of tables exported so far
+            
+        Returns:
+            Number of tables exported, or None on failure
+        """
+        try:
+            if self.write_behind is not None:
+                self.write_behind.flush()
+            wanted = set(table_names) if table_names else None
+            records = (
+                data for data in self.backend.iter_tables()
+                if wanted is None or data.get("table_name") in wanted
+            )
+            count = write_jsonl(output_path, records, compression, progress)
+            logger.info(f"Exported metadata for {count} tables to {output_path}")
+            return count
+            
+        except Exception as e:
+            logger.error(f"Failed to export metadata: {e}")
+            return None
+    
+    def import_metadata_jsonl(self, input_path: Union[str, Path], compression: Optional[str] = None,
+                              batch_size: int = DEFAULT_BATCH_SIZE, workers: int = 1,
+                              progress: Optional[Progress] = None) -> int:
+        """Stream table metadata from a JSON Lines file.
+        
+        Lines are validated in batches, by ``workers`` processes when more
+        than one, and each batch is stored with one backend commit. At most
+        two batches per worker are in memory at once. Invalid lines are
+        logged and skipped.
         
         Args:
-            table_name: Name of the table
-            schema_name: Schema name (optional)
+            input_path: Path to import file
+            compression: "gzip", "zstd" or "none"; detected from the file name by default
+            batch_size: Tables per validation batch and backend commit
+            workers: Validation processes (1 validates in this process)
+            progress: Called with the number of tables imported so far
             
         Returns:
-            Path to metadata file
+            int: Number of tables imported
         """
-        if schema_name:
-            filename = f"{schema_name}_{table_name}.json"
+        imported = 0
+        try:
+            batches = batched(read_jsonl_lines(input_path, compression), batch_size)
+            if workers > 1:
+                with ProcessPoolExecutor(max_workers=workers) as executor:
+                    pending = deque()
+                    for batch in batches:
+                        pending.append(executor.submit(_parse_table_lines, batch))
+                        if len(pending) >= 2 * workers:
+                            imported += self._import_parsed(pending.popleft().result(), progress, imported)
+                    while pending:
+                        imported += self._import_parsed(pending.popleft().result(), progress, imported)
+            else:
+                for batch in batches:
+                    imported += self._import_parsed(_parse_table_lines(batch), progress, imported)
+            
+            logger.info(f"Imported metadata for {imported} tables from {input_path}")
+        except Exception as e:
+            logger.error(f"Failed to import metadata after {imported} tables: {e}")
+        return imported
+    
+    def store_many(self, metadatas: List[TableMetadata]) -> int:
+        """Store several tables with one backend commit.
+        
+        Cached copies are invalidated rather than replaced, so bulk loads do
+        not fill the cache.
+        
+        Returns:
+            int: Number of tables stored
+        """
+        if not metadatas:
+            return 0
+        now = datetime.now()
+        metadatas = [m.thaw() if isinstance(m, FrozenTableMetadata) else m for m in metadatas]
+        with ExitStack() as stack:
+            # Take stripes in index order so concurrent batches cannot deadlock
+            for index in sorted({self._lock_index(m.table_name, m.schema_name) for m in metadatas}):
+                stack.enter_context(self._locks[index])
+            for metadata in metadatas:
+                metadata.last_updated = now
+            if self.write_behind is not None:
+                for metadata in metadatas:
+                    self.write_behind.save(metadata.freeze())
+            else:
+                self.backend.save_many([metadata.model_dump() for metadata in metadatas])
+            for metadata in metadatas:
+                self.cache_manager.delete(f"table_metadata:{metadata.schema_name or 'default'}:{metadata.table_name}")
+                self._notify(metadata.table_name, metadata.schema_name, metadata)
+        return len(metadatas)
+    
+    def add_change_listener(self, callback: ChangeListener) -> None:
+        """Register ``callback(table_name, schema_name, metadata)`` run after every change.
+        
+        It runs under the table's lock after each store, field update and
+        delete, so a table's changes arrive in order. ``metadata`` is the
+        stored metadata, or None for a delete. Listeners should be quick and
+        must not modify the storage.
+        """
+        self._listeners.append(callback)
+    
+    def flush(self) -> int:
+        """Persist pending write-behind operations now.
+        
+        Returns:
+            int: Number of operations written (0 without write-behind)
+        """
+        return self.write_behind.flush() if self.write_behind is not None else 0
+    
+    def close(self) -> None:
+        """Drain pending writes and release the backend."""
+        if self.write_behind is not None:
+            self.write_behind.close()
+        self.backend.close()
+    
+    def _store_field_patch(self, current: FrozenTableMetadata, patch: Dict[str, Any]) -> bool:
+        """Apply a field patch to the cached snapshot and append it to the backend."""
+        fields = list(current.fields)
+        for i, field in enumerate(fields):
+            if field.name == patch["name"]:
+                changes = {"description": patch["description"]}
+                if patch["business_context"]:
+                    changes["business_context"] = patch["business_context"]
+                fields[i] = field.model_copy(update=changes)
+                break
         else:
-            filename = f"{table_name}.json"
+            fields.append(FrozenFieldInfo.model_construct(
+                name=patch["name"],
+                description=patch["description"],
+                business_context=patch["business_context"],
+                constraints=(),
+            ))
+        # Copying the tuple shares every unchanged field with the old snapshot
+        metadata = current.model_copy(update={"fields": tuple(fields), "last_updated": patch["last_updated"]})
         
-        return self.storage_path / filename
+        cache_key = f"table_metadata:{metadata.schema_name or 'default'}:{metadata.table_name}"
+        self.cache_manager.set(
+            cache_key,
+            metadata,
+            ttl=3600,
+            tags=_metadata_cache_tags(metadata.table_name, metadata.schema_name),
+        )
+        if self.write_behind is not None:
+            self.write_behind.save(metadata)
+        else:
+            self.backend.append_field_patch(metadata.table_name, metadata.schema_name, patch)
+        
+        self._notify(metadata.table_name, metadata.schema_name, metadata)
+        logger.info(f"Updated field {patch['name']} of table {metadata.table_name}")
+        return True
+    
+    def _notify(self, table_name: str, schema_name: Optional[str], metadata: Optional[TableMetadata]) -> None:
+        """Run change listeners; a failing listener never fails the write."""
+        for callback in list(self._listeners):
+            try:
+                callback(table_name, schema_name, metadata)
+            except Exception as e:
+                logger.warning(f"Table metadata change listener failed for {table_name}: {e}")
+    
+    def _table_lock(self, table_name: str, schema_name: Optional[str] = None) -> threading.RLock:
+        """Return the lock guarding writes to one table."""
+        return self._locks[self._lock_index(table_name, schema_name)]
+    
+    def _lock_index(self, table_name: str, schema_name: Optional[str] = None) -> int:
+        return hash((schema_name or 'default', table_name)) % len(self._locks)
+    
+    def _import_parsed(self, parsed: List[Tuple[Optional[TableMetadata], Optional[str]]],
+                       progress: Optional[Progress], imported: int) -> int:
+        """Store one validated batch and report progress."""
+        for _, error in parsed:
+            if error:
+                logger.warning(f"Skipping table metadata line: {error}")
+        stored = self.store_many([metadata for metadata, _ in parsed if metadata is not None])
+        if progress is not None:
+            progress(imported + stored)
+        return stored
+    
+    def _load_frozen_metadata(self, table_name: str, schema_name: Optional[str] = None) -> Optional[FrozenTableMetadata]:
+        """Validate stored metadata once and freeze it for caching."""
+        if self.write_behind is not None:
+            # The cache may have evicted a table whose write is still pending
+            pending, metadata = self.write_behind.lookup(table_name, schema_name)
+            if pending:
+                return metadata
+        data = self.backend.load(table_name, schema_name)
+        return TableMetadata(**data).freeze() if data else None
+
+def _parse_table_lines(lines: List[str]) -> List[Tuple[Optional[TableMetadata], Optional[str]]]:
+    """Parse and validate export lines; runs in import worker processes."""
+    parsed = []
+    for line in lines:
+        try:
+            parsed.append((TableMetadata(**json.loads(line)), None))
+        except Exception as e:
+            parsed.append((None, f"{line[:80]}: {e}"))
+    return parsed
+
+def _metadata_cache_tags(table_name: str, schema_name: Optional[str]) -> List[str]:
+    """Invalidation tags for a cached table metadata entry."""
+    return [
+        namespace_tag("table_metadata"),
+        schema_tag(schema_name or "default"),
+        table_tag(schema_name, table_name),
+    ]
 
 # Global instance for easy access
 _storage_instance: Optional[TableMetadataStorage] = None
@@ -0,0 +1,175 @@
+#!/usr/bin/env python3
+"""
+Write-behind persistence for TableMetadataStorage
+
+In write-behind mode a store or delete only updates the cache and records
+the latest operation per table here. A background thread writes the
+pending operations to the backend at most ``flush_interval`` seconds
+later, so a burst of updates to one table costs one write, and request
+threads never wait on JSON serialization or disk I/O.
+
+Pending operations are drained by ``flush()``, by ``close()`` and at
+interpreter exit. Operations that fail to persist are kept and retried on
+the next flush unless a newer operation for the same table replaced them.
+"""
+
+import atexit
+import logging
+import os
+import threading
+import time
+import weakref
+from typing import Any, Dict, Optional, Tuple
+
+from .backends import MetadataBackend
+
+logger = logging.getLogger(__name__)
+
+# Write-behind is off unless TABLE_METADATA_WRITE_BEHIND is set
+DEFAULT_WRITE_BEHIND = os.getenv("TABLE_METADATA_WRITE_BEHIND", "").lower() in ("1", "true", "yes")
+# Upper bound in seconds between an update and its write to the backend
+DEFAULT_FLUSH_INTERVAL = float(os.getenv("TABLE_METADATA_FLUSH_INTERVAL", "1"))
+# Pending tables that trigger a flush before the interval elapses
+DEFAULT_MAX_PENDING = int(os.getenv("TABLE_METADATA_MAX_PENDING", "1000"))
+
+TableKey = Tuple[Optional[str], str]
+
+_queues: "weakref.WeakSet[WriteBehindQueue]" = weakref.WeakSet()
+
+
+class WriteBehindQueue:
+    """Coalescing queue of table metadata writes in front of a MetadataBackend.
+
+    Keys are ``(schema_name, table_name)``. Values are the metadata to save
+    (anything with ``model_dump()``), or None for a delete.
+    """
+
+    def __init__(
+        self,
+        backend: MetadataBackend,
+        flush_interval: float = DEFAULT_FLUSH_INTERVAL,
+        max_pending: int = DEFAULT_MAX_PENDING,
+    ):
+        """Initialize the queue; the writer thread starts on the first write.
+
+        Args:
+            backend: Backend the operations are persisted to
+            flush_interval: Seconds an operation may wait before it is written
+            max_pending: Pending tables that wake the writer early
+        """
+        self.backend = backend
+        self.flush_interval = flush_interval
+        self.max_pending = max_pending
+        self._pending: Dict[TableKey, Any] = {}
+        # Taken by the writer but not yet persisted; still visible to lookups
+        self._inflight: Dict[TableKey, Any] = {}
+        self._cond = threading.Condition()
+        self._flush_lock = threading.Lock()
+        self._thread: Optional[threading.Thread] = None
+        self._closed = False
+        self.writes = 0
+        self.coalesced = 0
+        _queues.add(self)
+
+    def save(self, metadata: Any) -> None:
+        """Queue ``metadata`` to be saved, replacing any pending operation for its table."""
+        self._put((metadata.schema_name, metadata.table_name), metadata)
+
+    def delete(self, table_name: str, schema_name: Optional[str] = None) -> None:
+        """Queue a delete, replacing any pending save for the table."""
+        self._put((schema_name, table_name), None)
+
+    def lookup(self, table_name: str, schema_name: Optional[str] = None) -> Tuple[bool, Any]:
+        """Return ``(True, metadata_or_None)`` if an operation for the table is not persisted yet.
+
+        Returns ``(False, None)`` when the backend is up to date for the table.
+        """
+        key = (schema_name, table_name)
+        with self._cond:
+            for ops in (self._pending, self._inflight):
+                if key in ops:
+                    return True, ops[key]
+        return False, None
+
+    def flush(self) -> int:
+        """Write every pending operation now.
+
+        Returns:
+            int: Number of operations persisted
+        """
+        with self._flush_lock:
+            with self._cond:
+                batch, self._pending = self._pending, {}
+                self._inflight = batch
+            written = 0
+            failed: Dict[TableKey, Any] = {}
+            for (schema_name, table_name), metadata in batch.items():
+                try:
+                    if metadata is None:
+                        self.backend.delete(table_name, schema_name)
+                    else:
+                        self.backend.save(metadata.model_dump())
+                    written += 1
+                except Exception as e:
+                    logger.error(f"Failed to persist metadata for table {table_name}: {e}")
+                    failed[(schema_name, table_name)] = metadata
+            with self._cond:
+                self._inflight = {}
+                for key, metadata in failed.items():
+                    # A newer operation for the same table supersedes the failed one
+                    self._pending.setdefault(key, metadata)
+                self.writes += written
+            return written
+
+    def close(self) -> None:
+        """Stop the writer thread after draining pending operations."""
+        with self._cond:
+            self._closed = True
+            self._cond.notify_all()
+        if self._thread is not None:
+            self._thread.join()
+        self.flush()
+
+    def __len__(self) -> int:
+        with self._cond:
+            return len(self._pending) + len(self._inflight)
+
+    def _put(self, key: TableKey, metadata: Any) -> None:
+        with self._cond:
+            if key in self._pending:
+                self.coalesced += 1
+            self._pending[key] = metadata
+            closed = self._closed
+            if not closed and self._thread is None:
+                self._thread = threading.Thread(target=self._run, name="metadata-write-behind", daemon=True)
+                self._thread.start()
+            self._cond.notify_all()
+        if closed:
+            # No writer after close; persist synchronously
+            self.flush()
+
+    def _run(self) -> None:
+        while True:
+            with self._cond:
+                while not self._pending and not self._closed:
+                    self._cond.wait()
+                if self._closed:
+                    return
+                # Let writes to the same tables coalesce, but never past the interval
+                deadline = time.monotonic() + self.flush_interval
+                while not self._closed and len(self._pending) < self.max_pending:
+                    remaining = deadline - time.monotonic()
+                    if remaining <= 0:
+                        break
+                    self._cond.wait(remaining)
+            self.flush()
+
+
+@atexit.register
+def _drain_all() -> None:
+    """Persist pending operations of every queue at interpreter exit."""
+    for queue in list(_queues):
+        try:
+            queue.close()
+        except Exception as e:
+            logger.error(f"Failed to drain table metadata write-behind queue: {e}")
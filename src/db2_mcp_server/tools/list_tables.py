@@ -1,38 +1,33 @@
 """MCP Tool to list tables in a DB2 database."""
 
 from pydantic import BaseModel, Field
-from typing import List, Optional
+from typing import List, Optional, Tuple
+import base64
+import binascii
 import ibm_db
+import json
 import logging
-import os
-from db2_mcp_server.cache import CacheManager
+from db2_mcp_server.cache import CATALOG_CACHE_HARD_TTL, CATALOG_CACHE_TTL, cache, namespace_tag, schema_tag
+from db2_mcp_server.db import get_connection_pool, get_db_connection_string, run_db_call
 from db2_mcp_server.logger import logger
 from fastmcp import FastMCP
 from ..mcp_instance import mcp  # Import the shared mcp instance
 
-# Build connection string from environment variables
-def get_db_connection_string():
-    """Build DB2 connection string from environment variables."""
-    host = os.getenv("DB2_HOST", "localhost")
-    port = os.getenv("DB2_PORT", "50000")
-    database = os.getenv("DB2_DATABASE", "")
-    username = os.getenv("DB2_USERNAME", "")
-    password = os.getenv("DB2_PASSWORD", "")
-
-    if not database or not username:
-        raise ValueError("DB2_DATABASE and DB2_USERNAME must be set in environment variables")
-
-    return f"DATABASE={database};HOSTNAME={host};PORT={port};PROTOCOL=TCPIP;UID={username};PWD={password};"
-
 DB_CONNECTION_STRING = get_db_connection_string()
 
+# SYSCAT.TABLES.TYPE codes accepted by the table_type filter
+DEFAULT_TABLE_TYPE = "T"
+VALID_TABLE_TYPES = {"A", "G", "H", "L", "N", "S", "T", "U", "V", "W"}
+MAX_LIST_LIMIT = 1000
+
 class ListTablesInput(BaseModel):
     """Input for listing tables in a DB2 database."""
     model_config = {"json_schema_extra": {"required": []}}
 
     schema_name: str = Field(default="", description="Schema name to filter tables (optional)")
-    table_type: str = Field(default="", description="Table type to filter (e.g., 'T' for tables, 'V' for views)")
-    limit: int = Field(default=100, description="Maximum number of tables to return")
+    table_type: str = Field(default="", description="Table type to filter (e.g., 'T' for tables, 'V' for views); defaults to 'T'")
+    limit: int = Field(default=100, ge=1, le=MAX_LIST_LIMIT, description="Maximum number of tables to return")
+    continuation_token: str = Field(default="", description="Token from a previous result's next_token to fetch the next page (optional)")
 
 class ListTablesResult(BaseModel):
     """Result of listing tables."""
@@ -40,6 +35,73 @@ class ListTablesResult(BaseModel):
     count: int = Field(default=0, description="Number of tables returned")
     schema_filter: str = Field(default="", description="Schema filter applied")
     table_type_filter: str = Field(default="", description="Table type filter applied")
+    next_token: str = Field(default="", description="Continuation token for the next page; empty when there are no more tables")
+
+def _encode_continuation_token(schema: str, table: str, schema_filter: str, table_type: str) -> str:
+    """Encode the last (TABSCHEMA, TABNAME) of a page as an opaque token.
+
+    The filters are embedded so a token cannot be replayed against a different query.
+    """
+    payload = json.dumps([schema, table, schema_filter, table_type], separators=(",", ":"))
+    return base64.urlsafe_b64encode(payload.encode("utf-8")).decode("ascii")
+
+def _decode_continuation_token(token: str, schema_filter: str, table_type: str) -> Tuple[str, str]:
+    """Decode a continuation token into the (TABSCHEMA, TABNAME) keyset position."""
+    try:
+        schema, table, token_schema, token_type = json.loads(base64.urlsafe_b64decode(token.encode("ascii")))
+    except (ValueError, TypeError, binascii.Error):
+        raise ValueError("Invalid continuation token")
+    if token_schema != schema_filter or token_type != table_type:
+        raise ValueError("Continuation token does not match the requested filters")
+    return schema, table
+
+def _normalize_filters(args: ListTablesInput) -> Tuple[str, str]:
+    """Return the (schema, table type) filters as they are sent to DB2."""
+    table_type = (args.table_type or DEFAULT_TABLE_TYPE).strip().upper()
+    if table_type not in VALID_TABLE_TYPES:
+        raise ValueError(f"Invalid table_type '{args.table_type}'")
+    schema_filter = args.schema_name.strip().upper() if args.schema_name else ""
+    return schema_filter, table_type
+
+def build_list_tables_query(args: ListTablesInput) -> Tuple[str, List[str]]:
+    """Build the keyset-paginated SYSCAT.TABLES query for the given input.
+
+    Returns:
+        Tuple of (sql, params). The query fetches one row more than ``limit``
+        so the caller can tell whether another page exists.
+    """
+    schema_filter, table_type = _normalize_filters(args)
+
+    sql = "SELECT TABSCHEMA, TABNAME FROM SYSCAT.TABLES WHERE TYPE = ?"
+    params = [table_type]
+
+    # Add schema filter if provided
+    if schema_filter:
+        sql += " AND TABSCHEMA = ?"
+        params.append(schema_filter) # DB2 schema names often uppercase
+
+    # Resume strictly after the last row of the previous page
+    if args.continuation_token:
+        last_schema, last_table = _decode_continuation_token(args.continuation_token, schema_filter, table_type)
+        sql += " AND (TABSCHEMA > ? OR (TABSCHEMA = ? AND TABNAME > ?))"
+        params.extend([last_schema, last_schema, last_table])
+
+    # limit is validated as an int, so it is safe to inline
+    sql += f" ORDER BY TABSCHEMA, TABNAME FETCH FIRST {int(args.limit) + 1} ROWS ONLY"
+    return sql, params
+
+def list_tables_cache_key(args: ListTablesInput) -> str:
+    """Cache key identifying one page of list_tables results."""
+    schema_filter, table_type = _normalize_filters(args)
+    return f"list_tables:{schema_filter}:{table_type}:{args.limit}:{args.continuation_token}"
+
+def list_tables_cache_tags(args: ListTablesInput) -> List[str]:
+    """Invalidation tags for one page of list_tables results."""
+    schema_filter, _ = _normalize_filters(args)
+    tags = [namespace_tag("list_tables")]
+    if schema_filter:
+        tags.append(schema_tag(schema_filter))
+    return tags
 
 def _list_tables_impl(ctx, args: ListTablesInput) -> ListTablesResult:
     """Internal implementation of list_tables for testing."""
@@ -48,57 +110,53 @@ def _list_tables_impl(ctx, args: ListTablesInput) -> ListTablesResult:
 def list_tables_logic(args: ListTablesInput) -> ListTablesResult:
     """Lists tables in the configured DB2 database, optionally filtering by schema.
 
-    Connects to the DB2 database using read-only credentials and queries
-    SYSCAT.TABLES to retrieve a list of tables.
+    Borrows a read-only connection from the shared connection pool and queries
+    SYSCAT.TABLES for one page of at most ``limit`` tables, ordered by
+    (TABSCHEMA, TABNAME). Pass the returned ``next_token`` back as
+    ``continuation_token`` to fetch the following page.
     """
-    tables = []
-    conn = None
+    rows = []
     stmt = None
 
     try:
-        # Establish read-only connection (ensure user has only SELECT)
-        conn = ibm_db.connect(DB_CONNECTION_STRING, "", "") # TODO: Secure credential handling
-        if not conn:
-            # TODO: Improve error logging (structured)
-            raise ConnectionError("Failed to connect to the DB2 database.")
-
-        # Base query for tables (Type 'T' for Table)
-        sql = "SELECT TABNAME FROM SYSCAT.TABLES WHERE TYPE = 'T'"
-        params = []
-
-        # Add schema filter if provided
-        if args.schema_name and args.schema_name.strip():
-            sql += " AND TABSCHEMA = ?"
-            params.append(args.schema_name.upper()) # DB2 schema names often uppercase
-
-        sql += " ORDER BY TABNAME"
-
-        # Prepare and execute the statement safely
-        stmt = ibm_db.prepare(conn, sql)
-        if not stmt:
-            # TODO: Improve error logging
-            raise RuntimeError(f"Failed to prepare SQL statement: {ibm_db.stmt_errormsg()}")
-
-        if params:
-            if not ibm_db.execute(stmt, tuple(params)):
-                # TODO: Improve error logging
-                raise RuntimeError(f"Failed to execute SQL statement: {ibm_db.stmt_errormsg()}")
-        else:
-            if not ibm_db.execute(stmt):
-                # TODO: Improve error logging
-                raise RuntimeError(f"Failed to execute SQL statement: {ibm_db.stmt_errormsg()}")
-
-        # Fetch results
-        result = ibm_db.fetch_tuple(stmt)
-        while result:
-            tables.append(result[0].strip()) # Get table name
-            result = ibm_db.fetch_tuple(stmt)
-
+        # Borrow a read-only connection (ensure user has only SELECT)
+        with get_connection_pool(DB_CONNECTION_STRING).pooled_connection() as pooled:
+            try:
+                sql, params = build_list_tables_query(args)
+
+                # Reuse the connection's prepared statement for this SQL shape
+                stmt = pooled.statements.prepare(sql)
+
+                if not ibm_db.execute(stmt, tuple(params)):
+                    # TODO: Improve error logging
+                    raise RuntimeError(f"Failed to execute SQL statement: {ibm_db.stmt_errormsg()}")
+
+                # Fetch at most limit + 1 rows; the extra row only signals another page
+                result = ibm_db.fetch_tuple(stmt)
+                while result:
+                    rows.append((result[0].strip(), result[1].strip())) # (schema, table name)
+                    if len(rows) > args.limit:
+                        break
+                    result = ibm_db.fetch_tuple(stmt)
+
+            finally:
+                # Close the cursor before the connection goes back to the pool
+                if stmt:
+                    pooled.statements.release(stmt)
+
+        next_token = ""
+        if len(rows) > args.limit:
+            rows = rows[:args.limit]
+            last_schema, last_table = rows[-1]
+            next_token = _encode_continuation_token(last_schema, last_table, *_normalize_filters(args))
+
+        tables = [table for _, table in rows]
         return ListTablesResult(
             tables=tables,
             count=len(tables),
             schema_filter=args.schema_name,
-            table_type_filter=args.table_type
+            table_type_filter=args.table_type,
+            next_token=next_token
         )
 
     except Exception as e:
@@ -109,26 +167,27 @@ def list_tables_logic(args: ListTablesInput) -> ListTablesResult:
         print(f"Error listing tables: {e}") # Replace with proper logging
         raise # Or return an error ToolResult
 
-    finally:
-        # Ensure resources are closed
-        if stmt:
-            ibm_db.free_stmt(stmt)
-        if conn:
-            ibm_db.close(conn)
-
 @mcp.tool(name="list_tables")
-def list_tables(ctx, args: ListTablesInput) -> ListTablesResult:
+async def list_tables(ctx, args: ListTablesInput) -> ListTablesResult:
     """Lists tables in the configured DB2 database, optionally filtering by schema.
 
-    Connects to the DB2 database using read-only credentials and queries
-    SYSCAT.TABLES to retrieve a list of tables.
+    Borrows a read-only connection from the shared connection pool and queries
+    SYSCAT.TABLES to retrieve a list of tables. The blocking driver calls run
+    on the DB executor so other sessions are not stalled, and pages are cached
+    so concurrent identical requests share a single catalog query.
     """
     logger.debug(f"list_tables called with args: {args}")
     logger.debug(f"Context type: {type(ctx)}")
     logger.debug(f"Context: {ctx}")
 
     try:
-        result = list_tables_logic(args)
+        result = await cache.aget_or_load(
+            list_tables_cache_key(args),
+            lambda: run_db_call(list_tables_logic, args),
+            ttl=CATALOG_CACHE_HARD_TTL,
+            soft_ttl=CATALOG_CACHE_TTL,
+            tags=list_tables_cache_tags(args),
+        )
         logger.debug(f"list_tables returning {result.count} tables")
         return result
     except Exception as e:
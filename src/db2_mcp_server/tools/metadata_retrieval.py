@@ -1,18 +1,141 @@
+"""MCP Tool returning the schema of one DB2 table."""
+
+from typing import Optional, Tuple
+
 import ibm_db
+from pydantic import BaseModel, Field
+
+from ..cache import CATALOG_CACHE_HARD_TTL, CATALOG_CACHE_TTL, cache, namespace_tag, schema_tag, table_tag
+from ..catalog import CatalogSnapshotLoader, normalize_identifier
+from ..db import get_connection_pool, get_db_connection_string, run_db_call
+from ..logger import logger
+from ..mcp_instance import mcp
+from ..storage.table_metadata import TableMetadata
+
+# Resolves the schema (CURRENT SCHEMA when none is given) and the table's
+# catalog version in one indexed lookup
+TABLE_VERSION_QUERY = (
+  "SELECT TABSCHEMA, ALTER_TIME FROM SYSCAT.TABLES "
+  "WHERE TABSCHEMA = COALESCE(CAST(? AS VARCHAR(128)), CURRENT SCHEMA) AND TABNAME = ?"
+)
+
+
+class GetTableSchemaInput(BaseModel):
+  """Input for retrieving the schema of a table."""
+  model_config = {"json_schema_extra": {"required": ["table_name"]}}
+
+  table_name: str = Field(..., description='Table name; folded to upper case unless double-quoted, e.g. "myTable"')
+  schema_name: str = Field(default="", description="Schema name, quoted like table_name (optional, defaults to the connection's current schema)")
+
+
+def table_schema_cache_key(table_name: str, schema_name: Optional[str] = None) -> str:
+  """Cache key of one table's schema by catalog names; ``*`` stands for the current schema."""
+  return f"table_schema:{schema_name or '*'}.{table_name}"
 
 
 class MetadataRetrievalTool:
-  def __init__(self, connection_string):
+  """Builds TableMetadata for single tables from the catalog, with caching.
+
+  Entries carry the table's SYSCAT.TABLES.ALTER_TIME as ``last_updated``.
+  When one goes stale, a single-row ALTER_TIME lookup decides whether the
+  cached metadata still holds; only altered tables are read again. Entries
+  are tagged by table and schema, so catalog sync can drop them at once.
+  """
+
+  def __init__(self, connection_string, pool=None, cache_manager=None):
     self.connection_string = connection_string
+    self.pool = pool if pool is not None else get_connection_pool(connection_string)
+    # An empty CacheManager is falsy, so test for None explicitly
+    self.cache_manager = cache_manager if cache_manager is not None else cache
+    self.loader = CatalogSnapshotLoader(pool=self.pool)
+
+  def get_table_metadata(self, table_name, schema_name=None):
+    """Return the table's metadata, or None when it does not exist.
+
+    Names follow normalize_identifier: upper case unless double-quoted.
+    """
+    table_name = normalize_identifier(table_name)
+    schema_name = normalize_identifier(schema_name) if schema_name and schema_name.strip() else None
+    # Concurrent lookups of the same table share one catalog query; stale
+    # entries are served while one background query revalidates them
+    return self.cache_manager.get_or_load(
+      table_schema_cache_key(table_name, schema_name),
+      lambda: self.load_table_metadata(table_name, schema_name),
+      ttl=CATALOG_CACHE_HARD_TTL,
+      soft_ttl=CATALOG_CACHE_TTL,
+      tags=self.cache_tags(table_name, schema_name),
+    )
+
+  @staticmethod
+  def cache_tags(table_name, schema_name=None):
+    tags = [namespace_tag("table_schema"), table_tag(schema_name, table_name)]
+    if schema_name:
+      tags.append(schema_tag(schema_name))
+    return tags
+
+  def load_table_metadata(self, table_name, schema_name=None):
+    """Read the table from the catalog, reusing the cached copy if it is unaltered."""
+    version = self._fetch_version(table_name, schema_name)
+    if version is None:
+      return None
+    schema, alter_time = version
+    cached = self.cache_manager.get(table_schema_cache_key(table_name, schema_name))
+    if cached is not None and cached.schema_name == schema and cached.last_updated == alter_time:
+      return cached
+    tables = self.loader.load([schema], [table_name])
+    # Cached and shared by every caller, so it must not be modifiable
+    return tables[0].freeze() if tables else None
+
+  def _fetch_version(self, table_name, schema_name) -> Optional[Tuple[str, object]]:
+    with self.pool.pooled_connection() as pooled:
+      stmt = pooled.statements.prepare(TABLE_VERSION_QUERY)
+      try:
+        if not ibm_db.execute(stmt, (schema_name, table_name)):
+          raise RuntimeError(f"Failed to execute SQL statement: {ibm_db.stmt_errormsg()}")
+        row = ibm_db.fetch_tuple(stmt)
+      finally:
+        pooled.statements.release(stmt)
+    if not row:
+      return None
+    return row[0].strip(), row[1]
+
+
+_retrieval_tool: Optional[MetadataRetrievalTool] = None
+
+
+def get_metadata_retrieval_tool() -> MetadataRetrievalTool:
+  """Return the MetadataRetrievalTool on the shared pool and cache."""
+  global _retrieval_tool
+  if _retrieval_tool is None:
+    _retrieval_tool = MetadataRetrievalTool(get_db_connection_string())
+  return _retrieval_tool
+
+
+@mcp.tool(name="get_table_schema")
+async def get_table_schema(ctx, args: GetTableSchemaInput) -> TableMetadata:
+  """Returns the columns, keys, indexes and relationships of a DB2 table.
+
+  Reads only the needed SYSCAT columns with bound parameters on pooled
+  prepared statements. Results are cached per schema and table, so
+  repeated lookups do not reach DB2 until the table is altered.
+  """
+  logger.debug(f"get_table_schema called with args: {args}")
+  retrieval = get_metadata_retrieval_tool()
+  table_name = normalize_identifier(args.table_name)
+  schema_name = normalize_identifier(args.schema_name) if args.schema_name.strip() else None
 
-  def get_table_metadata(self, table_name):
-    conn = ibm_db.connect(self.connection_string, "", "")
-    query = f"SELECT * FROM SYSCAT.COLUMNS WHERE TABNAME = '{table_name}'"
-    stmt = ibm_db.exec_immediate(conn, query)
-    result = []
-    row = ibm_db.fetch_assoc(stmt)
-    while row:
-      result.append(row)
-      row = ibm_db.fetch_assoc(stmt)
-    ibm_db.close(conn)
-    return result
+  try:
+    # Cache hits are answered on the event loop; only loads use the DB executor
+    result = await retrieval.cache_manager.aget_or_load(
+      table_schema_cache_key(table_name, schema_name),
+      lambda: run_db_call(retrieval.load_table_metadata, table_name, schema_name),
+      ttl=CATALOG_CACHE_HARD_TTL,
+      soft_ttl=CATALOG_CACHE_TTL,
+      tags=retrieval.cache_tags(table_name, schema_name),
+    )
+  except Exception as e:
+    logger.error(f"get_table_schema failed: {e}", exc_info=True)
+    raise
+  if result is None:
+    raise ValueError(f"Table {args.schema_name + '.' if args.schema_name else ''}{args.table_name} not found")
+  return result
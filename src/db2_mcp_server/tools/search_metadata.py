@@ -0,0 +1,58 @@
+"""MCP Tool to find tables by the meaning described in their stored metadata."""
+
+import asyncio
+from pydantic import BaseModel, Field
+from typing import List, Optional
+from db2_mcp_server.logger import logger
+from db2_mcp_server.search.text_index import get_text_index, text_index_built
+from ..mcp_instance import mcp  # Import the shared mcp instance
+
+MAX_SEARCH_LIMIT = 100
+
+class SearchMetadataInput(BaseModel):
+    """Input for full-text search over stored table metadata."""
+    model_config = {"json_schema_extra": {"required": ["query"]}}
+
+    query: str = Field(..., description="Words to look for, e.g. 'customer churn'")
+    schema_name: str = Field(default="", description="Schema name to search in (optional); folded to upper case unless double-quoted")
+    limit: int = Field(default=10, ge=1, le=MAX_SEARCH_LIMIT, description="Maximum number of tables to return")
+
+class MetadataMatch(BaseModel):
+    """A table whose descriptions match the query."""
+    schema_name: Optional[str] = Field(default=None, description="Schema of the table")
+    table_name: str = Field(..., description="Table name")
+    score: float = Field(..., description="BM25 relevance score")
+    matched_fields: List[str] = Field(default=[], description="Fields whose description or business context matched")
+    description: Optional[str] = Field(default=None, description="Table description or business purpose")
+
+class SearchMetadataResult(BaseModel):
+    """Result of a full-text metadata search."""
+    matches: List[MetadataMatch] = Field(default=[], description="Matches, best first")
+    count: int = Field(default=0, description="Number of matches returned")
+
+def search_metadata_logic(args: SearchMetadataInput) -> SearchMetadataResult:
+    """Searches the full-text index of stored table metadata."""
+    found = get_text_index().search(args.query, args.limit, args.schema_name.strip() or None)
+    matches = [MetadataMatch(**match._asdict()) for match in found]
+    return SearchMetadataResult(matches=matches, count=len(matches))
+
+@mcp.tool(name="search_metadata")
+async def search_metadata(ctx, args: SearchMetadataInput) -> SearchMetadataResult:
+    """Finds tables whose descriptions, business purpose or field notes mention the query.
+
+    Answers questions like "which table has customer churn info" from a
+    BM25-ranked inverted index over the table metadata storage, kept up to
+    date on every store and delete. Only the first call, which builds the
+    index, reads storage.
+    """
+    logger.debug(f"search_metadata called with args: {args}")
+    try:
+        if not text_index_built():
+            # The first call builds the index from storage, so keep it off the event loop
+            await asyncio.to_thread(get_text_index)
+        result = search_metadata_logic(args)
+        logger.debug(f"search_metadata returning {result.count} matches")
+        return result
+    except Exception as e:
+        logger.error(f"search_metadata failed: {e}", exc_info=True)
+        raise
@@ -0,0 +1 @@
+# Catalog tests module
\ No newline at end of file
@@ -0,0 +1,183 @@
+"""Tests for the bulk catalog snapshot loader."""
+
+from datetime import datetime
+from unittest.mock import MagicMock, patch
+
+import pytest
+
+from db2_mcp_server.cache import CacheManager
+from db2_mcp_server.catalog.snapshot import CatalogSnapshotLoader, merge_curated, normalize_identifier
+from db2_mcp_server.storage.table_metadata import FieldInfo, TableMetadata, TableMetadataStorage
+
+CREATED = datetime(2024, 1, 2, 3, 4, 5)
+ALTERED = datetime(2024, 6, 7, 8, 9, 10)
+
+# Catalog rows per query, keyed by the table the query reads; CHAR columns
+# come back blank-padded as they do from DB2
+CATALOG = {
+    "SYSCAT.TABLES": [
+        ("APP     ", "ORDERS", "T", "Customer orders", 1200, CREATED, ALTERED),
+        ("APP     ", "CUSTOMERS", "T", None, -1, CREATED, None),
+    ],
+    "SYSCAT.COLUMNS": [
+        ("APP     ", "CUSTOMERS", "ID", "INTEGER", 4, 0, "N", None, "Customer key"),
+        ("APP     ", "ORDERS", "ID", "INTEGER", 4, 0, "N", None, None),
+        ("APP     ", "ORDERS", "CUSTOMER_ID", "INTEGER", 4, 0, "N", None, None),
+        ("APP     ", "ORDERS", "TOTAL", "DECIMAL", 10, 2, "Y", "0", "Order total"),
+    ],
+    "SYSCAT.INDEXES": [
+        ("APP     ", "ORDERS", "ORDERS_PK", "P", "+ID"),
+        ("APP     ", "ORDERS", "ORDERS_IX1", "D", "+CUSTOMER_ID-TOTAL"),
+    ],
+    "SYSCAT.KEYCOLUSE": [
+        ("APP     ", "CUSTOMERS", "CUSTOMERS_PK", "ID", "P"),
+        ("APP     ", "ORDERS", "ORDERS_PK", "ID", "P"),
+        ("APP     ", "ORDERS", "ORDERS_CUSTOMER_FK", "CUSTOMER_ID", "F"),
+    ],
+    "SYSCAT.REFERENCES": [
+        ("APP     ", "ORDERS", "ORDERS_CUSTOMER_FK", "APP     ", "CUSTOMERS", " CUSTOMER_ID", " ID"),
+    ],
+}
+
+
+@pytest.fixture
+def catalog():
+    """Patch ibm_db so each prepared statement returns the rows of its catalog view."""
+    pool = MagicMock()
+    pooled = MagicMock()
+    pool.pooled_connection.return_value.__enter__.return_value = pooled
+    pooled.statements.prepare.side_effect = lambda sql: {"sql": sql, "rows": None}
+
+    def execute(stmt, params):
+        view = next(name for name in CATALOG if f"FROM {name}" in stmt["sql"])
+        stmt["rows"] = iter(CATALOG[view])
+        stmt["params"] = params
+        return True
+
+    with patch("db2_mcp_server.catalog.snapshot.ibm_db") as mock_ibm_db:
+        mock_ibm_db.execute.side_effect = execute
+        mock_ibm_db.fetch_tuple.side_effect = lambda stmt: next(stmt["rows"], False)
+        yield pool, pooled
+
+
+def make_storage(path):
+    return TableMetadataStorage(path, CacheManager(sweep_interval=0), backend="sqlite")
+
+
+class TestCatalogSnapshotLoader:
+    """Loading and publishing catalog snapshots."""
+
+    def test_load_assembles_tables(self, catalog):
+        """Test that five queries produce fully populated metadata."""
+        pool, pooled = catalog
+        tables = CatalogSnapshotLoader(pool=pool).load(["app"])
+
+        assert pooled.statements.prepare.call_count == 5
+        assert pooled.statements.release.call_count == 5
+        assert all("TABSCHEMA IN (?)" in call.args[0] for call in pooled.statements.prepare.call_args_list)
+
+        customers, orders = tables
+        assert (customers.schema_name, customers.table_name) == ("APP", "CUSTOMERS")
+        assert customers.row_count is None
+        assert customers.fields[0].is_primary_key
+
+        assert orders.description == "Customer orders"
+        assert orders.row_count == 1200
+        assert orders.created_date == CREATED
+        assert orders.last_updated == ALTERED
+        assert [field.name for field in orders.fields] == ["ID", "CUSTOMER_ID", "TOTAL"]
+        order_id, customer_id, total = orders.fields
+        assert order_id.constraints == ["NOT NULL", "PRIMARY KEY"]
+        assert customer_id.is_foreign_key
+        assert customer_id.foreign_table == "APP.CUSTOMERS"
+        assert total.data_type == "DECIMAL(10,2)"
+        assert total.is_nullable and total.default_value == "0"
+        assert orders.indexes == ["ORDERS_PK (ID) UNIQUE", "ORDERS_IX1 (CUSTOMER_ID, TOTAL DESC)"]
+        assert orders.relationships == {
+            "ORDERS_CUSTOMER_FK": "APP.ORDERS(CUSTOMER_ID) REFERENCES APP.CUSTOMERS(ID)"
+        }
+
+    def test_table_filter_is_bound(self, catalog):
+        """Test that table names are passed as parameters."""
+        pool, pooled = catalog
+        CatalogSnapshotLoader(pool=pool).load(["APP", "HR"], table_names=["orders"])
+
+        sqls = [call.args[0] for call in pooled.statements.prepare.call_args_list]
+        assert all("TABSCHEMA IN (?, ?)" in sql and "TABNAME IN (?)" in sql for sql in sqls)
+        assert "K.TABNAME IN (?)" in sqls[3]
+
+    def test_empty_input_runs_no_queries(self, catalog):
+        """Test that nothing is queried without schemas or tables."""
+        pool, pooled = catalog
+        loader = CatalogSnapshotLoader(pool=pool)
+        assert loader.load([]) == []
+        assert loader.load(["APP"], table_names=[]) == []
+        pooled.statements.prepare.assert_not_called()
+
+    def test_failed_query_releases_statement(self, catalog):
+        """Test that an execute failure surfaces and releases the statement."""
+        pool, pooled = catalog
+        with patch("db2_mcp_server.catalog.snapshot.ibm_db") as mock_ibm_db:
+            mock_ibm_db.execute.return_value = False
+            mock_ibm_db.stmt_errormsg.return_value = "SQL0551N"
+            with pytest.raises(RuntimeError, match="SQL0551N"):
+                CatalogSnapshotLoader(pool=pool).load(["APP"])
+        pooled.statements.release.assert_called_once()
+
+    def test_publish_stores_one_batch_and_keeps_curated_text(self, catalog, tmp_path):
+        """Test publishing with user-entered descriptions preserved."""
+        pool, _ = catalog
+        storage = make_storage(tmp_path)
+        storage.store_table_metadata(TableMetadata(
+            table_name="ORDERS",
+            schema_name="APP",
+            business_purpose="Revenue reporting",
+            fields=[
+                FieldInfo(name="ID", description="Order number", business_context="Printed on invoices"),
+                FieldInfo(name="TOTAL", description="Stale text"),
+            ],
+        ))
+
+        with patch.object(storage.backend, "save_many", wraps=storage.backend.save_many) as save_many:
+            assert CatalogSnapshotLoader(pool=pool, storage=storage).publish(["APP"]) == 2
+        save_many.assert_called_once()
+
+        orders = storage.get_table_metadata("ORDERS", "APP")
+        assert orders.business_purpose == "Revenue reporting"
+        assert orders.row_count == 1200
+        fields = {field.name: field for field in orders.fields}
+        assert fields["ID"].description == "Order number"
+        assert fields["ID"].business_context == "Printed on invoices"
+        assert fields["TOTAL"].description == "Order total"
+        assert storage.get_table_metadata("CUSTOMERS", "APP").fields[0].is_primary_key
+
+
+    def test_republish_drops_removed_foreign_keys(self, catalog, tmp_path):
+        """Test that a foreign key dropped in DB2 leaves, while user-entered relationships stay."""
+        pool, _ = catalog
+        storage = make_storage(tmp_path)
+        loader = CatalogSnapshotLoader(pool=pool, storage=storage)
+        loader.publish(["APP"])
+        orders = storage.get_table_metadata("ORDERS", "APP").thaw()
+        orders.relationships["invoices"] = "Billed through APP.INVOICES.ORDER_ID"
+        storage.store_table_metadata(orders)
+
+        with patch.dict(CATALOG, {"SYSCAT.REFERENCES": []}):
+            loader.publish(["APP"])
+
+        relationships = storage.get_table_metadata("ORDERS", "APP").relationships
+        assert dict(relationships) == {"invoices": "Billed through APP.INVOICES.ORDER_ID"}
+
+
+def test_merge_curated_without_existing():
+    """Test that a table seen for the first time is returned as loaded."""
+    loaded = TableMetadata(table_name="T")
+    assert merge_curated(loaded, None) is loaded
+
+
+def test_normalize_identifier():
+    """Test DB2 case folding of undelimited names only."""
+    assert normalize_identifier(" orders ") == "ORDERS"
+    assert normalize_identifier('"myTable"') == "myTable"
+    assert normalize_identifier('"say ""hi"""') == 'say "hi"'
+    assert normalize_identifier('"') == '"'
@@ -0,0 +1,189 @@
+"""Tests for incremental catalog sync."""
+
+import time
+from datetime import datetime, timedelta
+from unittest.mock import MagicMock, patch
+
+import pytest
+
+from db2_mcp_server.cache import CacheManager, namespace_tag, table_tag
+from db2_mcp_server.catalog.sync import DELTA_QUERY, NAMES_QUERY, CatalogSync, SyncResult
+from db2_mcp_server.storage.table_metadata import TableMetadata, TableMetadataStorage
+
+T0 = datetime(2024, 1, 1)
+OVERLAP = 300
+
+
+class FakeCatalog:
+    """SYSCAT.TABLES of schema APP as {table: (alter_time, stats_time)}."""
+
+    def __init__(self, tables):
+        self.tables = dict(tables)
+        self.queries = []
+
+    def fetch_rows(self, pooled, sql, params):
+        self.queries.append(sql)
+        if sql == DELTA_QUERY:
+            _, alter_mark, stats_mark = params
+            return [(name, alter, stats) for name, (alter, stats) in self.tables.items()
+                    if alter > alter_mark or (stats is not None and stats > stats_mark)]
+        if sql == NAMES_QUERY:
+            return [(name,) for name in self.tables]
+        if not self.tables:
+            return []
+        alters, stats = zip(*self.tables.values())
+        return [("APP", len(self.tables), max(alters), max((s for s in stats if s), default=None))]
+
+
+class FakeLoader:
+    """Publishes bare TableMetadata for the requested tables."""
+
+    def __init__(self, catalog, storage):
+        self.catalog = catalog
+        self.storage = storage
+        self.pool = MagicMock()
+        self.published = []
+
+    def publish(self, schemas, table_names=None):
+        names = sorted(self.catalog.tables) if table_names is None else list(table_names)
+        self.published.append(names)
+        return self.storage.store_many([TableMetadata(table_name=name, schema_name="APP") for name in names])
+
+
+@pytest.fixture
+def sync_env(tmp_path):
+    catalog = FakeCatalog({"ORDERS": (T0, None), "CUSTOMERS": (T0, T0)})
+    storage = TableMetadataStorage(tmp_path, CacheManager(sweep_interval=0), backend="json")
+    loader = FakeLoader(catalog, storage)
+    shared = CacheManager(sweep_interval=0)
+    clock = MagicMock(return_value=1000.0)
+
+    def make_sync():
+        return CatalogSync(["app"], loader=loader, storage=storage, cache_manager=shared,
+                           overlap=OVERLAP, clock=clock)
+
+    with patch("db2_mcp_server.catalog.sync.fetch_rows", side_effect=catalog.fetch_rows):
+        yield catalog, storage, loader, shared, make_sync, clock
+
+
+class TestCatalogSync:
+    """High-water mark tracking."""
+
+    def test_first_sync_loads_schema_and_drops_leftovers(self, sync_env):
+        """Test the initial full load."""
+        catalog, storage, loader, _, make_sync, _ = sync_env
+        storage.store_table_metadata(TableMetadata(table_name="GONE", schema_name="APP"))
+
+        assert make_sync().sync_once() == SyncResult(2, 1)
+        assert loader.published == [["CUSTOMERS", "ORDERS"]]
+        assert storage.list_stored_tables("APP") == ["CUSTOMERS", "ORDERS"]
+
+    def test_unchanged_catalog_costs_one_query(self, sync_env):
+        """Test that a quiet catalog needs only the aggregate query."""
+        catalog, _, loader, _, make_sync, clock = sync_env
+        sync = make_sync()
+        sync.sync_once()
+        clock.return_value += OVERLAP
+        catalog.queries.clear()
+
+        assert sync.sync_once() == SyncResult(0, 0)
+        assert len(catalog.queries) == 1
+        assert len(loader.published) == 1
+
+    def test_settling_schema_rescans_without_republishing(self, sync_env):
+        """Test that the window is re-read after a change but seen tables are skipped."""
+        catalog, _, loader, _, make_sync, _ = sync_env
+        sync = make_sync()
+        sync.sync_once()
+        catalog.queries.clear()
+
+        assert sync.sync_once() == SyncResult(0, 0)
+        assert DELTA_QUERY in catalog.queries
+        assert len(loader.published) == 1
+
+    def test_late_commit_behind_the_mark_is_picked_up(self, sync_env):
+        """Test a DDL stamped before the mark but committed after it moved."""
+        catalog, _, loader, _, make_sync, clock = sync_env
+        sync = make_sync()
+        sync.sync_once()
+
+        catalog.tables["ORDERS"] = (T0 + timedelta(minutes=2), None)
+        clock.return_value += 60
+        assert sync.sync_once() == SyncResult(1, 0)
+
+        # Altered at T0 + 1 minute, committed only now
+        catalog.tables["CUSTOMERS"] = (T0 + timedelta(minutes=1), T0)
+        clock.return_value += 60
+        assert sync.sync_once() == SyncResult(1, 0)
+        assert loader.published[-1] == ["CUSTOMERS"]
+
+        clock.return_value += OVERLAP
+        assert sync.sync_once() == SyncResult(0, 0)
+        assert len(loader.published) == 3
+
+    def test_altered_table_is_reloaded_and_invalidated(self, sync_env):
+        """Test that only tables past the marks are published."""
+        catalog, _, loader, shared, make_sync, _ = sync_env
+        sync = make_sync()
+        sync.sync_once()
+        shared.set("table_schema:APP.ORDERS", "cached", tags=[table_tag("APP", "ORDERS")])
+        shared.set("table_schema:APP.CUSTOMERS", "cached", tags=[table_tag("APP", "CUSTOMERS")])
+        shared.set("list_tables:APP", "cached", tags=[namespace_tag("list_tables")])
+
+        catalog.tables["ORDERS"] = (T0 + timedelta(hours=1), None)
+        assert sync.sync_once() == SyncResult(1, 0)
+
+        assert loader.published[-1] == ["ORDERS"]
+        assert shared.get("table_schema:APP.ORDERS") is None
+        assert shared.get("table_schema:APP.CUSTOMERS") == "cached"
+        # No table was created or dropped
+        assert shared.get("list_tables:APP") == "cached"
+
+    def test_runstats_is_picked_up(self, sync_env):
+        """Test that a newer STATS_TIME counts as a change."""
+        catalog, _, loader, _, make_sync, _ = sync_env
+        sync = make_sync()
+        sync.sync_once()
+
+        catalog.tables["ORDERS"] = (T0, T0 + timedelta(days=1))
+        assert sync.sync_once() == SyncResult(1, 0)
+        assert loader.published[-1] == ["ORDERS"]
+
+    def test_created_and_dropped_tables(self, sync_env):
+        """Test that creates are published and drops reconciled."""
+        catalog, storage, _, shared, make_sync, _ = sync_env
+        sync = make_sync()
+        sync.sync_once()
+        shared.set("list_tables:APP", "cached", tags=[namespace_tag("list_tables")])
+
+        # A drop plus a create keeps the count but must still be noticed
+        del catalog.tables["CUSTOMERS"]
+        catalog.tables["INVOICES"] = (T0 + timedelta(hours=1), None)
+        assert sync.sync_once() == SyncResult(1, 1)
+
+        assert storage.list_stored_tables("APP") == ["INVOICES", "ORDERS"]
+        assert shared.get("list_tables:APP") is None
+
+    def test_marks_survive_restart(self, sync_env):
+        """Test that a new instance resumes from the saved marks."""
+        catalog, _, loader, _, make_sync, clock = sync_env
+        make_sync().sync_once()
+        clock.return_value += OVERLAP
+        catalog.queries.clear()
+
+        assert make_sync().sync_once() == SyncResult(0, 0)
+        assert catalog.queries == [catalog.queries[0]]
+        assert len(loader.published) == 1
+
+    def test_background_thread(self, sync_env):
+        """Test start and stop of the sync thread."""
+        _, storage, _, _, make_sync, _ = sync_env
+        sync = make_sync()
+        sync.interval = 0.01
+        sync.start()
+        deadline = time.monotonic() + 5
+        while not storage.list_stored_tables("APP") and time.monotonic() < deadline:
+            time.sleep(0.01)
+        sync.stop()
+        assert storage.list_stored_tables("APP") == ["CUSTOMERS", "ORDERS"]
+        assert sync._thread is None
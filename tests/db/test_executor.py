@@ -0,0 +1,100 @@
+"""Tests for the bounded DB executor."""
+
+import asyncio
+import threading
+import time
+from unittest.mock import patch
+
+import pytest
+
+from db2_mcp_server.db.executor import DBExecutor, ExecutorSaturatedError
+
+
+@pytest.fixture
+def executor():
+    """Fixture providing a small DBExecutor that is shut down afterwards."""
+    db_executor = DBExecutor(max_workers=2, max_queue=1, timeout=5)
+    yield db_executor
+    db_executor.shutdown(wait=False)
+
+
+def test_run_returns_result_on_worker_thread(executor):
+    """Blocking work runs on an executor thread, not the event loop thread."""
+    def work(a, b=0):
+        return a + b, threading.current_thread().name
+
+    result, thread_name = asyncio.run(executor.run(work, 1, b=2))
+
+    assert result == 3
+    assert thread_name.startswith("db2-executor")
+    stats = executor.stats()
+    assert stats["completed"] == 1
+    assert stats["pending"] == 0
+
+
+def test_concurrent_calls_run_in_parallel(executor):
+    """Concurrent calls overlap instead of running one after another."""
+    async def main():
+        start = time.monotonic()
+        await asyncio.gather(executor.run(time.sleep, 0.2), executor.run(time.sleep, 0.2))
+        return time.monotonic() - start
+
+    assert asyncio.run(main()) < 0.35
+
+
+def test_exceptions_propagate(executor):
+    """Errors raised by the blocking call reach the awaiting caller."""
+    def fail():
+        raise RuntimeError("SQL0204N")
+
+    with pytest.raises(RuntimeError, match="SQL0204N"):
+        asyncio.run(executor.run(fail))
+
+    assert executor.stats()["failed"] == 1
+    assert executor.stats()["pending"] == 0
+
+
+def test_per_call_timeout(executor):
+    """Calls exceeding their timeout raise TimeoutError."""
+    with pytest.raises(TimeoutError):
+        asyncio.run(executor.run(time.sleep, 0.5, timeout=0.05))
+
+    assert executor.stats()["timeouts"] == 1
+
+
+def test_backlog_limit_rejects_excess_calls(executor):
+    """Submissions beyond workers + queue depth are rejected immediately."""
+    release = threading.Event()
+    futures = [executor.submit(release.wait) for _ in range(3)]
+
+    with pytest.raises(ExecutorSaturatedError):
+        executor.submit(release.wait)
+
+    release.set()
+    for future in futures:
+        future.result(timeout=1)
+    assert executor.stats()["rejected"] == 1
+    assert executor.stats()["pending"] == 0
+
+
+def test_invalid_configuration():
+    """Executor sizes are validated."""
+    with pytest.raises(ValueError):
+        DBExecutor(max_workers=0)
+    with pytest.raises(ValueError):
+        DBExecutor(max_queue=-1)
+
+
+@patch('db2_mcp_server.tools.list_tables.list_tables_logic')
+def test_list_tables_tool_dispatches_to_executor(mock_logic):
+    """The list_tables tool awaits its logic on the DB executor."""
+    from db2_mcp_server.tools.list_tables import ListTablesInput, ListTablesResult, list_tables
+
+    mock_logic.return_value = ListTablesResult(tables=["T1"], count=1)
+    args = ListTablesInput()
+
+    with patch('db2_mcp_server.tools.list_tables.run_db_call', side_effect=lambda fn, *a: fn(*a)) as mock_run:
+        result = asyncio.run(list_tables(None, args))
+
+    assert result.tables == ["T1"]
+    mock_run.assert_called_once_with(mock_logic, args)
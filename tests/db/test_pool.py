@@ -0,0 +1,187 @@
+"""Tests for the DB2 connection pool."""
+
+import threading
+import time
+from unittest.mock import MagicMock, patch
+
+import pytest
+
+from db2_mcp_server.db.pool import (
+    ConnectionPool,
+    PoolClosedError,
+    PoolTimeoutError,
+    get_connection_pool,
+    close_all_pools,
+)
+
+CONN_STR = "DATABASE=sample;HOSTNAME=localhost;PORT=50000;PROTOCOL=TCPIP;UID=user;PWD=password;"
+
+
+@pytest.fixture
+def mock_ibm_db():
+    """Patch ibm_db in the pool module with distinct connection handles."""
+    with patch('db2_mcp_server.db.pool.ibm_db') as mock_db:
+        mock_db.connect.side_effect = lambda *args: MagicMock(name="conn")
+        mock_db.active.return_value = True
+        mock_db.exec_immediate.return_value = MagicMock(name="stmt")
+        yield mock_db
+
+
+class TestConnectionPool:
+    """Test ConnectionPool borrowing and recycling."""
+
+    def test_reuses_released_connection(self, mock_ibm_db):
+        """A released connection is handed out again without reconnecting."""
+        pool = ConnectionPool(CONN_STR, min_size=0, max_size=2)
+
+        with pool.connection() as first:
+            pass
+        with pool.connection() as second:
+            pass
+
+        assert first is second
+        mock_ibm_db.connect.assert_called_once_with(CONN_STR, "", "")
+        mock_ibm_db.close.assert_not_called()
+        stats = pool.stats()
+        assert stats["created"] == 1
+        assert stats["borrowed"] == 2
+        assert stats["idle"] == 1
+
+    def test_checkout_timeout(self, mock_ibm_db):
+        """Borrowing from an exhausted pool times out."""
+        pool = ConnectionPool(CONN_STR, min_size=0, max_size=1)
+        held = pool.acquire()
+
+        with pytest.raises(PoolTimeoutError):
+            pool.acquire(timeout=0.05)
+
+        assert pool.stats()["timeouts"] == 1
+        pool.release(held)
+
+    def test_waiter_gets_released_connection(self, mock_ibm_db):
+        """A waiting borrower is woken when a connection is released."""
+        pool = ConnectionPool(CONN_STR, min_size=0, max_size=1)
+        held = pool.acquire()
+        acquired = []
+
+        def borrower():
+            acquired.append(pool.acquire(timeout=2))
+
+        thread = threading.Thread(target=borrower)
+        thread.start()
+        time.sleep(0.05)
+        pool.release(held)
+        thread.join()
+
+        assert acquired[0] is held
+        assert mock_ibm_db.connect.call_count == 1
+
+    def test_inactive_connection_replaced_on_borrow(self, mock_ibm_db):
+        """Connections failing the health check are closed and replaced."""
+        pool = ConnectionPool(CONN_STR, min_size=0, max_size=2)
+        with pool.connection() as first:
+            pass
+
+        mock_ibm_db.active.return_value = False
+        with pool.connection() as second:
+            pass
+
+        assert first is not second
+        mock_ibm_db.close.assert_called_once_with(first)
+        assert pool.stats()["invalidated"] == 1
+
+    def test_idle_connection_validated_with_query(self, mock_ibm_db):
+        """Connections idle past the validation interval run the validation query."""
+        pool = ConnectionPool(CONN_STR, min_size=0, max_size=1, validation_interval=0)
+        with pool.connection():
+            pass
+        with pool.connection() as conn:
+            pass
+
+        mock_ibm_db.exec_immediate.assert_called_once_with(conn, "SELECT 1 FROM SYSIBM.SYSDUMMY1")
+
+    def test_failed_validation_query_replaces_connection(self, mock_ibm_db):
+        """A connection whose validation query fails is not handed out."""
+        pool = ConnectionPool(CONN_STR, min_size=0, max_size=1, validation_interval=0)
+        with pool.connection() as first:
+            pass
+
+        mock_ibm_db.exec_immediate.side_effect = Exception("SQL30081N")
+        mock_ibm_db.exec_immediate.return_value = None
+        with pool.connection() as second:
+            pass
+
+        assert first is not second
+        assert pool.stats()["invalidated"] == 1
+
+    def test_max_lifetime_recycles_connection(self, mock_ibm_db):
+        """Connections older than max_lifetime are closed instead of reused."""
+        pool = ConnectionPool(CONN_STR, min_size=0, max_size=1, max_lifetime=0.01)
+        with pool.connection() as first:
+            time.sleep(0.02)
+        with pool.connection() as second:
+            pass
+
+        assert first is not second
+        mock_ibm_db.close.assert_called_once_with(first)
+        assert pool.stats()["recycled"] == 1
+
+    def test_connect_failure_frees_slot(self, mock_ibm_db):
+        """A failed connect does not leak a pool slot."""
+        pool = ConnectionPool(CONN_STR, min_size=0, max_size=1)
+        mock_ibm_db.connect.side_effect = [None, MagicMock()]
+
+        with pytest.raises(ConnectionError):
+            pool.acquire()
+
+        assert pool.stats()["size"] == 0
+        pooled = pool.acquire(timeout=0.1)
+        assert pooled.conn is not None
+
+    def test_broken_connection_discarded_after_error(self, mock_ibm_db):
+        """An error that leaves the connection inactive drops it from the pool."""
+        pool = ConnectionPool(CONN_STR, min_size=0, max_size=1)
+
+        with pytest.raises(RuntimeError):
+            with pool.connection():
+                mock_ibm_db.active.return_value = False
+                raise RuntimeError("communication error")
+
+        assert pool.stats()["size"] == 0
+
+    def test_warm_up_opens_min_size(self, mock_ibm_db):
+        """warm_up opens connections up to min_size."""
+        pool = ConnectionPool(CONN_STR, min_size=3, max_size=5)
+
+        assert pool.warm_up() == 3
+        assert pool.warm_up() == 0
+        assert pool.stats()["idle"] == 3
+
+    def test_close_rejects_borrow(self, mock_ibm_db):
+        """A closed pool closes idle connections and rejects borrowers."""
+        pool = ConnectionPool(CONN_STR, min_size=0, max_size=1)
+        with pool.connection() as conn:
+            pass
+
+        pool.close()
+
+        mock_ibm_db.close.assert_called_once_with(conn)
+        with pytest.raises(PoolClosedError):
+            pool.acquire()
+
+    def test_invalid_sizes(self):
+        """Pool sizes are validated."""
+        with pytest.raises(ValueError):
+            ConnectionPool(CONN_STR, max_size=0)
+        with pytest.raises(ValueError):
+            ConnectionPool(CONN_STR, min_size=3, max_size=2)
+
+
+def test_get_connection_pool_shared_per_connection_string():
+    """get_connection_pool returns one shared pool per connection string."""
+    try:
+        pool = get_connection_pool(CONN_STR)
+        assert get_connection_pool(CONN_STR) is pool
+        assert get_connection_pool(CONN_STR + "X=1;") is not pool
+    finally:
+        close_all_pools()
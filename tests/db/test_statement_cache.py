@@ -0,0 +1,106 @@
+"""Tests for the per-connection prepared statement cache."""
+
+from unittest.mock import MagicMock, patch
+
+import pytest
+
+from db2_mcp_server.db.pool import ConnectionPool
+from db2_mcp_server.db.statement_cache import StatementCache, StatementCacheStats
+
+
+@pytest.fixture
+def mock_ibm_db():
+    """Patch ibm_db in the statement cache module with distinct statement handles."""
+    with patch('db2_mcp_server.db.statement_cache.ibm_db') as mock_db:
+        mock_db.prepare.side_effect = lambda conn, sql: MagicMock(name=sql)
+        yield mock_db
+
+
+def test_repeated_prepare_hits_cache(mock_ibm_db):
+    """Preparing the same SQL twice only round-trips once."""
+    conn = MagicMock()
+    cache = StatementCache(conn, capacity=4)
+
+    first = cache.prepare("SELECT 1 FROM SYSIBM.SYSDUMMY1")
+    second = cache.prepare("SELECT 1 FROM SYSIBM.SYSDUMMY1")
+
+    assert first is second
+    mock_ibm_db.prepare.assert_called_once_with(conn, "SELECT 1 FROM SYSIBM.SYSDUMMY1")
+    assert cache.stats.snapshot() == {"hits": 1, "misses": 1, "evictions": 0}
+
+
+def test_lru_eviction_frees_statement(mock_ibm_db):
+    """The least recently used statement is freed when capacity is exceeded."""
+    cache = StatementCache(MagicMock(), capacity=2)
+    stmt_a = cache.prepare("A")
+    cache.prepare("B")
+    cache.prepare("A")  # A becomes most recently used
+    cache.prepare("C")  # evicts B
+
+    assert "A" in cache and "C" in cache and "B" not in cache
+    assert len(cache) == 2
+    assert cache.prepare("A") is stmt_a
+    assert cache.stats.snapshot()["evictions"] == 1
+    assert mock_ibm_db.free_stmt.call_count == 1
+
+
+def test_release_closes_cursor_of_cached_statement(mock_ibm_db):
+    """Releasing a cached statement only closes its cursor."""
+    cache = StatementCache(MagicMock(), capacity=2)
+    stmt = cache.prepare("A")
+
+    cache.release(stmt)
+
+    mock_ibm_db.free_result.assert_called_once_with(stmt)
+    mock_ibm_db.free_stmt.assert_not_called()
+
+
+def test_disabled_cache_frees_statements(mock_ibm_db):
+    """With capacity 0 every statement is prepared and freed per use."""
+    cache = StatementCache(MagicMock(), capacity=0)
+    stmt = cache.prepare("A")
+    cache.release(stmt)
+    cache.prepare("A")
+
+    assert mock_ibm_db.prepare.call_count == 2
+    mock_ibm_db.free_stmt.assert_called_once_with(stmt)
+
+
+def test_prepare_failure_raises(mock_ibm_db):
+    """A rejected statement raises and is not cached."""
+    mock_ibm_db.prepare.side_effect = None
+    mock_ibm_db.prepare.return_value = None
+    mock_ibm_db.stmt_errormsg.return_value = "SQL0104N"
+    cache = StatementCache(MagicMock())
+
+    with pytest.raises(RuntimeError, match="Failed to prepare SQL statement: SQL0104N"):
+        cache.prepare("SELEC 1")
+    assert len(cache) == 0
+
+
+def test_pool_shares_counters_and_clears_on_discard(mock_ibm_db):
+    """Pooled connections report into the pool's counters and free statements on close."""
+    with patch('db2_mcp_server.db.pool.ibm_db') as pool_db:
+        pool_db.connect.side_effect = lambda *args: MagicMock(name="conn")
+        pool_db.active.return_value = True
+        pool = ConnectionPool("DSN", min_size=0, max_size=1, statement_cache_size=8)
+
+        for _ in range(3):
+            with pool.pooled_connection() as pooled:
+                stmt = pooled.statements.prepare("SELECT TABNAME FROM SYSCAT.TABLES")
+                pooled.statements.release(stmt)
+
+        assert pool.stats()["statement_cache"] == {"hits": 2, "misses": 1, "evictions": 0}
+        assert mock_ibm_db.prepare.call_count == 1
+
+        pool.close()
+        mock_ibm_db.free_stmt.assert_called_once_with(stmt)
+
+
+def test_stats_shared_between_caches(mock_ibm_db):
+    """Several caches can aggregate into one StatementCacheStats."""
+    stats = StatementCacheStats()
+    StatementCache(MagicMock(), stats=stats).prepare("A")
+    StatementCache(MagicMock(), stats=stats).prepare("A")
+
+    assert stats.snapshot()["misses"] == 2
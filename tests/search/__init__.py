@@ -0,0 +1 @@
+# Search tests module
\ No newline at end of file
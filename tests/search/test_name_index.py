@@ -0,0 +1,130 @@
+"""Tests for the in-memory table and column name index."""
+
+import pytest
+
+from db2_mcp_server.cache import CacheManager
+from db2_mcp_server.search.name_index import MATCH_EXACT, MATCH_FUZZY, MATCH_PREFIX, NameIndex, trigrams
+from db2_mcp_server.storage.table_metadata import FieldInfo, TableMetadata, TableMetadataStorage
+
+
+@pytest.fixture
+def index():
+    index = NameIndex()
+    index.add_table("CUSTOMERS", "APP", ["ID", "NAME", "EMAIL"])
+    index.add_table("CUSTOMER_ORDERS", "APP", ["ID", "CUSTOMER_ID", "TOTAL"])
+    index.add_table("EMPLOYEES", "HR", ["ID", "NAME", "DEPARTMENT_ID"])
+    return index
+
+
+class TestNameIndex:
+    """Searching names."""
+
+    def test_trigrams(self):
+        """Test pg_trgm style padding."""
+        assert trigrams("id") == {"  i", " id", "id "}
+
+    def test_exact_match_ranks_first(self, index):
+        """Test that an exact name beats longer names sharing the prefix."""
+        matches = index.search("customers")
+        assert (matches[0].table_name, matches[0].match, matches[0].score) == ("CUSTOMERS", MATCH_EXACT, 1.0)
+        assert matches[1].table_name == "CUSTOMER_ORDERS"
+
+    def test_prefix_match(self, index):
+        """Test prefix search over tables and columns."""
+        matches = index.search("cust", limit=3)
+        assert [m.match for m in matches] == [MATCH_PREFIX] * 3
+        # Shorter completions rank higher
+        assert [(m.table_name, m.column_name) for m in matches] == [
+            ("CUSTOMERS", None), ("CUSTOMER_ORDERS", "CUSTOMER_ID"), ("CUSTOMER_ORDERS", None),
+        ]
+
+    def test_fuzzy_match_tolerates_typos(self, index):
+        """Test trigram matching of a misspelled name."""
+        matches = index.search("emplyees")
+        assert matches[0].table_name == "EMPLOYEES"
+        assert matches[0].match == MATCH_FUZZY
+
+    def test_shared_column_names_and_filters(self, index):
+        """Test that one name maps to many columns, filtered by schema and kind."""
+        assert len(index.search("id", kind="column")) == 3
+        matches = index.search("hr.name")
+        assert [(m.schema_name, m.table_name, m.column_name) for m in matches] == [("HR", "EMPLOYEES", "NAME")]
+        assert [m.column_name for m in index.search("customers", kind="column")] == ["CUSTOMER_ID"]
+
+    def test_delimited_schema_is_case_sensitive(self, index):
+        """Test that a quoted schema filter matches only that exact schema."""
+        index.add_table("EMPLOYEES", "hr", ["NAME"])
+        assert [m.schema_name for m in index.search("employees", schema_name="hr")] == ["HR"]
+        assert [m.schema_name for m in index.search("employees", schema_name='"hr"')] == ["hr"]
+        assert [m.schema_name for m in index.search('"hr".employees')] == ["hr"]
+
+    def test_limit(self, index):
+        """Test that results stop at the limit."""
+        assert len(index.search("id", limit=2)) == 2
+        assert index.search("id", limit=0) == []
+        assert index.search("  ") == []
+
+    def test_replace_and_remove(self, index):
+        """Test that re-adding a table replaces its names."""
+        index.add_table("CUSTOMERS", "APP", ["ID", "PHONE"])
+        assert index.search("email") == []
+        assert index.search("phone")[0].column_name == "PHONE"
+
+        index.remove_table("CUSTOMERS", "APP")
+        assert {m.table_name for m in index.search("customers")} == {"CUSTOMER_ORDERS"}
+        assert len(index) == 2
+
+    def test_fuzzy_follows_changes_after_search(self, index):
+        """Test that bitmaps kept by an earlier search follow removed and reused name ids."""
+        assert index.search("emplyees")[0].table_name == "EMPLOYEES"
+        index.remove_table("EMPLOYEES", "HR")
+        assert index.search("emplyees") == []
+
+        # Takes the freed ids of the removed names
+        index.add_table("EMPLOYERS", "HR", ["ID"])
+        assert [(m.table_name, m.match) for m in index.search("emplyers")] == [("EMPLOYERS", MATCH_FUZZY)]
+        assert index.search("emplyees") == []
+
+
+class TestNameIndexFromStorage:
+    """Building from and following TableMetadataStorage."""
+
+    def test_follows_storage_changes(self, tmp_path):
+        """Test the initial build and updates through the change listener."""
+        storage = TableMetadataStorage(tmp_path, CacheManager(sweep_interval=0), backend="sqlite")
+        storage.store_table_metadata(TableMetadata(
+            table_name="ORDERS", schema_name="APP", fields=[FieldInfo(name="ORDER_DATE")],
+        ))
+        index = NameIndex.from_storage(storage)
+        assert index.search("order_date")[0].table_name == "ORDERS"
+
+        storage.update_field_description("ORDERS", "SHIP_DATE", "Date shipped", "APP")
+        storage.store_many([TableMetadata(table_name="INVOICES", schema_name="APP")])
+        assert index.search("ship_date")[0].column_name == "SHIP_DATE"
+        assert index.search("invoices")[0].match == MATCH_EXACT
+
+        storage.delete_table_metadata("ORDERS", "APP")
+        assert index.search("orders") == []
+
+    def test_change_during_build_wins_over_scanned_copy(self, tmp_path):
+        """Test that a store landing after the scan read a table is not overwritten by the old copy."""
+        storage = TableMetadataStorage(tmp_path, CacheManager(sweep_interval=0), backend="json")
+        storage.store_table_metadata(TableMetadata(
+            table_name="ORDERS", schema_name="APP", fields=[FieldInfo(name="OLD_COLUMN")],
+        ))
+        iter_tables = storage.backend.iter_tables
+
+        def store_while_scanning():
+            for data in iter_tables():
+                storage.store_table_metadata(TableMetadata(
+                    table_name="ORDERS", schema_name="APP", fields=[FieldInfo(name="NEW_COLUMN")],
+                ))
+                yield data
+
+        storage.backend.iter_tables = store_while_scanning
+        index = NameIndex.from_storage(storage)
+        assert index.search("new_column")[0].column_name == "NEW_COLUMN"
+        assert [m.match for m in index.search("old_column")] == [MATCH_FUZZY]
+
+        storage.delete_table_metadata("ORDERS", "APP")
+        assert index.search("new_column") == []
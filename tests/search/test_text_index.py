@@ -0,0 +1,145 @@
+"""Tests for the BM25 full-text index over stored metadata."""
+
+import random
+
+import pytest
+
+from db2_mcp_server.cache import CacheManager
+from db2_mcp_server.search.text_index import TextIndex, tokenize
+from db2_mcp_server.storage.table_metadata import FieldInfo, TableMetadata, TableMetadataStorage
+
+
+def table(name, description=None, purpose=None, fields=(), schema="APP"):
+    return TableMetadata(
+        table_name=name,
+        schema_name=schema,
+        description=description,
+        business_purpose=purpose,
+        fields=[FieldInfo(name=n, description=d, business_context=c) for n, d, c in fields],
+    )
+
+
+@pytest.fixture
+def index():
+    index = TextIndex()
+    index.add_table(table(
+        "CUSTOMER_SCORES",
+        "Monthly customer health scores",
+        "Predict customer churn and plan retention campaigns",
+        [("CHURN_RISK", "Probability the customer churns next quarter", None), ("MONTH", "Score month", None)],
+    ))
+    index.add_table(table("ORDERS", "Customer orders", fields=[("TOTAL", "Order total", "Revenue reporting")]))
+    index.add_table(table("EMPLOYEES", "Staff directory", schema="HR"))
+    return index
+
+
+class TestTokenize:
+    """Tokenization."""
+
+    def test_tokenize(self):
+        """Test lower-casing, stop words and plural folding."""
+        assert tokenize("Which table has the Customers' churn info?") == ["table", "customer", "churn", "info"]
+        assert tokenize("Address class") == ["address", "class"]
+        assert tokenize(None) == []
+
+
+class TestTextIndex:
+    """BM25 ranking."""
+
+    def test_ranks_most_relevant_table_first(self, index):
+        """Test that the table mentioning churn outranks one mentioning customers only."""
+        matches = index.search("which table has customer churn info")
+        assert [m.table_name for m in matches] == ["CUSTOMER_SCORES", "ORDERS"]
+        assert matches[0].score > matches[1].score
+        assert matches[0].matched_fields == ["CHURN_RISK"]
+        assert matches[0].description == "Monthly customer health scores"
+
+    def test_business_context_and_schema_filter(self, index):
+        """Test matching field business context, restricted to a schema."""
+        assert [m.table_name for m in index.search("revenue")] == ["ORDERS"]
+        assert index.search("revenue", schema_name="hr") == []
+        assert [m.table_name for m in index.search("staff", schema_name="hr")] == ["EMPLOYEES"]
+
+    def test_delimited_schema_is_case_sensitive(self, index):
+        """Test that a quoted schema filter matches only that exact schema."""
+        index.add_table(table("EMPLOYEES", "Staff directory", schema="hr"))
+        assert [m.schema_name for m in index.search("staff", schema_name="hr")] == ["HR"]
+        assert [m.schema_name for m in index.search("staff", schema_name='"hr"')] == ["hr"]
+
+    def test_no_match(self, index):
+        """Test queries without indexed words."""
+        assert index.search("inventory") == []
+        assert index.search("the of") == []
+        assert index.search("customer", limit=0) == []
+
+    def test_reindex_and_remove(self, index):
+        """Test that replacing a table drops its old words."""
+        index.add_table(table("ORDERS", "Purchase orders"))
+        assert index.search("revenue") == []
+        assert [m.table_name for m in index.search("purchase")] == ["ORDERS"]
+
+        index.remove_table("ORDERS", "APP")
+        assert index.search("purchase") == []
+        assert len(index) == 2
+
+    def test_tables_without_text_are_not_indexed(self):
+        """Test that empty documents are skipped."""
+        index = TextIndex()
+        index.add_table(table("BARE"))
+        assert len(index) == 0
+
+    def test_common_term_matches_fill_the_limit(self):
+        """Test that tables matching only a frequent term follow those matching rarer ones."""
+        index = TextIndex()
+        index.add_table(table("CHURN", "Customer churn"))
+        index.add_table(table("CUSTOMER_CHURN", "Customer churn and customer retention"))
+        for i in range(20):
+            index.add_table(table(f"CUSTOMER_{i}", "Customer data"))
+
+        matches = index.search("customer churn data", limit=5)
+        assert {m.table_name for m in matches[:2]} == {"CHURN", "CUSTOMER_CHURN"}
+        assert len(matches) == 5
+        assert len(index.search("customer churn", limit=100)) == 22
+
+    def test_top_matches_equal_full_ranking(self):
+        """Test that skipping tables which cannot reach the limit keeps the ranking exact."""
+        rng = random.Random(7)
+        words = ["customer", "order", "churn", "revenue", "invoice", "region", "month", "score"]
+        index = TextIndex()
+        for i in range(300):
+            # Earlier words are more frequent
+            index.add_table(table(f"T{i}", " ".join(rng.choices(words, range(len(words), 0, -1), k=rng.randint(1, 6)))))
+
+        for query in ("customer churn", "order revenue region", "score month customer invoice"):
+            assert index.search(query, limit=5) == index.search(query, limit=300)[:5]
+
+
+def test_follows_storage_changes(tmp_path):
+    """Test the initial build and updates through the change listener."""
+    storage = TableMetadataStorage(tmp_path, CacheManager(sweep_interval=0), backend="json")
+    storage.store_table_metadata(table("ACCOUNTS", "Customer accounts"))
+    index = TextIndex.from_storage(storage)
+    assert [m.table_name for m in index.search("account")] == ["ACCOUNTS"]
+
+    storage.update_field_description("ACCOUNTS", "STATUS", "Churned or active", "APP")
+    assert index.search("churned")[0].matched_fields == ["STATUS"]
+
+    storage.delete_table_metadata("ACCOUNTS", "APP")
+    assert index.search("account") == []
+
+
+def test_change_during_build_wins_over_scanned_copy(tmp_path):
+    """Test that a store landing after the scan read a table is not overwritten by the old copy."""
+    storage = TableMetadataStorage(tmp_path, CacheManager(sweep_interval=0), backend="json")
+    storage.store_table_metadata(table("ACCOUNTS", "Customer accounts"))
+    iter_tables = storage.backend.iter_tables
+
+    def store_while_scanning():
+        for data in iter_tables():
+            storage.store_table_metadata(table("ACCOUNTS", "Billing ledger"))
+            yield data
+
+    storage.backend.iter_tables = store_while_scanning
+    index = TextIndex.from_storage(storage)
+    assert [m.table_name for m in index.search("ledger")] == ["ACCOUNTS"]
+    assert index.search("customer") == []
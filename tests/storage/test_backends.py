@@ -0,0 +1,427 @@
+"""Tests for table metadata persistence backends."""
+
+import json
+import os
+import sqlite3
+import time
+from datetime import datetime
+
+import pytest
+
+from db2_mcp_server.cache import CacheManager
+from db2_mcp_server.storage.backends import (
+    JsonFileBackend,
+    SQLiteMetadataBackend,
+    apply_field_patch,
+    create_metadata_backend,
+)
+from db2_mcp_server.storage.table_metadata import FieldInfo, TableMetadata, TableMetadataStorage
+
+
+def sample_metadata(table_name="users", schema_name="auth"):
+    return TableMetadata(
+        table_name=table_name,
+        schema_name=schema_name,
+        table_type="T",
+        description="Application users",
+        fields=[
+            FieldInfo(name="id", data_type="INTEGER", description="Primary key",
+                      is_nullable=False, is_primary_key=True, constraints=["NOT NULL"]),
+            FieldInfo(name="email", data_type="VARCHAR", max_length=255, is_nullable=True),
+        ],
+        relationships={"orders": "users.id = orders.user_id"},
+        indexes=["PK_USERS"],
+        row_count=42,
+        created_date=datetime(2024, 1, 2, 3, 4, 5),
+        sample_queries=["SELECT * FROM auth.users"],
+    )
+
+
+@pytest.fixture(params=["json", "sqlite"])
+def backend(request, tmp_path):
+    backend = create_metadata_backend(request.param, tmp_path)
+    yield backend
+    backend.close()
+
+
+class TestBackendContract:
+    """Behaviour shared by every backend."""
+
+    def test_save_and_load_roundtrip(self, backend):
+        """Test that loaded data validates back into the saved metadata."""
+        metadata = sample_metadata()
+        backend.save(metadata.model_dump())
+
+        loaded = TableMetadata(**backend.load("users", "auth"))
+
+        assert loaded == metadata
+
+    def test_load_missing_returns_none(self, backend):
+        """Test loading a table that was never stored."""
+        assert backend.load("missing") is None
+
+    def test_schema_is_part_of_the_key(self, backend):
+        """Test that the same table name in two schemas is stored twice."""
+        backend.save(sample_metadata("users", "auth").model_dump())
+        backend.save(sample_metadata("users", None).model_dump())
+
+        assert backend.load("users", "auth")["schema_name"] == "auth"
+        assert backend.load("users")["schema_name"] is None
+
+    def test_list_tables_with_schema_filter(self, backend):
+        """Test sorted listing with and without a schema filter."""
+        backend.save(sample_metadata("orders", "sales").model_dump())
+        backend.save(sample_metadata("users", "auth").model_dump())
+        backend.save(sample_metadata("accounts", "auth").model_dump())
+
+        assert backend.list_tables() == ["accounts", "orders", "users"]
+        assert backend.list_tables("auth") == ["accounts", "users"]
+        assert backend.list_tables("none") == []
+
+    def test_save_replaces_and_delete_removes(self, backend):
+        """Test overwriting a table and deleting it."""
+        backend.save(sample_metadata().model_dump())
+        replaced = sample_metadata()
+        replaced.fields = replaced.fields[:1]
+        backend.save(replaced.model_dump())
+
+        assert len(backend.load("users", "auth")["fields"]) == 1
+        assert backend.delete("users", "auth") is True
+        assert backend.delete("users", "auth") is False
+        assert backend.load("users", "auth") is None
+
+
+def field_patch(name, description, business_context=None, when=datetime(2025, 1, 1)):
+    return {"name": name, "description": description, "business_context": business_context, "last_updated": when}
+
+
+class TestFieldPatches:
+    """Field description patches on every backend."""
+
+    def test_patch_updates_and_appends_fields(self, backend):
+        """Test that patches change one field or add a new one."""
+        backend.save(sample_metadata().model_dump())
+        backend.append_field_patch("users", "auth", field_patch("email", "Login e-mail", "Contact"))
+        backend.append_field_patch("users", "auth", field_patch("name", "Display name"))
+
+        loaded = TableMetadata(**backend.load("users", "auth"))
+
+        assert [f.name for f in loaded.fields] == ["id", "email", "name"]
+        assert loaded.fields[1].description == "Login e-mail"
+        assert loaded.fields[1].business_context == "Contact"
+        assert loaded.fields[1].max_length == 255
+        assert loaded.fields[2].is_primary_key is False
+        assert loaded.last_updated == datetime(2025, 1, 1)
+
+    def test_patch_creates_missing_table(self, backend):
+        """Test patching a table that was never stored."""
+        backend.append_field_patch("users", "auth", field_patch("id", "Primary key"))
+        assert backend.load("users", "auth")["fields"][0]["description"] == "Primary key"
+
+    def test_apply_field_patch_is_idempotent(self):
+        """Test that replaying a patch twice changes nothing."""
+        once = apply_field_patch({"table_name": "users"}, field_patch("id", "Primary key"))
+        twice = apply_field_patch(json.loads(json.dumps(once, default=str)), field_patch("id", "Primary key"))
+        assert len(twice["fields"]) == 1
+
+
+class TestJsonJournal:
+    """Append-only journal of the JSON backend."""
+
+    def test_patch_appends_without_rewriting_snapshot(self, tmp_path):
+        """Test that a patch is one journal line and leaves the JSON file alone."""
+        backend = JsonFileBackend(tmp_path)
+        backend.save(sample_metadata().model_dump())
+        snapshot = (tmp_path / "auth_users.json").read_bytes()
+
+        backend.append_field_patch("users", "auth", field_patch("email", "Login e-mail"))
+
+        assert (tmp_path / "auth_users.json").read_bytes() == snapshot
+        assert len((tmp_path / "auth_users.journal").read_text().splitlines()) == 1
+        assert backend.load("users", "auth")["fields"][1]["description"] == "Login e-mail"
+
+    def test_compaction_folds_journal_into_snapshot(self, tmp_path):
+        """Test that the journal is compacted once it reaches the threshold."""
+        backend = JsonFileBackend(tmp_path, compact_threshold=3)
+        backend.save(sample_metadata().model_dump())
+        for i in range(3):
+            backend.append_field_patch("users", "auth", field_patch(f"col{i}", f"Column {i}"))
+
+        assert not (tmp_path / "auth_users.journal").exists()
+        stored = json.loads((tmp_path / "auth_users.json").read_text())
+        assert [f["name"] for f in stored["fields"]] == ["id", "email", "col0", "col1", "col2"]
+
+        backend.append_field_patch("users", "auth", field_patch("col3", "Column 3"))
+        assert len((tmp_path / "auth_users.journal").read_text().splitlines()) == 1
+
+    def test_save_and_delete_discard_journal(self, tmp_path):
+        """Test that a full snapshot supersedes older patches."""
+        backend = JsonFileBackend(tmp_path)
+        backend.save(sample_metadata().model_dump())
+        backend.append_field_patch("users", "auth", field_patch("email", "Old"))
+        backend.save(sample_metadata().model_dump())
+
+        assert backend.load("users", "auth")["fields"][1]["description"] is None
+        backend.append_field_patch("users", "auth", field_patch("email", "Old"))
+        backend.delete("users", "auth")
+        assert not list(tmp_path.glob("*.journal"))
+
+    def test_replay_skips_patches_in_snapshot_and_torn_lines(self, tmp_path):
+        """Test recovery from a crash during compaction or append."""
+        backend = JsonFileBackend(tmp_path)
+        data = sample_metadata().model_dump()
+        data["last_updated"] = datetime(2025, 1, 2)
+        backend.save(data)
+        journal = tmp_path / "auth_users.journal"
+        journal.write_text(
+            json.dumps(field_patch("email", "Already compacted", when=datetime(2025, 1, 1)), default=str) + "\n"
+            + json.dumps(field_patch("id", "Newer", when=datetime(2025, 1, 3)), default=str) + "\n"
+            + '{"name": "to'
+        )
+
+        fields = backend.load("users", "auth")["fields"]
+
+        assert fields[0]["description"] == "Newer"
+        assert fields[1]["description"] is None
+        assert len(fields) == 2
+
+    def test_replay_ignores_clock_steps(self, tmp_path):
+        """Test that a patch stamped earlier than its snapshot is still applied."""
+        backend = JsonFileBackend(tmp_path)
+        data = sample_metadata().model_dump()
+        data["last_updated"] = datetime(2025, 1, 2)
+        backend.save(data)
+        backend.append_field_patch("users", "auth", field_patch("email", "After clock step", when=datetime(2025, 1, 1)))
+
+        for reader in (backend, JsonFileBackend(tmp_path)):
+            assert reader.load("users", "auth")["fields"][1]["description"] == "After clock step"
+
+    def test_replay_skips_journal_left_by_crashed_save(self, tmp_path):
+        """Test that patches of an older snapshot are not replayed over a newer one."""
+        backend = JsonFileBackend(tmp_path)
+        backend.save(sample_metadata().model_dump())
+        backend.append_field_patch("users", "auth", field_patch("email", "Old", when=datetime(2030, 1, 1)))
+        journal = (tmp_path / "auth_users.journal").read_bytes()
+        data = sample_metadata().model_dump()
+        data["fields"][1]["description"] = "Replaced"
+        backend.save(data)
+        # Crash between writing the snapshot and removing the journal
+        (tmp_path / "auth_users.journal").write_bytes(journal)
+
+        loaded = JsonFileBackend(tmp_path).load("users", "auth")
+        assert loaded["fields"][1]["description"] == "Replaced"
+        assert "_generation" not in loaded
+
+    def test_load_racing_a_save_does_not_lose_patches(self, tmp_path, monkeypatch):
+        """Test that a read started before a save does not tag later patches with the old snapshot."""
+        backend = JsonFileBackend(tmp_path)
+        backend.save(sample_metadata().model_dump())
+        json_load = json.load
+
+        def load_then_save(f):
+            data = json_load(f)
+            monkeypatch.setattr("db2_mcp_server.storage.backends.json.load", json_load)
+            backend.save(sample_metadata().model_dump())
+            return data
+
+        monkeypatch.setattr("db2_mcp_server.storage.backends.json.load", load_then_save)
+        backend.load("users", "auth")
+        backend.append_field_patch("users", "auth", field_patch("email", "New"))
+        backend.compact("users", "auth")
+
+        assert JsonFileBackend(tmp_path).load("users", "auth")["fields"][1]["description"] == "New"
+
+    def test_patch_is_fsynced(self, tmp_path, monkeypatch):
+        """Test that an appended patch reaches the disk before returning."""
+        backend = JsonFileBackend(tmp_path)
+        backend.save(sample_metadata().model_dump())
+        synced = []
+        fsync = os.fsync
+        monkeypatch.setattr("db2_mcp_server.storage.backends.os.fsync", lambda fd: synced.append(fd) or fsync(fd))
+
+        backend.append_field_patch("users", "auth", field_patch("email", "Durable"))
+        assert synced
+
+    def test_storage_updates_use_journal(self, tmp_path):
+        """Test that update_field_description appends instead of rewriting."""
+        storage = TableMetadataStorage(tmp_path, CacheManager(sweep_interval=0), backend="json")
+        storage.store_table_metadata(sample_metadata())
+        snapshot = (tmp_path / "auth_users.json").read_bytes()
+
+        assert storage.update_field_description("users", "email", "Login e-mail", "auth", "Contact")
+
+        assert (tmp_path / "auth_users.json").read_bytes() == snapshot
+        fresh = TableMetadataStorage(tmp_path, CacheManager(sweep_interval=0), backend="json")
+        for metadata in (storage.get_table_metadata("users", "auth"), fresh.get_table_metadata("users", "auth")):
+            assert metadata.fields[1].description == "Login e-mail"
+            assert metadata.fields[1].business_context == "Contact"
+            assert metadata.fields[0].constraints == ("NOT NULL",)
+
+
+class TestJsonManifest:
+    """Manifest index of the JSON backend."""
+
+    def test_save_and_delete_maintain_manifest(self, tmp_path):
+        """Test that the manifest records each file and drops deleted ones."""
+        backend = JsonFileBackend(tmp_path)
+        backend.save(sample_metadata("users", "auth").model_dump())
+        backend.save(sample_metadata("orders", None).model_dump())
+        backend.delete("orders")
+
+        files = json.loads(backend.manifest_path.read_text())["files"]
+        record = files["auth_users.json"]
+        assert list(files) == ["auth_users.json"]
+        assert (record["schema_name"], record["table_name"]) == ("auth", "users")
+        assert record["size"] == (tmp_path / "auth_users.json").stat().st_size
+        assert len(record["sha256"]) == 64
+
+    def test_listing_does_not_parse_indexed_files(self, tmp_path, monkeypatch):
+        """Test that an up-to-date manifest answers listings on its own."""
+        backend = JsonFileBackend(tmp_path)
+        backend.save(sample_metadata("users", "auth").model_dump())
+        backend.save(sample_metadata("orders", "sales").model_dump())
+
+        def fail(*args, **kwargs):
+            raise AssertionError("metadata file parsed")
+
+        monkeypatch.setattr("db2_mcp_server.storage.backends.Path.read_bytes", fail)
+        assert backend.list_tables() == ["orders", "users"]
+        assert backend.list_tables("auth") == ["users"]
+
+    def test_listing_skips_scan_while_directory_is_unchanged(self, tmp_path, monkeypatch):
+        """Test that listings only rescan after the directory mtime moves."""
+        backend = JsonFileBackend(tmp_path)
+        backend.save(sample_metadata("users", "auth").model_dump())
+        # Old enough that its timestamp is trusted
+        os.utime(tmp_path, ns=(time.time_ns() - 10**10,) * 2)
+        scans = []
+        scandir = os.scandir
+
+        def counting_scandir(path):
+            scans.append(path)
+            return scandir(path)
+
+        monkeypatch.setattr("db2_mcp_server.storage.backends.os.scandir", counting_scandir)
+        assert backend.list_tables() == ["users"]
+        assert backend.list_tables() == ["users"]
+        assert list(backend.iter_tables())[0]["table_name"] == "users"
+        assert len(scans) == 1
+
+        other = sample_metadata("orders", "sales").model_dump(mode="json")
+        (tmp_path / "sales_orders.json").write_text(json.dumps(other))
+        assert backend.list_tables() == ["orders", "users"]
+        assert len(scans) == 2
+
+    def test_missing_manifest_is_rebuilt(self, tmp_path):
+        """Test that files written before the manifest existed are indexed."""
+        backend = JsonFileBackend(tmp_path)
+        backend.save(sample_metadata("users", "auth").model_dump())
+        backend.manifest_path.unlink()
+        (tmp_path / "corrupted.json").write_text("{ not json")
+
+        assert backend.list_tables() == ["users"]
+        assert set(json.loads(backend.manifest_path.read_text())["files"]) == {"auth_users.json", "corrupted.json"}
+
+    def test_stale_entries_are_reindexed(self, tmp_path):
+        """Test that files changed or removed behind the backend's back are noticed."""
+        backend = JsonFileBackend(tmp_path)
+        backend.save(sample_metadata("users", "auth").model_dump())
+        backend.save(sample_metadata("orders", "sales").model_dump())
+        renamed = sample_metadata("customers", "sales").model_dump(mode="json")
+        (tmp_path / "sales_orders.json").write_text(json.dumps(renamed, indent=4))
+        (tmp_path / "auth_users.json").unlink()
+
+        assert backend.list_tables() == ["customers"]
+        assert backend.rebuild_manifest() == 1
+
+    def test_unreadable_manifest_is_rebuilt(self, tmp_path):
+        """Test recovery from a truncated manifest."""
+        backend = JsonFileBackend(tmp_path)
+        backend.save(sample_metadata("users", "auth").model_dump())
+        backend.manifest_path.write_text("{")
+
+        assert JsonFileBackend(tmp_path).list_tables() == ["users"]
+
+
+class TestSQLiteMetadataBackend:
+    """SQLite specific behaviour."""
+
+    def test_uses_wal_and_indexes(self, tmp_path):
+        """Test that the database is in WAL mode and lookups use indexes."""
+        backend = SQLiteMetadataBackend(tmp_path)
+        conn = sqlite3.connect(str(backend.db_path))
+        try:
+            assert conn.execute("PRAGMA journal_mode").fetchone()[0] == "wal"
+            plan = " ".join(
+                str(row) for row in conn.execute(
+                    "EXPLAIN QUERY PLAN SELECT table_name FROM tables WHERE schema_key = ? ORDER BY table_name",
+                    ("auth",),
+                )
+            )
+            assert "USING" in plan and "INDEX" in plan
+        finally:
+            conn.close()
+            backend.close()
+
+    def test_delete_cascades_to_fields_and_relationships(self, tmp_path):
+        """Test that child rows do not outlive their table."""
+        backend = SQLiteMetadataBackend(tmp_path)
+        backend.save(sample_metadata().model_dump())
+        backend.delete("users", "auth")
+        backend.close()
+
+        conn = sqlite3.connect(str(tmp_path / "table_metadata.db"))
+        assert conn.execute("SELECT COUNT(*) FROM fields").fetchone()[0] == 0
+        assert conn.execute("SELECT COUNT(*) FROM relationships").fetchone()[0] == 0
+        conn.close()
+
+    def test_migrates_json_files(self, tmp_path):
+        """Test that JSON files written by the json backend are imported once."""
+        json_backend = JsonFileBackend(tmp_path)
+        json_backend.save(sample_metadata("users", "auth").model_dump())
+        json_backend.save(sample_metadata("orders", None).model_dump())
+        json_backend.append_field_patch("orders", None, field_patch("email", "Journaled"))
+        (tmp_path / "corrupted.json").write_text("{ not json")
+
+        backend = SQLiteMetadataBackend(tmp_path)
+
+        assert backend.list_tables() == ["orders", "users"]
+        assert TableMetadata(**backend.load("users", "auth")) == sample_metadata("users", "auth")
+        assert backend.load("orders")["fields"][1]["description"] == "Journaled"
+        assert sorted(p.name for p in (tmp_path / "migrated_json").iterdir()) == [
+            "auth_users.json", "orders.journal", "orders.json"
+        ]
+        # Unreadable files stay in place for inspection
+        assert (tmp_path / "corrupted.json").exists()
+        assert backend.migrate_json_files() == 0
+        backend.close()
+
+
+class TestStorageWithSQLiteBackend:
+    """TableMetadataStorage running on the SQLite backend."""
+
+    def test_storage_roundtrip(self, tmp_path):
+        """Test store, list, update and delete through the storage API."""
+        storage = TableMetadataStorage(tmp_path, CacheManager(sweep_interval=0), backend="sqlite")
+        assert storage.store_table_metadata(sample_metadata())
+        assert storage.update_field_description("users", "email", "Login e-mail", "auth")
+
+        fresh = TableMetadataStorage(tmp_path, CacheManager(sweep_interval=0), backend="sqlite")
+        metadata = fresh.get_table_metadata("users", "auth")
+
+        assert fresh.list_stored_tables("auth") == ["users"]
+        assert metadata.fields[1].description == "Login e-mail"
+        assert not list(tmp_path.glob("*.json"))
+        assert fresh.delete_table_metadata("users", "auth")
+        assert fresh.list_stored_tables() == []
+
+    def test_backend_selected_by_environment(self, tmp_path, monkeypatch):
+        """Test the TABLE_METADATA_BACKEND default."""
+        monkeypatch.setattr("db2_mcp_server.storage.table_metadata.DEFAULT_METADATA_BACKEND", "sqlite")
+        storage = TableMetadataStorage(tmp_path, CacheManager(sweep_interval=0))
+        assert isinstance(storage.backend, SQLiteMetadataBackend)
+
+    def test_unknown_backend(self, tmp_path):
+        """Test that an unknown backend name is rejected."""
+        with pytest.raises(ValueError):
+            create_metadata_backend("xml", tmp_path)
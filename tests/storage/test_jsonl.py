@@ -0,0 +1,164 @@
+"""Tests for streaming JSON Lines export and import of table metadata."""
+
+import gzip
+import json
+from unittest.mock import patch
+
+import pytest
+
+from db2_mcp_server.cache import CacheManager
+from db2_mcp_server.storage.jsonl import (
+    EXPORT_FORMAT,
+    batched,
+    detect_compression,
+    is_jsonl_path,
+    open_text,
+    read_jsonl_lines,
+)
+from db2_mcp_server.storage.table_metadata import FieldInfo, TableMetadata, TableMetadataStorage
+
+
+def make_storage(path, backend="json"):
+    return TableMetadataStorage(path, CacheManager(sweep_interval=0), backend=backend)
+
+
+def populate(storage, count=5):
+    for i in range(count):
+        storage.store_table_metadata(TableMetadata(
+            table_name=f"table_{i}",
+            schema_name="app" if i % 2 else None,
+            fields=[FieldInfo(name="id", data_type="INTEGER", description=f"Key of table {i}")],
+        ))
+
+
+class TestJsonlFiles:
+    """File helpers."""
+
+    def test_path_detection(self):
+        """Test format and compression detection from file names."""
+        assert is_jsonl_path("backup.jsonl")
+        assert is_jsonl_path("backup.JSONL.gz")
+        assert is_jsonl_path("backup.ndjson.zst")
+        assert not is_jsonl_path("backup.json")
+        assert not is_jsonl_path("backup.json.gz")
+        assert detect_compression("backup.jsonl.gz") == "gzip"
+        assert detect_compression("backup.jsonl.zst") == "zstd"
+        assert detect_compression("backup.jsonl") is None
+
+    def test_headerless_files_are_accepted(self, tmp_path):
+        """Test reading plain JSON Lines written by other tools."""
+        path = tmp_path / "plain.jsonl"
+        path.write_text('{"table_name": "a"}\n\n{"table_name": "b"}\n')
+        assert list(read_jsonl_lines(path)) == ['{"table_name": "a"}', '{"table_name": "b"}']
+
+    def test_newer_export_version_is_rejected(self, tmp_path):
+        """Test that files from a newer format version are not misread."""
+        path = tmp_path / "future.jsonl"
+        path.write_text(json.dumps({"format": EXPORT_FORMAT, "version": 99}) + "\n")
+        with pytest.raises(ValueError):
+            list(read_jsonl_lines(path))
+
+    def test_batched(self):
+        """Test grouping into batches."""
+        assert list(batched(range(5), 2)) == [[0, 1], [2, 3], [4]]
+
+    def test_zstd_requires_optional_package(self, tmp_path):
+        """Test the error when zstandard is not installed."""
+        with patch.dict("sys.modules", {"zstandard": None}):
+            with pytest.raises(RuntimeError, match="zstandard"):
+                open_text(tmp_path / "backup.jsonl.zst", "w")
+
+
+@pytest.mark.parametrize("backend", ["json", "sqlite"])
+class TestStreamingExportImport:
+    """Export and import through TableMetadataStorage."""
+
+    def test_roundtrip(self, tmp_path, backend):
+        """Test that every table survives an export and import."""
+        source = make_storage(tmp_path / "source", backend)
+        populate(source)
+        source.update_field_description("table_0", "id", "Journaled description")
+        export_file = tmp_path / "backup.jsonl"
+
+        assert source.export_metadata_jsonl(export_file) == 5
+        lines = export_file.read_text().splitlines()
+        assert json.loads(lines[0])["format"] == EXPORT_FORMAT
+        assert len(lines) == 6
+
+        target = make_storage(tmp_path / "target", backend)
+        assert target.import_metadata_jsonl(export_file) == 5
+        assert sorted(target.list_stored_tables()) == [f"table_{i}" for i in range(5)]
+        assert target.get_table_metadata("table_0").fields[0].description == "Journaled description"
+        assert target.get_table_metadata("table_1", "app").schema_name == "app"
+
+    def test_gzip_and_filter(self, tmp_path, backend):
+        """Test compressed export of selected tables via export_metadata."""
+        source = make_storage(tmp_path / "source", backend)
+        populate(source)
+        export_file = tmp_path / "backup.jsonl.gz"
+
+        assert source.export_metadata(export_file, table_names=["table_1", "table_2"])
+        with gzip.open(export_file, "rt") as f:
+            assert len(f.readlines()) == 3
+
+        target = make_storage(tmp_path / "target", backend)
+        assert target.import_metadata(export_file)
+        assert target.list_stored_tables() == ["table_1", "table_2"]
+
+
+class TestStreamingImport:
+    """Import specifics."""
+
+    def write_export(self, path, records):
+        with open(path, "w") as f:
+            f.write(json.dumps({"format": EXPORT_FORMAT, "version": 1}) + "\n")
+            for record in records:
+                f.write((record if isinstance(record, str) else json.dumps(record)) + "\n")
+
+    def test_invalid_lines_are_skipped(self, tmp_path):
+        """Test that bad lines do not stop the import."""
+        path = tmp_path / "mixed.jsonl"
+        self.write_export(path, [
+            {"table_name": "good"},
+            {"table_name": "bad", "fields": "not a list"},
+            "{ truncated",
+            {"table_name": "also_good"},
+        ])
+        storage = make_storage(tmp_path / "store")
+
+        assert storage.import_metadata_jsonl(path) == 2
+        assert storage.list_stored_tables() == ["also_good", "good"]
+
+    def test_batches_commit_together_and_report_progress(self, tmp_path):
+        """Test that each batch is one backend commit."""
+        path = tmp_path / "many.jsonl"
+        self.write_export(path, [{"table_name": f"t{i}"} for i in range(7)])
+        storage = make_storage(tmp_path / "store", "sqlite")
+        progress = []
+
+        with patch.object(storage.backend, "save_many", wraps=storage.backend.save_many) as save_many:
+            assert storage.import_metadata_jsonl(path, batch_size=3, progress=progress.append) == 7
+
+        assert [len(call.args[0]) for call in save_many.call_args_list] == [3, 3, 1]
+        assert progress == [3, 6, 7]
+
+    def test_parallel_validation(self, tmp_path):
+        """Test importing with worker processes."""
+        path = tmp_path / "parallel.jsonl"
+        self.write_export(path, [{"table_name": f"t{i}", "fields": [{"name": "id"}]} for i in range(20)])
+        storage = make_storage(tmp_path / "store")
+
+        assert storage.import_metadata_jsonl(path, batch_size=4, workers=2) == 20
+        assert len(storage.list_stored_tables()) == 20
+
+    def test_import_invalidates_cached_tables(self, tmp_path):
+        """Test that imported tables replace stale cache entries."""
+        storage = make_storage(tmp_path / "store")
+        storage.store_table_metadata(TableMetadata(table_name="users", description="old"))
+        assert storage.get_table_metadata("users").description == "old"
+        path = tmp_path / "users.jsonl"
+        self.write_export(path, [{"table_name": "users", "description": "new"}])
+
+        storage.import_metadata_jsonl(path)
+
+        assert storage.get_table_metadata("users").description == "new"
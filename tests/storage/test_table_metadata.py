@@ -9,8 +9,10 @@ from unittest.mock import Mock, patch
 
 import pytest
 
+from db2_mcp_server.cache import CacheManager
 from db2_mcp_server.storage.table_metadata import (
     FieldInfo,
+    FrozenTableMetadata,
     TableMetadata,
     TableMetadataStorage,
     get_table_metadata_storage,
@@ -77,6 +79,33 @@ class TestTableMetadata:
         assert metadata.fields == []
         assert metadata.business_purpose is None
 
+    def test_freeze_creates_immutable_snapshot(self):
+        """Test that frozen metadata rejects changes and thaws to an editable copy."""
+        metadata = TableMetadata(
+            table_name="users",
+            fields=[FieldInfo(name="id", description="Primary key", constraints=["NOT NULL"])],
+            relationships={"orders": "users.id = orders.user_id"},
+            indexes=["PK_USERS"],
+        )
+        frozen = metadata.freeze()
+
+        assert isinstance(frozen, TableMetadata)
+        assert frozen.freeze() is frozen
+        assert frozen.thaw().model_dump() == metadata.model_dump()
+        with pytest.raises(Exception):
+            frozen.description = "changed"
+        with pytest.raises(Exception):
+            frozen.fields[0].description = "changed"
+        with pytest.raises(AttributeError):
+            frozen.fields.append(FieldInfo(name="x"))
+        with pytest.raises(TypeError):
+            frozen.relationships["x"] = "y"
+
+        thawed = frozen.thaw()
+        thawed.fields[0].description = "changed"
+        assert type(thawed) is TableMetadata
+        assert frozen.fields[0].description == "Primary key"
+
 
 class TestTableMetadataStorage:
     """Test TableMetadataStorage class."""
@@ -94,6 +123,7 @@ class TestTableMetadataStorage:
         cache.get.return_value = None
         cache.set.return_value = None
         cache.delete.return_value = None
+        cache.get_or_load.side_effect = lambda key, loader, **kwargs: loader()
         return cache
 
     @pytest.fixture
@@ -134,15 +164,17 @@ class TestTableMetadataStorage:
         fields = [FieldInfo(name="id", description="Primary key")]
         metadata = TableMetadata(table_name="users", fields=fields)
         
-        # Cache stores dictionary data, not TableMetadata objects
-        cache_data = metadata.model_dump()
-        storage.cache_manager.get.return_value = cache_data
+        # Cache stores frozen TableMetadata snapshots
+        cache_data = metadata.freeze()
+        storage.cache_manager.get_or_load.side_effect = None
+        storage.cache_manager.get_or_load.return_value = cache_data
         
         result = storage.get_table_metadata("users")
         
+        assert result is cache_data
         assert result.table_name == metadata.table_name
         assert len(result.fields) == len(metadata.fields)
-        storage.cache_manager.get.assert_called_with("table_metadata:default:users")
+        assert storage.cache_manager.get_or_load.call_args[0][0] == "table_metadata:default:users"
 
     def test_get_table_metadata_from_file(self, storage):
         """Test retrieving metadata from file when not in cache."""
@@ -330,6 +362,90 @@ class TestTableMetadataStorage:
 
 
 
+class TestFrozenCacheHits:
+    """Test cache hits with a real cache manager."""
+
+    def test_cache_hits_share_one_frozen_instance(self, tmp_path):
+        """Test that hits return the cached instance without re-validation."""
+        storage = TableMetadataStorage(tmp_path, CacheManager(sweep_interval=0))
+        storage.store_table_metadata(TableMetadata(
+            table_name="users",
+            fields=[FieldInfo(name="id", description="Primary key")],
+        ))
+
+        first = storage.get_table_metadata("users")
+        assert isinstance(first, FrozenTableMetadata)
+        assert storage.get_table_metadata("users") is first
+
+    def test_updates_do_not_modify_cached_instance(self, tmp_path):
+        """Test that field updates copy instead of mutating the shared snapshot."""
+        storage = TableMetadataStorage(tmp_path, CacheManager(sweep_interval=0))
+        storage.update_field_description("users", "id", "Primary key")
+        before = storage.get_table_metadata("users")
+
+        storage.update_field_description("users", "id", "Surrogate key")
+
+        assert before.fields[0].description == "Primary key"
+        assert storage.get_table_metadata("users").fields[0].description == "Surrogate key"
+
+    def test_load_from_file_is_frozen(self, tmp_path):
+        """Test that metadata read back from disk is cached frozen."""
+        TableMetadataStorage(tmp_path, CacheManager(sweep_interval=0)).store_table_metadata(
+            TableMetadata(table_name="users", schema_name="auth")
+        )
+        fresh = TableMetadataStorage(tmp_path, CacheManager(sweep_interval=0))
+        result = fresh.get_table_metadata("users", "auth")
+        assert isinstance(result, FrozenTableMetadata)
+        assert fresh.store_table_metadata(result)
+
+
+class TestConcurrentWrites:
+    """Test per-table locking and atomic files."""
+
+    def test_concurrent_field_updates_are_not_lost(self, tmp_path):
+        """Test that read-modify-write updates to one table serialize."""
+        storage = TableMetadataStorage(tmp_path, CacheManager(sweep_interval=0))
+        threads = [
+            threading.Thread(target=storage.update_field_description, args=("users", f"col{i}", f"Column {i}"))
+            for i in range(20)
+        ]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        fields = TableMetadataStorage(tmp_path, CacheManager(sweep_interval=0)).get_table_metadata("users").fields
+        assert sorted(f.name for f in fields) == sorted(f"col{i}" for i in range(20))
+
+    def test_different_tables_do_not_share_a_lock(self, tmp_path):
+        """Test that a write to one table does not wait for another table."""
+        storage = TableMetadataStorage(tmp_path, CacheManager(sweep_interval=0))
+        names = [f"table_{i}" for i in range(10)]
+        locks = {id(storage._table_lock(name, "app")) for name in names}
+        assert len(locks) > 1
+
+        held = storage._table_lock("table_0", "app")
+        other = next(name for name in names if storage._table_lock(name, "app") is not held)
+        with held:
+            finished = threading.Event()
+            threading.Thread(
+                target=lambda: (storage.store_table_metadata(TableMetadata(table_name=other, schema_name="app")),
+                                finished.set())
+            ).start()
+            assert finished.wait(5)
+
+    def test_failed_write_keeps_previous_file(self, tmp_path):
+        """Test that a write failing midway leaves the old JSON intact."""
+        storage = TableMetadataStorage(tmp_path, CacheManager(sweep_interval=0))
+        storage.store_table_metadata(TableMetadata(table_name="users", description="v1"))
+
+        with patch('db2_mcp_server.storage.backends.os.fsync', side_effect=OSError("disk full")):
+            assert storage.store_table_metadata(TableMetadata(table_name="users", description="v2")) is False
+
+        assert json.loads((tmp_path / "users.json").read_text())["description"] == "v1"
+        assert not list(tmp_path.glob(".*.tmp"))
+
+
 class TestUtilityFunctions:
     """Test utility functions."""
 
@@ -564,6 +680,7 @@ class TestTableMetadataStorageAdvanced:
         cache.get.return_value = None
         cache.set.return_value = None
         cache.delete.return_value = None
+        cache.get_or_load.side_effect = lambda key, loader, **kwargs: loader()
         return cache
 
     @pytest.fixture
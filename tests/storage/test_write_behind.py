@@ -0,0 +1,176 @@
+"""Tests for write-behind persistence of table metadata."""
+
+import threading
+import time
+
+from db2_mcp_server.cache import CacheManager
+from db2_mcp_server.storage.backends import JsonFileBackend, MetadataBackend
+from db2_mcp_server.storage.table_metadata import TableMetadata, TableMetadataStorage
+from db2_mcp_server.storage.write_behind import WriteBehindQueue
+
+
+class RecordingBackend(MetadataBackend):
+    """In-memory backend that records every call."""
+
+    def __init__(self, fail=False):
+        self.tables = {}
+        self.calls = []
+        self.fail = fail
+        self.gate = threading.Event()
+        self.gate.set()
+
+    def load(self, table_name, schema_name=None):
+        return self.tables.get((schema_name, table_name))
+
+    def save(self, data):
+        self.gate.wait()
+        if self.fail:
+            raise OSError("disk full")
+        self.calls.append(("save", data["table_name"], data["description"]))
+        self.tables[(data["schema_name"], data["table_name"])] = data
+
+    def delete(self, table_name, schema_name=None):
+        self.calls.append(("delete", table_name))
+        return self.tables.pop((schema_name, table_name), None) is not None
+
+    def list_tables(self, schema_name=None):
+        return sorted(t for s, t in self.tables if schema_name is None or s == schema_name)
+
+
+def metadata(description, table_name="users", schema_name="auth"):
+    return TableMetadata(table_name=table_name, schema_name=schema_name, description=description)
+
+
+class TestWriteBehindQueue:
+    """Queue mechanics."""
+
+    def test_repeated_writes_coalesce(self):
+        """Test that only the latest operation per table is written."""
+        backend = RecordingBackend()
+        queue = WriteBehindQueue(backend, flush_interval=60)
+        for i in range(5):
+            queue.save(metadata(f"v{i}"))
+        queue.save(metadata("orders", table_name="orders"))
+
+        assert queue.flush() == 2
+        assert sorted(backend.calls) == [("save", "orders", "orders"), ("save", "users", "v4")]
+        assert queue.coalesced == 4
+        queue.close()
+
+    def test_delete_replaces_pending_save(self):
+        """Test that a delete supersedes a save that was never written."""
+        backend = RecordingBackend()
+        queue = WriteBehindQueue(backend, flush_interval=60)
+        queue.save(metadata("v1"))
+        queue.delete("users", "auth")
+
+        assert queue.lookup("users", "auth") == (True, None)
+        queue.flush()
+        assert backend.calls == [("delete", "users")]
+        assert queue.lookup("users", "auth") == (False, None)
+        queue.close()
+
+    def test_writer_flushes_within_interval(self):
+        """Test that the background writer persists without an explicit flush."""
+        backend = RecordingBackend()
+        queue = WriteBehindQueue(backend, flush_interval=0.05)
+        queue.save(metadata("v1"))
+
+        deadline = time.monotonic() + 5
+        while not backend.calls and time.monotonic() < deadline:
+            time.sleep(0.01)
+
+        assert backend.calls == [("save", "users", "v1")]
+        queue.close()
+
+    def test_inflight_writes_stay_visible(self):
+        """Test that a lookup during a slow write returns the pending value."""
+        backend = RecordingBackend()
+        backend.gate.clear()
+        queue = WriteBehindQueue(backend, flush_interval=60)
+        queue.save(metadata("v1"))
+        flusher = threading.Thread(target=queue.flush)
+        flusher.start()
+
+        pending, value = queue.lookup("users", "auth")
+        backend.gate.set()
+        flusher.join()
+
+        assert pending and value.description == "v1"
+        assert len(queue) == 0
+        queue.close()
+
+    def test_failed_writes_are_retried(self):
+        """Test that an operation that failed to persist stays queued."""
+        backend = RecordingBackend(fail=True)
+        queue = WriteBehindQueue(backend, flush_interval=60)
+        queue.save(metadata("v1"))
+
+        assert queue.flush() == 0
+        assert len(queue) == 1
+        backend.fail = False
+        assert queue.flush() == 1
+        assert backend.tables[("auth", "users")]["description"] == "v1"
+        queue.close()
+
+    def test_close_drains_and_later_writes_are_synchronous(self):
+        """Test the shutdown drain."""
+        backend = RecordingBackend()
+        queue = WriteBehindQueue(backend, flush_interval=60)
+        queue.save(metadata("v1"))
+        queue.close()
+        assert backend.calls == [("save", "users", "v1")]
+
+        queue.save(metadata("v2"))
+        assert backend.calls[-1] == ("save", "users", "v2")
+
+
+class TestStorageWriteBehind:
+    """TableMetadataStorage in write-behind mode."""
+
+    def test_updates_are_visible_before_flush(self, tmp_path):
+        """Test that reads see queued updates, even after a cache eviction."""
+        cache = CacheManager(sweep_interval=0)
+        storage = TableMetadataStorage(tmp_path, cache, backend="json", write_behind=True)
+        storage.write_behind.flush_interval = 60
+        storage.update_field_description("users", "id", "Primary key", "auth")
+        storage.update_field_description("users", "email", "Login e-mail", "auth")
+
+        assert not (tmp_path / "auth_users.json").exists()
+        cache.clear()
+        fields = storage.get_table_metadata("users", "auth").fields
+        assert [f.name for f in fields] == ["id", "email"]
+        storage.close()
+
+    def test_flush_persists_one_write_per_table(self, tmp_path):
+        """Test that a burst of updates becomes one file write."""
+        storage = TableMetadataStorage(tmp_path, CacheManager(sweep_interval=0), backend="json", write_behind=True)
+        storage.write_behind.flush_interval = 60
+        for i in range(10):
+            storage.update_field_description("users", f"col{i}", f"Column {i}", "auth")
+
+        assert storage.flush() == 1
+        stored = JsonFileBackend(tmp_path).load("users", "auth")
+        assert len(stored["fields"]) == 10
+        storage.close()
+
+    def test_listing_and_delete(self, tmp_path):
+        """Test that listings include pending stores and honour pending deletes."""
+        storage = TableMetadataStorage(tmp_path, CacheManager(sweep_interval=0), backend="json", write_behind=True)
+        storage.write_behind.flush_interval = 60
+        storage.store_table_metadata(metadata("users"))
+        storage.store_table_metadata(metadata("orders", table_name="orders"))
+        assert storage.list_stored_tables("auth") == ["orders", "users"]
+
+        storage.delete_table_metadata("orders", "auth")
+        assert storage.get_table_metadata("orders", "auth") is None
+        assert storage.list_stored_tables() == ["users"]
+        storage.close()
+
+    def test_disabled_by_default(self, tmp_path):
+        """Test that stores are synchronous unless write-behind is enabled."""
+        storage = TableMetadataStorage(tmp_path, CacheManager(sweep_interval=0), backend="json")
+        storage.store_table_metadata(metadata("users"))
+
+        assert storage.write_behind is None
+        assert (tmp_path / "auth_users.json").exists()
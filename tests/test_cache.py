@@ -1,9 +1,22 @@
 """Tests for cache module."""
 
+import asyncio
 import pytest
 import time
 import threading
-from db2_mcp_server.cache import CacheManager
+from unittest.mock import MagicMock
+from db2_mcp_server.cache import (
+  REFRESH_AHEAD_MIN_HITS,
+  CacheManager,
+  ShardedCacheManager,
+  estimate_size,
+  get_cache_stats,
+  key_namespace,
+  namespace_tag,
+  register_cache,
+  schema_tag,
+  table_tag,
+)
 
 
 @pytest.fixture
@@ -60,3 +73,621 @@ def test_thread_safety(cache):
 
   assert len(results) == 1000
   assert all(isinstance(x, int) for x in results)
+
+
+def test_max_entries_evicts_least_recently_used():
+  """Test LRU eviction when max_entries is exceeded."""
+  cache = CacheManager(max_entries=2, max_bytes=0)
+  cache.set("a", 1)
+  cache.set("b", 2)
+  cache.get("a")  # a becomes most recently used
+  cache.set("c", 3)
+
+  assert cache.get("a") == 1
+  assert cache.get("b") is None
+  assert cache.get("c") == 3
+  assert len(cache) == 2
+
+
+def test_max_bytes_evicts_until_within_budget():
+  """Test size-aware eviction against max_bytes."""
+  cache = CacheManager(max_entries=0, max_bytes=300, sizeof=lambda value: 100)
+  for i in range(5):
+    cache.set(f"key_{i}", i)
+
+  assert len(cache) == 3
+  assert cache.total_bytes == 300
+  assert cache.get("key_0") is None
+  assert cache.get("key_4") == 4
+
+
+def test_oversized_value_rejected():
+  """Test that a single value larger than max_bytes is not cached."""
+  cache = CacheManager(max_bytes=10, sizeof=lambda value: 100)
+  assert cache.set("big", "x" * 1000) is False
+  assert cache.get("big") is None
+  assert cache.total_bytes == 0
+
+
+def test_oversized_value_drops_previous_value():
+  """Test that an oversized overwrite does not leave the stale value behind."""
+  sizes = {"small": 5, "large": 100}
+  cache = CacheManager(max_bytes=10, sizeof=lambda value: sizes[value])
+  cache.set("k", "small", tags=["t"])
+  assert cache.set("k", "large") is False
+  assert cache.get("k") is None
+  assert cache.total_bytes == 0
+  assert cache.invalidate_tag("t") == 0
+
+
+def test_oversized_value_drops_previous_l2_value():
+  """Test that an oversized overwrite also drops the key from the second tier."""
+  l2 = MagicMock()
+  cache = CacheManager(max_bytes=10, sizeof=len, sweep_interval=0, l2=l2)
+  assert cache.set("k", "x" * 100) is False
+  l2.set.assert_not_called()
+  l2.delete.assert_called_once_with("k")
+
+
+def test_replacing_entry_updates_size():
+  """Test that overwriting a key accounts for the new size only."""
+  sizes = {"small": 10, "large": 50}
+  cache = CacheManager(max_bytes=0, sizeof=lambda value: sizes[value])
+  cache.set("k", "small")
+  cache.set("k", "large")
+  assert cache.total_bytes == 50
+  cache.delete("k")
+  assert cache.total_bytes == 0
+
+
+def test_eviction_callbacks():
+  """Test eviction callbacks receive key, value and reason."""
+  events = []
+  cache = CacheManager(max_entries=1, max_bytes=0, on_evict=lambda k, v, r: events.append((k, v, r)))
+  cache.set("a", 1)
+  cache.set("b", 2)
+  cache.set("b", 3)
+  cache.delete("b")
+  cache.set("temp", 4, ttl=0)
+  cache.get("temp")
+
+  assert events == [
+    ("a", 1, "size"),
+    ("b", 2, "replaced"),
+    ("b", 3, "deleted"),
+    ("temp", 4, "expired"),
+  ]
+
+
+def test_failing_eviction_callback_does_not_break_cache():
+  """Test that an exception in a callback is contained."""
+  cache = CacheManager(max_entries=1, max_bytes=0)
+
+  def boom(key, value, reason):
+    raise RuntimeError("callback failure")
+
+  cache.add_eviction_listener(boom)
+  cache.set("a", 1)
+  assert cache.set("b", 2) is True
+  assert cache.get("b") == 2
+
+
+def test_estimate_size_counts_nested_content():
+  """Test that size estimation grows with nested content."""
+  small = {"fields": [{"name": "id"}]}
+  large = {"fields": [{"name": f"column_{i}", "description": "x" * 50} for i in range(100)]}
+  assert estimate_size(large) > estimate_size(small) > 0
+
+
+class FakeClock:
+  """Manually advanced monotonic clock for deterministic expiry tests."""
+
+  def __init__(self):
+    self.now = 1000.0
+
+  def __call__(self):
+    return self.now
+
+
+def test_purge_expired_reclaims_unread_keys():
+  """Test that expired keys are reclaimed without being read."""
+  clock = FakeClock()
+  events = []
+  cache = CacheManager(sweep_interval=0, clock=clock, on_evict=lambda k, v, r: events.append((k, r)))
+  cache.set("short", 1, ttl=5)
+  cache.set("long", 2, ttl=50)
+
+  clock.now += 10
+  assert cache.purge_expired() == 1
+  assert len(cache) == 1
+  assert events == [("short", "expired")]
+  assert cache.get("long") == 2
+
+
+def test_purge_skips_superseded_heap_records():
+  """Test that rewriting a key with a longer TTL keeps it alive."""
+  clock = FakeClock()
+  cache = CacheManager(sweep_interval=0, clock=clock)
+  cache.set("key", "old", ttl=5)
+  cache.set("key", "new", ttl=100)
+  cache.delete("key")
+  cache.set("key", "newest", ttl=100)
+
+  clock.now += 10
+  assert cache.purge_expired() == 0
+  assert cache.get("key") == "newest"
+
+
+def test_expiry_uses_monotonic_clock():
+  """Test that wall-clock changes do not affect expiry."""
+  clock = FakeClock()
+  cache = CacheManager(sweep_interval=0, clock=clock)
+  cache.set("key", "value", ttl=60)
+
+  clock.now += 59
+  assert cache.get("key") == "value"
+  clock.now += 1
+  assert cache.get("key") is None
+
+
+def test_expiry_heap_is_compacted():
+  """Test that repeated overwrites do not grow the expiry heap without bound."""
+  cache = CacheManager(sweep_interval=0)
+  for i in range(1000):
+    cache.set("same_key", i)
+  assert len(cache._expiry_heap) <= 2 * len(cache) + 65
+
+
+def test_background_sweeper_reclaims_expired_entries():
+  """Test that the background sweeper removes expired entries on its own."""
+  cache = CacheManager(sweep_interval=0.05)
+  try:
+    cache.set("temp", "value", ttl=0)
+    deadline = time.monotonic() + 2
+    while len(cache) and time.monotonic() < deadline:
+      time.sleep(0.02)
+    assert len(cache) == 0
+  finally:
+    cache.stop_sweeper()
+
+
+def test_stop_sweeper_prevents_restart():
+  """Test that a stopped sweeper is not restarted by later writes."""
+  cache = CacheManager(sweep_interval=10)
+  cache.set("a", 1)
+  assert cache._sweeper is not None
+  cache.stop_sweeper()
+  cache.set("b", 2)
+  assert cache._sweeper is None
+
+
+@pytest.fixture
+def sharded_cache():
+  """Fixture providing a ShardedCacheManager without a sweeper thread."""
+  return ShardedCacheManager(shards=4, sweep_interval=0)
+
+
+def test_sharded_basic_operations(sharded_cache):
+  """Test set/get/delete/clear across shards."""
+  for i in range(50):
+    sharded_cache.set(f"key_{i}", i)
+  assert len(sharded_cache) == 50
+  assert all(sharded_cache.get(f"key_{i}") == i for i in range(50))
+  assert sharded_cache.delete("key_0") is True
+  assert sharded_cache.delete("key_0") is False
+  sharded_cache.clear()
+  assert len(sharded_cache) == 0
+
+
+def test_sharded_routes_key_to_single_shard(sharded_cache):
+  """Test that a key always maps to the same shard."""
+  shard = sharded_cache.shard_for("table_metadata:APP:USERS")
+  sharded_cache.set("table_metadata:APP:USERS", "value")
+  assert shard.get("table_metadata:APP:USERS") == "value"
+  assert sharded_cache.shard_count == 4
+
+
+def test_sharded_limits_split_across_shards():
+  """Test that entry limits are divided between shards."""
+  cache = ShardedCacheManager(shards=4, max_entries=40, max_bytes=0, sweep_interval=0)
+  for i in range(1000):
+    cache.set(f"key_{i}", i)
+  assert len(cache) <= 40
+
+
+def test_create_cache_manager_shards_only_when_configured(monkeypatch):
+  """Test that sharding is opt-in through CACHE_SHARDS."""
+  from db2_mcp_server import cache as cache_module
+  monkeypatch.setattr(cache_module, "DEFAULT_SHARDS", 0)
+  assert type(cache_module.create_cache_manager(sweep_interval=0)) is CacheManager
+  monkeypatch.setattr(cache_module, "DEFAULT_SHARDS", 4)
+  sharded = cache_module.create_cache_manager(sweep_interval=0)
+  assert isinstance(sharded, ShardedCacheManager)
+  assert sharded.shard_count == 4
+
+
+def test_sharded_purge_and_eviction_listener():
+  """Test purge_expired and eviction listeners across all shards."""
+  clock = FakeClock()
+  events = []
+  cache = ShardedCacheManager(shards=4, sweep_interval=0, clock=clock)
+  cache.add_eviction_listener(lambda k, v, r: events.append(r))
+  for i in range(20):
+    cache.set(f"key_{i}", i, ttl=5)
+  clock.now += 10
+  assert cache.purge_expired() == 20
+  assert events == ["expired"] * 20
+
+
+def test_sharded_calls_l2_once_per_operation():
+  """Test that operations spanning every shard reach the second level only once."""
+  l2 = MagicMock()
+  l2.get.return_value = None
+  cache = ShardedCacheManager(shards=16, sweep_interval=0, l2=l2)
+  for i in range(32):
+    cache.set(f"key_{i}", i, tags=["t"])
+  assert l2.set.call_count == 32
+
+  assert cache.invalidate_tag("t") == 32
+  l2.invalidate_tag.assert_called_once_with("t")
+  cache.purge_expired()
+  l2.purge_expired.assert_called_once_with()
+  cache.clear()
+  l2.clear.assert_called_once_with()
+  cache.delete("key_0")
+  l2.delete.assert_called_once_with("key_0")
+  assert cache.get("key_1") is None
+  l2.get.assert_called_once_with("key_1")
+
+
+def test_sharded_default_ttl_applies_to_all_shards(sharded_cache):
+  """Test that default_ttl propagates to every shard."""
+  sharded_cache.default_ttl = 42
+  assert sharded_cache.default_ttl == 42
+  assert all(shard.default_ttl == 42 for shard in sharded_cache._shards)
+
+
+def test_sharded_thread_safety(sharded_cache):
+  """Test concurrent access through the sharded cache."""
+  results = []
+
+  def worker():
+    for i in range(100):
+      sharded_cache.set(f"key_{i}", i)
+      results.append(sharded_cache.get(f"key_{i}"))
+
+  threads = [threading.Thread(target=worker) for _ in range(10)]
+  for t in threads:
+    t.start()
+  for t in threads:
+    t.join()
+
+  assert len(results) == 1000
+  assert all(isinstance(x, int) for x in results)
+
+
+def test_get_or_load_caches_loaded_value(cache):
+  """Test that get_or_load caches the loader result."""
+  calls = []
+
+  def loader():
+    calls.append(1)
+    return "loaded"
+
+  assert cache.get_or_load("key", loader) == "loaded"
+  assert cache.get_or_load("key", loader) == "loaded"
+  assert len(calls) == 1
+
+
+def test_get_or_load_does_not_cache_none(cache):
+  """Test that a None result is returned but not cached."""
+  calls = []
+
+  def loader():
+    calls.append(1)
+    return None
+
+  assert cache.get_or_load("missing", loader) is None
+  assert cache.get_or_load("missing", loader) is None
+  assert len(calls) == 2
+
+
+def test_get_or_load_coalesces_concurrent_misses(cache):
+  """Test that concurrent misses on one key run a single loader."""
+  calls = []
+  started = threading.Event()
+
+  def slow_loader():
+    calls.append(1)
+    started.set()
+    time.sleep(0.1)
+    return "value"
+
+  results = []
+
+  def worker():
+    results.append(cache.get_or_load("hot_key", slow_loader))
+
+  threads = [threading.Thread(target=worker) for _ in range(20)]
+  for t in threads:
+    t.start()
+  for t in threads:
+    t.join()
+
+  assert len(calls) == 1
+  assert results == ["value"] * 20
+
+
+def test_get_or_load_propagates_errors_to_waiters(cache):
+  """Test that a failing loader raises in every coalesced caller."""
+  release = threading.Event()
+
+  def failing_loader():
+    release.wait(1)
+    raise RuntimeError("DB2 unavailable")
+
+  errors = []
+
+  def worker():
+    try:
+      cache.get_or_load("bad_key", failing_loader)
+    except RuntimeError as e:
+      errors.append(str(e))
+
+  threads = [threading.Thread(target=worker) for _ in range(5)]
+  for t in threads:
+    t.start()
+  time.sleep(0.05)
+  release.set()
+  for t in threads:
+    t.join()
+
+  assert errors == ["DB2 unavailable"] * 5
+  # The failed flight is retired so the next call retries
+  assert cache.get_or_load("bad_key", lambda: "recovered") == "recovered"
+
+
+def test_aget_or_load_coalesces_concurrent_misses(cache):
+  """Test the async flavour coalesces concurrent misses."""
+  calls = []
+
+  async def loader():
+    calls.append(1)
+    await asyncio.sleep(0.05)
+    return "async_value"
+
+  async def main():
+    return await asyncio.gather(*(cache.aget_or_load("akey", loader) for _ in range(10)))
+
+  assert asyncio.run(main()) == ["async_value"] * 10
+  assert len(calls) == 1
+  assert cache.get("akey") == "async_value"
+
+
+def test_sharded_get_or_load(sharded_cache):
+  """Test get_or_load through the sharded cache."""
+  assert sharded_cache.get_or_load("key", lambda: 1) == 1
+  assert sharded_cache.get_or_load("key", lambda: 2) == 1
+
+
+def _wait_for_refresh(cache, key):
+  """Block until any background refresh of ``key`` has finished."""
+  flight = cache._inflight.get(key)
+  if flight is not None:
+    flight.result(timeout=5)
+
+
+def test_get_or_load_serves_stale_while_revalidating():
+  """Test that stale values are returned while one refresh runs in the background."""
+  clock = FakeClock()
+  cache = CacheManager(sweep_interval=0, clock=clock, refresh_ahead_ratio=0)
+  assert cache.get_or_load("key", lambda: "v1", ttl=100, soft_ttl=10) == "v1"
+
+  clock.now += 20  # past soft TTL, within hard TTL
+  release = threading.Event()
+  calls = []
+
+  def slow_loader():
+    calls.append(1)
+    release.wait(5)
+    return "v2"
+
+  assert cache.get_or_load("key", slow_loader, ttl=100, soft_ttl=10) == "v1"
+  assert cache.get_or_load("key", slow_loader, ttl=100, soft_ttl=10) == "v1"
+  release.set()
+  _wait_for_refresh(cache, "key")
+
+  assert len(calls) == 1
+  assert cache.get("key") == "v2"
+
+
+def test_get_or_load_reloads_after_hard_ttl():
+  """Test that values past their hard TTL are loaded synchronously."""
+  clock = FakeClock()
+  cache = CacheManager(sweep_interval=0, clock=clock)
+  cache.get_or_load("key", lambda: "v1", ttl=100, soft_ttl=10)
+
+  clock.now += 100
+  assert cache.get_or_load("key", lambda: "v2", ttl=100, soft_ttl=10) == "v2"
+
+
+def test_failed_background_refresh_keeps_stale_value():
+  """Test that a failing refresh leaves the stale value in place."""
+  clock = FakeClock()
+  cache = CacheManager(sweep_interval=0, clock=clock, refresh_ahead_ratio=0)
+  cache.set("key", "v1", ttl=100, soft_ttl=10)
+  clock.now += 20
+
+  def failing_loader():
+    raise RuntimeError("DB2 unavailable")
+
+  assert cache.get_or_load("key", failing_loader) == "v1"
+  with pytest.raises(RuntimeError):
+    _wait_for_refresh(cache, "key")
+  assert cache.get("key") == "v1"
+
+
+def test_refresh_ahead_only_for_hot_keys():
+  """Test that hot keys are refreshed before going stale and cold keys are not."""
+  clock = FakeClock()
+  cache = CacheManager(sweep_interval=0, clock=clock, refresh_ahead_ratio=0.2)
+  cache.set("hot", "v1", ttl=100)
+  cache.set("cold", "v1", ttl=100)
+  for _ in range(REFRESH_AHEAD_MIN_HITS):
+    cache.get("hot")
+
+  clock.now += 90  # inside the refresh-ahead window, still fresh
+  assert cache.get_or_load("hot", lambda: "v2", ttl=100) == "v1"
+  _wait_for_refresh(cache, "hot")
+  assert cache.get("hot") == "v2"
+
+  calls = []
+  assert cache.get_or_load("cold", lambda: calls.append(1) or "v2", ttl=100) == "v1"
+  assert calls == []
+
+
+def test_aget_or_load_serves_stale_while_revalidating():
+  """Test the async flavour refreshes stale values in the background."""
+  clock = FakeClock()
+  cache = CacheManager(sweep_interval=0, clock=clock, refresh_ahead_ratio=0)
+  cache.set("key", "v1", ttl=100, soft_ttl=10)
+  clock.now += 20
+
+  async def loader():
+    return "v2"
+
+  async def main():
+    stale = await cache.aget_or_load("key", loader, ttl=100, soft_ttl=10)
+    await asyncio.gather(*cache._refresh_tasks)
+    return stale
+
+  assert asyncio.run(main()) == "v1"
+  assert cache.get("key") == "v2"
+
+
+def test_key_namespace():
+  """Test that namespaces are key prefixes up to the first colon."""
+  assert key_namespace("table_metadata:hr:employees") == "table_metadata"
+  assert key_namespace("plain_key") == "default"
+
+
+def test_stats_track_hits_misses_and_gauges():
+  """Test per-namespace hit, miss, entry and byte accounting."""
+  clock = FakeClock()
+  cache = CacheManager(max_entries=2, sweep_interval=0, clock=clock, sizeof=lambda v: 10)
+  cache.set("tables:a", 1, ttl=10)
+  cache.get("tables:a")
+  cache.get("tables:missing")
+  cache.set("columns:a", 2)
+  cache.set("columns:b", 3)  # evicts tables:a
+
+  stats = cache.stats()
+  tables = stats["namespaces"]["tables"]
+  columns = stats["namespaces"]["columns"]
+  assert stats["entries"] == 2
+  assert stats["bytes"] == 20
+  assert tables["hits"] == 1
+  assert tables["misses"] == 1
+  assert tables["hit_ratio"] == 0.5
+  assert tables["evictions"] == 1
+  assert tables["entries"] == 0
+  assert columns["entries"] == 2
+  assert columns["bytes"] == 20
+
+  cache.clear()
+  assert cache.stats()["namespaces"]["columns"]["entries"] == 0
+
+
+def test_stats_track_expirations_and_loads():
+  """Test expiration counting and loader latency recording."""
+  clock = FakeClock()
+  cache = CacheManager(sweep_interval=0, clock=clock)
+  cache.get_or_load("tables:a", lambda: "v", ttl=10)
+  with pytest.raises(RuntimeError):
+    cache.get_or_load("tables:b", lambda: (_ for _ in ()).throw(RuntimeError("boom")))
+  clock.now += 10
+  cache.purge_expired()
+
+  tables = cache.stats()["namespaces"]["tables"]
+  assert tables["misses"] == 2
+  assert tables["loads"] == 1
+  assert tables["load_errors"] == 1
+  assert tables["expirations"] == 1
+  assert tables["avg_load_ms"] >= 0
+
+  cache.reset_stats()
+  tables = cache.stats()["namespaces"]["tables"]
+  assert tables["loads"] == 0
+  assert tables["entries"] == 0
+
+
+def test_sharded_stats_aggregate_across_shards(sharded_cache):
+  """Test that every shard reports into one set of namespace statistics."""
+  for i in range(20):
+    sharded_cache.set(f"tables:{i}", i)
+    sharded_cache.get(f"tables:{i}")
+
+  stats = sharded_cache.stats()
+  assert stats["entries"] == 20
+  assert stats["namespaces"]["tables"]["hits"] == 20
+  assert stats["namespaces"]["tables"]["entries"] == 20
+
+
+def test_get_cache_stats_reports_registered_caches():
+  """Test the registry used by the cache statistics resource."""
+  cache = CacheManager(sweep_interval=0)
+  register_cache("test_registry", cache)
+  cache.set("tables:a", 1)
+
+  stats = get_cache_stats()
+  assert "shared" in stats
+  assert stats["test_registry"]["namespaces"]["tables"]["entries"] == 1
+
+
+def test_invalidate_tag_removes_only_tagged_entries(cache):
+  """Test that invalidating a tag drops exactly the entries carrying it."""
+  cache.set("tables:hr:a", 1, tags=[schema_tag("hr"), table_tag("hr", "a")])
+  cache.set("tables:hr:b", 2, tags=[schema_tag("hr")])
+  cache.set("tables:sales:c", 3, tags=[schema_tag("sales")])
+  evicted = []
+  cache.add_eviction_listener(lambda k, v, reason: evicted.append((k, reason)))
+
+  assert cache.invalidate_tag(schema_tag("HR")) == 2
+  assert cache.get("tables:hr:a") is None
+  assert cache.get("tables:hr:b") is None
+  assert cache.get("tables:sales:c") == 3
+  assert sorted(evicted) == [("tables:hr:a", "invalidated"), ("tables:hr:b", "invalidated")]
+  assert cache.stats()["namespaces"]["tables"]["invalidations"] == 2
+  # The table tag pointed at an already removed key
+  assert cache.invalidate_tag(table_tag("hr", "a")) == 0
+  assert cache.invalidate_tag("unknown") == 0
+
+
+def test_tag_index_follows_overwrites_and_evictions():
+  """Test that replaced and evicted entries leave the tag index."""
+  cache = CacheManager(max_entries=1, sweep_interval=0)
+  cache.set("key", 1, tags=["old"])
+  cache.set("key", 2, tags=["new"])
+  assert cache.invalidate_tag("old") == 0
+  assert cache.get("key") == 2
+
+  cache.set("other", 3, tags=["new"])  # evicts "key"
+  assert cache.invalidate_tag("new") == 1
+  assert cache._tag_index == {}
+
+
+def test_get_or_load_tags_loaded_value(cache):
+  """Test that values stored by get_or_load carry the given tags."""
+  cache.get_or_load("columns:t", lambda: ["id"], tags=[namespace_tag("columns")])
+  assert cache.invalidate_tag(namespace_tag("columns")) == 1
+  assert cache.get("columns:t") is None
+
+
+def test_sharded_invalidate_tag(sharded_cache):
+  """Test tag invalidation across every shard."""
+  for i in range(20):
+    sharded_cache.set(f"tables:hr:{i}", i, tags=[schema_tag("hr")])
+  sharded_cache.set("tables:sales:x", 1, tags=[schema_tag("sales")])
+
+  assert sharded_cache.invalidate_tag(schema_tag("hr")) == 20
+  assert len(sharded_cache) == 1
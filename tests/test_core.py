@@ -188,4 +188,24 @@ def test_dotenv_loaded():
     # This test verifies that the module imports without error
     # The actual dotenv loading happens at module level
     from db2_mcp_server import core
-    assert core is not None
\ No newline at end of file
+    assert core is not None
+@patch('db2_mcp_server.core.get_connection_pool')
+def test_warm_up_pool(mock_get_pool):
+    """Test that startup warm-up opens pool connections and tolerates an unreachable DB2."""
+    from db2_mcp_server.core import warm_up_pool
+    mock_get_pool.return_value.warm_up.return_value = 2
+    warm_up_pool()
+    mock_get_pool.return_value.warm_up.assert_called_once_with()
+
+    mock_get_pool.return_value.warm_up.side_effect = ConnectionError("refused")
+    warm_up_pool()  # Logged, not raised
+
+@patch('db2_mcp_server.core.threading.Thread')
+@patch('db2_mcp_server.core.mcp')
+@patch('sys.argv', ['test_script'])
+def test_main_starts_pool_warm_up(mock_mcp_instance, mock_thread):
+    """Test that main warms the connection pool up in the background."""
+    from db2_mcp_server.core import warm_up_pool
+    main()
+    mock_thread.assert_any_call(target=warm_up_pool, name="db2-pool-warm-up", daemon=True)
+    mock_thread.return_value.start.assert_called()
@@ -0,0 +1,133 @@
+"""Tests for the on-disk second-level cache tier."""
+
+import pytest
+
+from db2_mcp_server.cache import CacheManager, schema_tag
+from db2_mcp_server.disk_cache import DiskCache
+
+
+class FakeClock:
+  """Manually advanced clock for deterministic expiry tests."""
+
+  def __init__(self, now=1000.0):
+    self.now = now
+
+  def __call__(self):
+    return self.now
+
+
+@pytest.fixture
+def wall_clock():
+  return FakeClock(1_700_000_000.0)
+
+
+@pytest.fixture
+def disk(tmp_path, wall_clock):
+  store = DiskCache(tmp_path / "cache.db", clock=wall_clock)
+  yield store
+  store.close()
+
+
+def test_disk_cache_roundtrip_and_expiry(disk, wall_clock):
+  """Test storing, reading and expiring entries."""
+  disk.set("tables:a", {"rows": [1, 2]}, ttl=100, soft_ttl=10, tags=["t1"])
+
+  entry = disk.get("tables:a")
+  assert entry.value == {"rows": [1, 2]}
+  assert entry.ttl == 100
+  assert entry.soft_ttl == 10
+  assert entry.tags == ["t1"]
+
+  wall_clock.now += 100
+  assert disk.get("tables:a") is None
+  assert disk.purge_expired() == 1
+  assert len(disk) == 0
+
+
+def test_disk_cache_delete_and_invalidate_tag(disk):
+  """Test key deletion and tag invalidation on disk."""
+  disk.set("a", 1, ttl=100, soft_ttl=100, tags=[schema_tag("hr")])
+  disk.set("b", 2, ttl=100, soft_ttl=100, tags=[schema_tag("hr")])
+  disk.set("c", 3, ttl=100, soft_ttl=100, tags=[schema_tag("sales")])
+
+  assert disk.delete("c") is True
+  assert disk.delete("c") is False
+  assert disk.invalidate_tag(schema_tag("hr")) == 2
+  assert len(disk) == 0
+
+
+def test_disk_cache_trims_to_max_entries(tmp_path, wall_clock):
+  """Test that purging keeps the latest-expiring max_entries rows."""
+  disk = DiskCache(tmp_path / "cache.db", max_entries=2, clock=wall_clock)
+  for i in range(4):
+    disk.set(f"k{i}", i, ttl=10 + i, soft_ttl=10 + i)
+
+  assert disk.purge_expired() == 2
+  assert disk.get("k0") is None
+  assert disk.get("k3").value == 3
+  disk.close()
+
+
+def test_disk_cache_skips_unpicklable_values(disk):
+  """Test that values that cannot be serialized are not persisted."""
+  assert disk.set("lock", lambda: None, ttl=10, soft_ttl=10) is False
+  assert disk.get("lock") is None
+
+
+def test_disk_cache_errors_do_not_raise(disk):
+  """Test that a failing database behaves like an empty tier instead of raising."""
+  disk.set("a", 1, ttl=100, soft_ttl=100, tags=["t"])
+  disk.close()
+
+  assert disk.get("a") is None
+  assert disk.set("a", 2, ttl=100, soft_ttl=100) is False
+  assert disk.delete("a") is False
+  assert disk.invalidate_tag("t") == 0
+  assert disk.purge_expired() == 0
+  disk.clear()
+
+
+def test_cache_manager_survives_restart_through_l2(tmp_path, wall_clock):
+  """Test that a new CacheManager is served from the disk tier of an old one."""
+  path = tmp_path / "cache.db"
+  first = CacheManager(sweep_interval=0, l2=DiskCache(path, clock=wall_clock))
+  first.set("tables:hr", ["EMPLOYEES"], ttl=100, tags=[schema_tag("hr")])
+
+  restarted = CacheManager(sweep_interval=0, l2=DiskCache(path, clock=wall_clock))
+  calls = []
+  value = restarted.get_or_load("tables:hr", lambda: calls.append(1) or ["FRESH"], ttl=100)
+
+  assert value == ["EMPLOYEES"]
+  assert calls == []
+  assert restarted.stats()["namespaces"]["tables"]["l2_hits"] == 1
+  # Promoted entries keep their tags
+  assert restarted.invalidate_tag(schema_tag("hr")) == 1
+  assert restarted.get("tables:hr") is None
+
+
+def test_cache_manager_promotes_stale_l2_entries(tmp_path, wall_clock):
+  """Test that L2 entries past their soft TTL are served stale and refreshed."""
+  path = tmp_path / "cache.db"
+  first = CacheManager(sweep_interval=0, l2=DiskCache(path, clock=wall_clock))
+  first.set("tables:hr", "old", ttl=100, soft_ttl=10)
+  wall_clock.now += 20
+
+  restarted = CacheManager(sweep_interval=0, l2=DiskCache(path, clock=wall_clock))
+  assert restarted.get_or_load("tables:hr", lambda: "new", ttl=100, soft_ttl=10) == "old"
+  flight = restarted._inflight.get("tables:hr")
+  if flight is not None:
+    flight.result(timeout=5)
+  assert restarted.get("tables:hr") == "new"
+
+
+def test_cache_manager_delete_and_clear_reach_l2(tmp_path, wall_clock):
+  """Test that deletes and clears are applied to the disk tier."""
+  disk = DiskCache(tmp_path / "cache.db", clock=wall_clock)
+  cache = CacheManager(sweep_interval=0, l2=disk)
+  cache.set("a", 1)
+  cache.set("b", 2)
+
+  assert cache.delete("a") is True
+  assert disk.get("a") is None
+  cache.clear()
+  assert len(disk) == 0
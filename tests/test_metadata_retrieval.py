@@ -1,29 +1,138 @@
+import asyncio
 import unittest
-from unittest.mock import patch
-from src.db2_mcp_server.tools.metadata_retrieval import MetadataRetrievalTool
+from datetime import datetime
+from unittest.mock import MagicMock, patch
+from src.db2_mcp_server.cache import CacheManager, table_tag
+from src.db2_mcp_server.storage.table_metadata import FrozenTableMetadata, TableMetadata
+from src.db2_mcp_server.tools import metadata_retrieval
+from src.db2_mcp_server.tools.metadata_retrieval import (
+  TABLE_VERSION_QUERY,
+  GetTableSchemaInput,
+  MetadataRetrievalTool,
+  get_table_schema,
+)
+
+ALTERED = datetime(2024, 6, 7, 8, 9, 10)
 
 
 class TestMetadataRetrievalTool(unittest.TestCase):
   def setUp(self):
     # Mock connection string for testing
     self.connection_string = "DATABASE=sample;HOSTNAME=localhost;PORT=50000;PROTOCOL=TCPIP;UID=user;PWD=password;"
-    self.tool = MetadataRetrievalTool(self.connection_string)
+    self.mock_pooled = MagicMock()
+    self.mock_pool = MagicMock()
+    self.mock_pool.pooled_connection.return_value.__enter__.return_value = self.mock_pooled
+    self.cache = CacheManager(sweep_interval=0)
+    self.tool = MetadataRetrievalTool(self.connection_string, pool=self.mock_pool, cache_manager=self.cache)
+    self.tool.loader = MagicMock()
+    self.tool.loader.load.return_value = [
+      TableMetadata(table_name="SAMPLE_TABLE", schema_name="APP", last_updated=ALTERED)
+    ]
 
   @patch("src.db2_mcp_server.tools.metadata_retrieval.ibm_db")
   def test_get_table_metadata(self, mock_ibm_db):
-    # Mock table name
-    table_name = "SAMPLE_TABLE"
-    # Mock expected result
-    expected_result = [
-      {"COLNAME": "ID", "TYPENAME": "INTEGER"},
-      {"COLNAME": "NAME", "TYPENAME": "VARCHAR"},
-    ]
-    # Mock the ibm_db functions to return expected results
     mock_ibm_db.execute.return_value = True
-    mock_ibm_db.fetch_assoc.side_effect = expected_result + [None]
+    mock_ibm_db.fetch_tuple.return_value = ("APP     ", ALTERED)
+
+    result = self.tool.get_table_metadata("sample_table")
+
+    self.assertIsInstance(result, TableMetadata)
+    self.assertEqual(result.table_name, "SAMPLE_TABLE")
+    # Connection comes from the pool rather than a fresh connect/close
+    mock_ibm_db.connect.assert_not_called()
+    mock_ibm_db.close.assert_not_called()
+    # Names are bound as parameters on the cached prepared statement
+    stmt = self.mock_pooled.statements.prepare.return_value
+    self.mock_pooled.statements.prepare.assert_called_once_with(TABLE_VERSION_QUERY)
+    self.assertNotIn("SELECT *", TABLE_VERSION_QUERY)
+    mock_ibm_db.execute.assert_called_once_with(stmt, (None, "SAMPLE_TABLE"))
+    self.mock_pooled.statements.release.assert_called_once_with(stmt)
+    # The resolved schema is used for the bulk catalog read
+    self.tool.loader.load.assert_called_once_with(["APP"], ["SAMPLE_TABLE"])
+
+  @patch("src.db2_mcp_server.tools.metadata_retrieval.ibm_db")
+  def test_delimited_names_keep_their_case(self, mock_ibm_db):
+    mock_ibm_db.execute.return_value = True
+    mock_ibm_db.fetch_tuple.return_value = ("mySchema", ALTERED)
+
+    self.tool.get_table_metadata('"myTable"', '"mySchema"')
+
+    stmt = self.mock_pooled.statements.prepare.return_value
+    mock_ibm_db.execute.assert_called_once_with(stmt, ("mySchema", "myTable"))
+    self.tool.loader.load.assert_called_once_with(["mySchema"], ["myTable"])
+
+  @patch("src.db2_mcp_server.tools.metadata_retrieval.ibm_db")
+  def test_cached_metadata_is_frozen(self, mock_ibm_db):
+    mock_ibm_db.execute.return_value = True
+    mock_ibm_db.fetch_tuple.return_value = ("APP", ALTERED)
+
+    result = self.tool.get_table_metadata("SAMPLE_TABLE", "APP")
+
+    self.assertIsInstance(result, FrozenTableMetadata)
+    with self.assertRaises(Exception):
+      result.description = "changed"
+
+  @patch("src.db2_mcp_server.tools.metadata_retrieval.ibm_db")
+  def test_get_table_metadata_cached(self, mock_ibm_db):
+    mock_ibm_db.execute.return_value = True
+    mock_ibm_db.fetch_tuple.return_value = ("APP", ALTERED)
+
+    first = self.tool.get_table_metadata("SAMPLE_TABLE", "app")
+    second = self.tool.get_table_metadata("SAMPLE_TABLE", "APP")
+
+    self.assertIs(first, second)
+    # Second lookup is served from the cache without touching DB2
+    mock_ibm_db.execute.assert_called_once()
+    self.tool.loader.load.assert_called_once()
+
+  @patch("src.db2_mcp_server.tools.metadata_retrieval.ibm_db")
+  def test_missing_table_is_not_cached(self, mock_ibm_db):
+    mock_ibm_db.execute.return_value = True
+    mock_ibm_db.fetch_tuple.return_value = False
+
+    self.assertIsNone(self.tool.get_table_metadata("MISSING", "APP"))
+    self.assertIsNone(self.tool.get_table_metadata("MISSING", "APP"))
+
+    self.assertEqual(mock_ibm_db.execute.call_count, 2)
+    self.tool.loader.load.assert_not_called()
+
+  @patch("src.db2_mcp_server.tools.metadata_retrieval.ibm_db")
+  def test_revalidation_skips_unaltered_tables(self, mock_ibm_db):
+    mock_ibm_db.execute.return_value = True
+    mock_ibm_db.fetch_tuple.return_value = ("APP", ALTERED)
+    cached = self.tool.get_table_metadata("SAMPLE_TABLE", "APP")
+
+    # Same ALTER_TIME: the cached metadata is reused without reading columns
+    self.assertIs(self.tool.load_table_metadata("SAMPLE_TABLE", "APP"), cached)
+    self.tool.loader.load.assert_called_once()
+
+    # Altered table: the catalog is read again
+    mock_ibm_db.fetch_tuple.return_value = ("APP", datetime(2025, 1, 1))
+    self.tool.load_table_metadata("SAMPLE_TABLE", "APP")
+    self.assertEqual(self.tool.loader.load.call_count, 2)
+
+  @patch("src.db2_mcp_server.tools.metadata_retrieval.ibm_db")
+  def test_table_tag_invalidates(self, mock_ibm_db):
+    mock_ibm_db.execute.return_value = True
+    mock_ibm_db.fetch_tuple.return_value = ("APP", ALTERED)
+    self.tool.get_table_metadata("SAMPLE_TABLE", "APP")
+
+    self.assertEqual(self.cache.invalidate_tag(table_tag("APP", "SAMPLE_TABLE")), 1)
+    self.tool.get_table_metadata("SAMPLE_TABLE", "APP")
+    self.assertEqual(self.tool.loader.load.call_count, 2)
+
+  @patch("src.db2_mcp_server.tools.metadata_retrieval.ibm_db")
+  def test_get_table_schema_tool(self, mock_ibm_db):
+    mock_ibm_db.execute.return_value = True
+    mock_ibm_db.fetch_tuple.return_value = ("APP", ALTERED)
+
+    with patch.object(metadata_retrieval, "_retrieval_tool", self.tool):
+      result = asyncio.run(get_table_schema(None, GetTableSchemaInput(table_name="sample_table", schema_name="app")))
+      self.assertEqual(result.schema_name, "APP")
 
-    result = self.tool.get_table_metadata(table_name)
-    self.assertEqual(result, expected_result)
+      mock_ibm_db.fetch_tuple.return_value = False
+      with self.assertRaises(ValueError):
+        asyncio.run(get_table_schema(None, GetTableSchemaInput(table_name="missing")))
 
 
 if __name__ == "__main__":
@@ -1,9 +1,16 @@
 import pytest
 import json
-from src.db2_mcp_server.resources.db2_resources import db2_connection_guide, ResourceInput
+from src.db2_mcp_server.resources.db2_resources import db2_cache_stats, db2_connection_guide, ResourceInput
 
 def test_db2_connection_guide():
     result = db2_connection_guide()
     content = json.loads(result.content)
     assert "title" in content
-    assert result.mime_type == "application/json"
\ No newline at end of file
+    assert result.mime_type == "application/json"
+
+def test_db2_cache_stats():
+    result = db2_cache_stats()
+    content = json.loads(result.content)
+    assert "shared" in content
+    assert "namespaces" in content["shared"]
+    assert result.mime_type == "application/json"
@@ -0,0 +1,124 @@
+"""Tests for the cross-process shared cache server and client."""
+
+import pytest
+
+from db2_mcp_server.cache import CacheManager, ShardedCacheManager, schema_tag
+from db2_mcp_server.cache_backend import create_backend_from_env
+from db2_mcp_server.disk_cache import DiskCache
+from db2_mcp_server.shared_cache import SharedCacheClient, SharedCacheServer, parse_address
+
+AUTHKEY = b"test-secret"
+
+
+@pytest.fixture
+def server():
+  server = SharedCacheServer(("127.0.0.1", 0), AUTHKEY, CacheManager(sweep_interval=0))
+  server.start()
+  yield server
+  server.close()
+
+
+@pytest.fixture
+def client(server):
+  client = SharedCacheClient(server.address, AUTHKEY)
+  yield client
+  client.close()
+
+
+def test_parse_address():
+  """Test TCP and Unix socket address parsing."""
+  assert parse_address("127.0.0.1:37211") == ("127.0.0.1", 37211)
+  assert parse_address(":9000") == ("127.0.0.1", 9000)
+  assert parse_address("/run/db2-mcp/cache.sock") == "/run/db2-mcp/cache.sock"
+
+
+def test_client_roundtrip(client):
+  """Test get, set, delete and tag invalidation through the server."""
+  assert client.get("tables:hr") is None
+  assert client.set("tables:hr", ["EMPLOYEES"], ttl=100, soft_ttl=10, tags=[schema_tag("hr")])
+
+  entry = client.get("tables:hr")
+  assert entry.value == ["EMPLOYEES"]
+  assert 0 < entry.ttl <= 100
+  assert 0 < entry.soft_ttl <= 10
+  assert entry.tags == [schema_tag("hr")]
+
+  client.set("tables:sales", ["ORDERS"], ttl=100, soft_ttl=100, tags=[schema_tag("sales")])
+  assert client.invalidate_tag(schema_tag("hr")) == 1
+  assert client.delete("tables:sales") is True
+  assert client.server_stats()["entries"] == 0
+
+
+def test_workers_share_loaded_values(client, server):
+  """Test that a value loaded by one worker is a hit for another."""
+  worker_a = CacheManager(sweep_interval=0, l2=client)
+  worker_b = CacheManager(sweep_interval=0, l2=SharedCacheClient(server.address, AUTHKEY))
+  calls = []
+
+  def loader():
+    calls.append(1)
+    return {"columns": ["ID"]}
+
+  assert worker_a.get_or_load("syscat_columns:T", loader, ttl=60) == {"columns": ["ID"]}
+  assert worker_b.get_or_load("syscat_columns:T", loader, ttl=60) == {"columns": ["ID"]}
+  assert len(calls) == 1
+  assert worker_b.stats()["namespaces"]["syscat_columns"]["l2_hits"] == 1
+
+
+def test_sharded_cache_makes_one_round_trip_per_operation(client, monkeypatch):
+  """Test that a sharded worker cache does not fan requests out per shard."""
+  ops = []
+  call = client._call
+
+  def counting_call(op, *args, **kwargs):
+    ops.append(op)
+    return call(op, *args, **kwargs)
+
+  monkeypatch.setattr(client, "_call", counting_call)
+  worker = ShardedCacheManager(shards=16, sweep_interval=0, l2=client)
+  worker.set("tables:hr", ["EMPLOYEES"], ttl=100, tags=[schema_tag("hr")])
+  worker.invalidate_tag(schema_tag("hr"))
+  worker.purge_expired()
+  worker.clear()
+
+  assert ops == ["set", "invalidate_tag", "clear"]
+
+
+def test_wrong_authkey_behaves_like_miss(server):
+  """Test that a client with the wrong secret degrades to misses."""
+  client = SharedCacheClient(server.address, b"wrong", retry_interval=60)
+  assert client.set("key", 1, ttl=10, soft_ttl=10) is False
+  assert client.get("key") is None
+
+
+def test_unreachable_server_backs_off():
+  """Test that calls to a missing server fail fast after the first error."""
+  client = SharedCacheClient(("127.0.0.1", 1), AUTHKEY, retry_interval=60)
+  assert client.get("key") is None
+  assert client._down_until > 0
+  assert client.invalidate_tag("tag") == 0
+
+
+def test_server_requires_authkey():
+  """Test that the server refuses to run unauthenticated."""
+  with pytest.raises(ValueError):
+    SharedCacheServer(("127.0.0.1", 0), b"")
+
+
+def test_create_backend_from_env(monkeypatch, tmp_path):
+  """Test backend selection through CACHE_BACKEND."""
+  monkeypatch.setenv("CACHE_BACKEND", "memory")
+  assert create_backend_from_env() is None
+
+  monkeypatch.setenv("CACHE_BACKEND", "shared")
+  monkeypatch.setenv("CACHE_SHARED_AUTHKEY", "secret")
+  assert isinstance(create_backend_from_env(), SharedCacheClient)
+
+  monkeypatch.delenv("CACHE_SHARED_AUTHKEY")
+  assert create_backend_from_env() is None
+
+  monkeypatch.setenv("CACHE_BACKEND", "disk")
+  monkeypatch.setattr("db2_mcp_server.disk_cache.DEFAULT_L2_PATH", str(tmp_path / "cache.db"))
+  backend = create_backend_from_env()
+  assert isinstance(backend, DiskCache)
+  backend.close()
@@ -1,31 +1,52 @@
 """Tests for the list_tables MCP tool."""
 
+import asyncio
 import pytest
 from unittest.mock import MagicMock, patch
 
+from db2_mcp_server.cache import CacheManager, schema_tag
+
 # Assuming the tool file is correctly placed for import
 # Adjust the import path based on your project structure and how you run pytest
 from db2_mcp_server.tools.list_tables import (
     ListTablesInput,
     ListTablesResult,
     DB_CONNECTION_STRING, # Import for patching
+    _encode_continuation_token,
+    build_list_tables_query,
+    list_tables,
     list_tables_logic,
 )
+
+BASE_SQL = "SELECT TABSCHEMA, TABNAME FROM SYSCAT.TABLES WHERE TYPE = ?"
+ORDER_SQL = " ORDER BY TABSCHEMA, TABNAME FETCH FIRST 101 ROWS ONLY"
+
+
+@pytest.fixture
+def mock_pool():
+    """Patch the shared connection pool and yield (pool, pooled connection)."""
+    with patch('db2_mcp_server.tools.list_tables.get_connection_pool') as mock_get_pool:
+        pool = MagicMock()
+        pooled = MagicMock()
+        pool.pooled_connection.return_value.__enter__.return_value = pooled
+        mock_get_pool.return_value = pool
+        yield pool, pooled
+        mock_get_pool.assert_called_with(DB_CONNECTION_STRING)
+
 # --- Test Cases ---
 
 @patch('db2_mcp_server.tools.list_tables.ibm_db')
-def test_list_tables_success_no_filter(mock_ibm_db):
+def test_list_tables_success_no_filter(mock_ibm_db, mock_pool):
     """Test successful listing of tables without a schema filter."""
     # Arrange Mocks
-    mock_conn = MagicMock()
+    pool, pooled = mock_pool
     mock_stmt = MagicMock()
-    mock_ibm_db.connect.return_value = mock_conn
-    mock_ibm_db.prepare.return_value = mock_stmt
+    pooled.statements.prepare.return_value = mock_stmt
     mock_ibm_db.execute.return_value = True
     # Simulate fetching two tables
-    mock_ibm_db.fetch_tuple.side_effect = [('TABLE1 ',), ('TABLE2 ',), None]
+    mock_ibm_db.fetch_tuple.side_effect = [('APP ', 'TABLE1 '), ('APP ', 'TABLE2 '), None]
 
-    args = ListTablesInput(schema=None)
+    args = ListTablesInput()
 
     # Act
     result = list_tables_logic(args)
@@ -34,27 +55,28 @@ def test_list_tables_success_no_filter(mock_ibm_db):
     assert isinstance(result, ListTablesResult)
     assert result.tables == ["TABLE1", "TABLE2"]
     assert result.count == 2
-    assert result.schema_filter is None
-    assert result.table_type_filter is None
-    mock_ibm_db.connect.assert_called_once_with(DB_CONNECTION_STRING, "", "")
-    mock_ibm_db.prepare.assert_called_once_with(mock_conn, "SELECT TABNAME FROM SYSCAT.TABLES WHERE TYPE = 'T' ORDER BY TABNAME")
-    mock_ibm_db.execute.assert_called_once_with(mock_stmt)
-    mock_ibm_db.close.assert_called_once_with(mock_conn)
-    mock_ibm_db.free_stmt.assert_called_once_with(mock_stmt)
+    assert result.schema_filter == ""
+    assert result.table_type_filter == ""
+    assert result.next_token == ""
+    pool.pooled_connection.assert_called_once_with()
+    mock_ibm_db.connect.assert_not_called()
+    pooled.statements.prepare.assert_called_once_with(BASE_SQL + ORDER_SQL)
+    mock_ibm_db.execute.assert_called_once_with(mock_stmt, ("T",))
+    mock_ibm_db.close.assert_not_called()
+    pooled.statements.release.assert_called_once_with(mock_stmt)
 
 @patch('db2_mcp_server.tools.list_tables.ibm_db')
-def test_list_tables_success_with_filter(mock_ibm_db):
+def test_list_tables_success_with_filter(mock_ibm_db, mock_pool):
     """Test successful listing of tables with a schema filter."""
     # Arrange Mocks
-    mock_conn = MagicMock()
+    pool, pooled = mock_pool
     mock_stmt = MagicMock()
-    mock_ibm_db.connect.return_value = mock_conn
-    mock_ibm_db.prepare.return_value = mock_stmt
+    pooled.statements.prepare.return_value = mock_stmt
     mock_ibm_db.execute.return_value = True
-    mock_ibm_db.fetch_tuple.side_effect = [('TABLE_A',), None]
+    mock_ibm_db.fetch_tuple.side_effect = [('MYSCHEMA', 'TABLE_A'), None]
 
-    schema = "MYSCHEMA"
-    args = ListTablesInput(schema=schema)
+    schema = "myschema"
+    args = ListTablesInput(schema_name=schema)
 
     # Act
     result = list_tables_logic(args)
@@ -63,89 +85,81 @@ def test_list_tables_success_with_filter(mock_ibm_db):
     assert isinstance(result, ListTablesResult)
     assert result.tables == ["TABLE_A"]
     assert result.count == 1
-    assert result.schema_filter == "MYSCHEMA"
-    assert result.table_type_filter is None
-    mock_ibm_db.connect.assert_called_once_with(DB_CONNECTION_STRING, "", "")
-    expected_sql = "SELECT TABNAME FROM SYSCAT.TABLES WHERE TYPE = 'T' AND TABSCHEMA = ? ORDER BY TABNAME"
-    mock_ibm_db.prepare.assert_called_once_with(mock_conn, expected_sql)
-    mock_ibm_db.execute.assert_called_once_with(mock_stmt, (schema.upper(),))
-    mock_ibm_db.close.assert_called_once_with(mock_conn)
-    mock_ibm_db.free_stmt.assert_called_once_with(mock_stmt)
+    assert result.schema_filter == "myschema"
+    expected_sql = BASE_SQL + " AND TABSCHEMA = ?" + ORDER_SQL
+    pooled.statements.prepare.assert_called_once_with(expected_sql)
+    mock_ibm_db.execute.assert_called_once_with(mock_stmt, ("T", schema.upper()))
+    pooled.statements.release.assert_called_once_with(mock_stmt)
 
 @patch('db2_mcp_server.tools.list_tables.ibm_db')
-def test_list_tables_connection_error(mock_ibm_db):
+def test_list_tables_connection_error(mock_ibm_db, mock_pool):
     """Test handling of a database connection error."""
     # Arrange Mocks
-    mock_ibm_db.connect.return_value = None # Simulate connection failure
+    pool, pooled = mock_pool
+    pool.pooled_connection.return_value.__enter__.side_effect = ConnectionError("Failed to connect to the DB2 database.")
 
-    args = ListTablesInput(schema=None)
+    args = ListTablesInput()
 
     # Act & Assert
     with pytest.raises(ConnectionError, match="Failed to connect to the DB2 database."):
         list_tables_logic(args)
 
-    mock_ibm_db.connect.assert_called_once_with(DB_CONNECTION_STRING, "", "")
-    mock_ibm_db.prepare.assert_not_called()
+    pooled.statements.prepare.assert_not_called()
     mock_ibm_db.execute.assert_not_called()
-    mock_ibm_db.close.assert_not_called() # Connection wasn't established
-    mock_ibm_db.free_stmt.assert_not_called()
+    pooled.statements.release.assert_not_called()
 
 @patch('db2_mcp_server.tools.list_tables.ibm_db')
-def test_list_tables_prepare_error(mock_ibm_db):
+def test_list_tables_prepare_error(mock_ibm_db, mock_pool):
     """Test handling of a statement preparation error."""
     # Arrange Mocks
-    mock_conn = MagicMock()
-    mock_ibm_db.connect.return_value = mock_conn
-    mock_ibm_db.prepare.return_value = None # Simulate prepare failure
-    mock_ibm_db.stmt_errormsg.return_value = "Syntax error"
+    pool, pooled = mock_pool
+    # Simulate prepare failure
+    pooled.statements.prepare.side_effect = RuntimeError("Failed to prepare SQL statement: Syntax error")
 
-    args = ListTablesInput(schema=None)
+    args = ListTablesInput()
 
     # Act & Assert
     with pytest.raises(RuntimeError, match="Failed to prepare SQL statement: Syntax error"):
         list_tables_logic(args)
 
-    mock_ibm_db.connect.assert_called_once_with(DB_CONNECTION_STRING, "", "")
-    mock_ibm_db.prepare.assert_called_once()
+    pooled.statements.prepare.assert_called_once()
     mock_ibm_db.execute.assert_not_called()
-    mock_ibm_db.close.assert_called_once_with(mock_conn)
-    mock_ibm_db.free_stmt.assert_not_called() # Stmt wasn't created
+    pooled.statements.release.assert_not_called() # Stmt wasn't created
+    # The error propagates through the pool context manager
+    exit_args = pool.pooled_connection.return_value.__exit__.call_args[0]
+    assert exit_args[0] is RuntimeError
 
 @patch('db2_mcp_server.tools.list_tables.ibm_db')
-def test_list_tables_execute_error(mock_ibm_db):
+def test_list_tables_execute_error(mock_ibm_db, mock_pool):
     """Test handling of a statement execution error."""
     # Arrange Mocks
-    mock_conn = MagicMock()
+    _, pooled = mock_pool
     mock_stmt = MagicMock()
-    mock_ibm_db.connect.return_value = mock_conn
-    mock_ibm_db.prepare.return_value = mock_stmt
+    pooled.statements.prepare.return_value = mock_stmt
     mock_ibm_db.execute.return_value = False # Simulate execute failure
     mock_ibm_db.stmt_errormsg.return_value = "Table not found"
 
-    args = ListTablesInput(schema=None)
+    args = ListTablesInput()
 
     # Act & Assert
     with pytest.raises(RuntimeError, match="Failed to execute SQL statement: Table not found"):
         list_tables_logic(args)
 
-    mock_ibm_db.connect.assert_called_once_with(DB_CONNECTION_STRING, "", "")
-    mock_ibm_db.prepare.assert_called_once()
+    pooled.statements.prepare.assert_called_once()
     mock_ibm_db.execute.assert_called_once()
-    mock_ibm_db.close.assert_called_once_with(mock_conn)
-    mock_ibm_db.free_stmt.assert_called_once_with(mock_stmt)
+    pooled.statements.release.assert_called_once_with(mock_stmt)
 
 @patch('db2_mcp_server.tools.list_tables.ibm_db')
-def test_list_tables_no_tables_found(mock_ibm_db):
+def test_list_tables_no_tables_found(mock_ibm_db, mock_pool):
     """Test the scenario where no tables are found."""
     # Arrange Mocks
-    mock_conn = MagicMock()
+    _, pooled = mock_pool
     mock_stmt = MagicMock()
-    mock_ibm_db.connect.return_value = mock_conn
-    mock_ibm_db.prepare.return_value = mock_stmt
+    pooled.statements.prepare.return_value = mock_stmt
     mock_ibm_db.execute.return_value = True
     mock_ibm_db.fetch_tuple.return_value = None # No results
 
-    args = ListTablesInput(schema=None)
+    args = ListTablesInput()
 
     # Act
     result = list_tables_logic(args)
@@ -154,85 +168,155 @@ def test_list_tables_no_tables_found(mock_ibm_db):
     assert isinstance(result, ListTablesResult)
     assert result.tables == []
     assert result.count == 0
-    assert result.schema_filter is None
-    assert result.table_type_filter is None
-    mock_ibm_db.connect.assert_called_once_with(DB_CONNECTION_STRING, "", "")
-    mock_ibm_db.prepare.assert_called_once()
+    pooled.statements.prepare.assert_called_once()
     mock_ibm_db.execute.assert_called_once()
-    mock_ibm_db.close.assert_called_once_with(mock_conn)
-    mock_ibm_db.free_stmt.assert_called_once_with(mock_stmt)
+    pooled.statements.release.assert_called_once_with(mock_stmt)
 
 @patch('db2_mcp_server.tools.list_tables.ibm_db')
-def test_list_tables_empty_schema(mock_ibm_db):
-    """Test listing tables with an empty schema filter."""
+def test_list_tables_empty_schema(mock_ibm_db, mock_pool):
+    """Test listing tables with an empty or blank schema filter."""
     # Arrange Mocks
-    mock_conn = MagicMock()
+    _, pooled = mock_pool
     mock_stmt = MagicMock()
-    mock_ibm_db.connect.return_value = mock_conn
-    mock_ibm_db.prepare.return_value = mock_stmt
+    pooled.statements.prepare.return_value = mock_stmt
     mock_ibm_db.execute.return_value = True
-    mock_ibm_db.fetch_tuple.side_effect = [('TABLE1',), ('TABLE2',), None]
+    mock_ibm_db.fetch_tuple.side_effect = [('APP', 'TABLE1'), ('APP', 'TABLE2'), None]
 
-    args = ListTablesInput(schema="")
+    args = ListTablesInput(schema_name="   ")
 
     # Act
     result = list_tables_logic(args)
 
     # Assert
-    assert isinstance(result, ListTablesResult)
     assert result.tables == ["TABLE1", "TABLE2"]
-    assert result.count == 2
-    assert result.schema_filter == ""
-    assert result.table_type_filter is None
-    mock_ibm_db.connect.assert_called_once_with(DB_CONNECTION_STRING, "", "")
-    mock_ibm_db.prepare.assert_called_once_with(mock_conn, "SELECT TABNAME FROM SYSCAT.TABLES WHERE TYPE = 'T' ORDER BY TABNAME")
-    mock_ibm_db.execute.assert_called_once_with(mock_stmt)
-    mock_ibm_db.close.assert_called_once_with(mock_conn)
-    mock_ibm_db.free_stmt.assert_called_once_with(mock_stmt)
+    pooled.statements.prepare.assert_called_once_with(BASE_SQL + ORDER_SQL)
+    mock_ibm_db.execute.assert_called_once_with(mock_stmt, ("T",))
+    pooled.statements.release.assert_called_once_with(mock_stmt)
 
 @patch('db2_mcp_server.tools.list_tables.ibm_db')
-def test_list_tables_null_schema(mock_ibm_db):
-    """Test listing tables with a null schema filter."""
+def test_list_tables_database_error(mock_ibm_db, mock_pool):
+    """Test handling of a database error during table listing."""
     # Arrange Mocks
-    mock_conn = MagicMock()
+    _, pooled = mock_pool
+    mock_stmt = MagicMock()
+    pooled.statements.prepare.return_value = mock_stmt
+    mock_ibm_db.execute.side_effect = Exception("Database error")
+
+    args = ListTablesInput()
+
+    # Act & Assert
+    with pytest.raises(Exception, match="Database error"):
+        list_tables_logic(args)
+
+    pooled.statements.prepare.assert_called_once()
+    mock_ibm_db.execute.assert_called_once()
+    pooled.statements.release.assert_called_once_with(mock_stmt)
+
+@patch('db2_mcp_server.tools.list_tables.ibm_db')
+def test_list_tables_table_type_filter(mock_ibm_db, mock_pool):
+    """Test that the table type filter is pushed into the SQL as a parameter."""
+    _, pooled = mock_pool
     mock_stmt = MagicMock()
-    mock_ibm_db.connect.return_value = mock_conn
-    mock_ibm_db.prepare.return_value = mock_stmt
+    pooled.statements.prepare.return_value = mock_stmt
     mock_ibm_db.execute.return_value = True
-    mock_ibm_db.fetch_tuple.side_effect = [('TABLE1',), ('TABLE2',), None]
+    mock_ibm_db.fetch_tuple.side_effect = [('APP', 'ACTIVE_USERS'), None]
 
-    args = ListTablesInput(schema=None)
+    result = list_tables_logic(ListTablesInput(table_type="v", limit=10))
 
-    # Act
-    result = list_tables_logic(args)
+    assert result.tables == ["ACTIVE_USERS"]
+    assert result.table_type_filter == "v"
+    sql = pooled.statements.prepare.call_args[0][0]
+    assert sql.endswith("FETCH FIRST 11 ROWS ONLY")
+    mock_ibm_db.execute.assert_called_once_with(mock_stmt, ("V",))
 
-    # Assert
-    assert isinstance(result, ListTablesResult)
-    assert result.tables == ["TABLE1", "TABLE2"]
-    mock_ibm_db.connect.assert_called_once_with(DB_CONNECTION_STRING, "", "")
-    mock_ibm_db.prepare.assert_called_once_with(mock_conn, "SELECT TABNAME FROM SYSCAT.TABLES WHERE TYPE = 'T' ORDER BY TABNAME")
-    mock_ibm_db.execute.assert_called_once_with(mock_stmt)
-    mock_ibm_db.close.assert_called_once_with(mock_conn)
-    mock_ibm_db.free_stmt.assert_called_once_with(mock_stmt)
+def test_list_tables_invalid_table_type():
+    """Test that unknown table types are rejected before querying."""
+    with pytest.raises(ValueError, match="Invalid table_type"):
+        build_list_tables_query(ListTablesInput(table_type="X"))
+
+def test_list_tables_limit_validation():
+    """Test that limit must be a positive, bounded page size."""
+    with pytest.raises(ValueError):
+        ListTablesInput(limit=0)
+    with pytest.raises(ValueError):
+        ListTablesInput(limit=100000)
 
 @patch('db2_mcp_server.tools.list_tables.ibm_db')
-def test_list_tables_database_error(mock_ibm_db):
-    """Test handling of a database error during table listing."""
-    # Arrange Mocks
-    mock_conn = MagicMock()
+def test_list_tables_pagination(mock_ibm_db, mock_pool):
+    """Test keyset pagination across pages with a continuation token."""
+    _, pooled = mock_pool
     mock_stmt = MagicMock()
-    mock_ibm_db.connect.return_value = mock_conn
-    mock_ibm_db.prepare.return_value = mock_stmt
-    mock_ibm_db.execute.side_effect = Exception("Database error")
+    pooled.statements.prepare.return_value = mock_stmt
+    mock_ibm_db.execute.return_value = True
+    # First page: limit 2, the third row signals another page
+    mock_ibm_db.fetch_tuple.side_effect = [('APP', 'A'), ('APP', 'B'), ('HR', 'C'), ('HR', 'D')]
 
-    args = ListTablesInput(schema=None)
+    first = list_tables_logic(ListTablesInput(limit=2))
 
-    # Act & Assert
-    with pytest.raises(Exception, match="Database error"):
-        list_tables_logic(args)
+    assert first.tables == ["A", "B"]
+    assert first.count == 2
+    assert first.next_token
+    # Stops fetching once the extra row has been seen
+    assert mock_ibm_db.fetch_tuple.call_count == 3
 
-    mock_ibm_db.connect.assert_called_once_with(DB_CONNECTION_STRING, "", "")
-    mock_ibm_db.prepare.assert_called_once()
-    mock_ibm_db.execute.assert_called_once()
-    mock_ibm_db.close.assert_called_once_with(mock_conn)
-    mock_ibm_db.free_stmt.assert_called_once_with(mock_stmt)
\ No newline at end of file
+    mock_ibm_db.reset_mock()
+    pooled.reset_mock()
+    pooled.statements.prepare.return_value = mock_stmt
+    mock_ibm_db.execute.return_value = True
+    mock_ibm_db.fetch_tuple.side_effect = [('HR', 'C'), None]
+
+    second = list_tables_logic(ListTablesInput(limit=2, continuation_token=first.next_token))
+
+    assert second.tables == ["C"]
+    assert second.next_token == ""
+    sql = pooled.statements.prepare.call_args[0][0]
+    assert "AND (TABSCHEMA > ? OR (TABSCHEMA = ? AND TABNAME > ?))" in sql
+    mock_ibm_db.execute.assert_called_once_with(mock_stmt, ("T", "APP", "APP", "B"))
+
+def test_list_tables_token_bound_to_filters():
+    """Test that a continuation token cannot be reused with other filters."""
+    sql, params = build_list_tables_query(ListTablesInput(schema_name="app", limit=5))
+    assert params == ["T", "APP"]
+
+    token = _encode_continuation_token("APP", "ORDERS", "APP", "T")
+
+    _, params = build_list_tables_query(ListTablesInput(schema_name="app", continuation_token=token))
+    assert params == ["T", "APP", "APP", "APP", "ORDERS"]
+
+    with pytest.raises(ValueError, match="does not match"):
+        build_list_tables_query(ListTablesInput(schema_name="hr", continuation_token=token))
+    with pytest.raises(ValueError, match="Invalid continuation token"):
+        build_list_tables_query(ListTablesInput(continuation_token="not-a-token"))
+
+def test_list_tables_tool_coalesces_identical_requests():
+    """Test that concurrent identical list_tables calls share one catalog query."""
+    calls = []
+
+    async def fake_run_db_call(fn, *args):
+        calls.append(args)
+        await asyncio.sleep(0.05)
+        return ListTablesResult(tables=["T1"], count=1)
+
+    args = ListTablesInput(schema_name="coalesce")
+    with patch('db2_mcp_server.tools.list_tables.cache', CacheManager(sweep_interval=0)), \
+         patch('db2_mcp_server.tools.list_tables.run_db_call', side_effect=fake_run_db_call):
+        async def main():
+            return await asyncio.gather(*(list_tables(None, args) for _ in range(5)))
+        results = asyncio.run(main())
+
+    assert [r.tables for r in results] == [["T1"]] * 5
+    assert len(calls) == 1
+
+def test_list_tables_results_invalidated_by_schema_tag():
+    """Test that cached pages for a schema are dropped by its schema tag."""
+    async def fake_run_db_call(fn, *args):
+        return ListTablesResult(tables=["T1"], count=1)
+
+    test_cache = CacheManager(sweep_interval=0)
+    with patch('db2_mcp_server.tools.list_tables.cache', test_cache), \
+         patch('db2_mcp_server.tools.list_tables.run_db_call', side_effect=fake_run_db_call):
+        asyncio.run(list_tables(None, ListTablesInput(schema_name="hr")))
+        asyncio.run(list_tables(None, ListTablesInput(schema_name="sales")))
+
+    assert test_cache.invalidate_tag(schema_tag("HR")) == 1
+    assert len(test_cache) == 1
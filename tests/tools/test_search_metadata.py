@@ -0,0 +1,33 @@
+"""Tests for the search_metadata MCP tool."""
+
+import asyncio
+from unittest.mock import patch
+
+import pytest
+
+from db2_mcp_server.search.text_index import TextIndex
+from db2_mcp_server.storage.table_metadata import TableMetadata
+from db2_mcp_server.tools.search_metadata import SearchMetadataInput, search_metadata, search_metadata_logic
+
+
+@pytest.fixture
+def text_index():
+    index = TextIndex()
+    index.add_table(TableMetadata(table_name="CHURN", schema_name="APP", business_purpose="Customer churn model"))
+    index.add_table(TableMetadata(table_name="ORDERS", schema_name="APP", description="Customer orders"))
+    with patch("db2_mcp_server.search.text_index._text_index", index):
+        yield index
+
+
+def test_search_metadata_logic(text_index):
+    """Test that tables are returned best first."""
+    result = search_metadata_logic(SearchMetadataInput(query="customer churn"))
+    assert result.count == 2
+    assert result.matches[0].table_name == "CHURN"
+    assert result.matches[0].description == "Customer churn model"
+
+
+def test_search_metadata_tool(text_index):
+    """Test the async tool entry point with a schema filter."""
+    result = asyncio.run(search_metadata(None, SearchMetadataInput(query="orders", schema_name="APP", limit=1)))
+    assert [m.table_name for m in result.matches] == ["ORDERS"]
@@ -0,0 +1,41 @@
+"""Tests for the search_tables MCP tool."""
+
+import asyncio
+from unittest.mock import patch
+
+import pytest
+
+from db2_mcp_server.search.name_index import NameIndex
+from db2_mcp_server.tools.search_tables import SearchTablesInput, search_tables, search_tables_logic
+
+
+@pytest.fixture
+def name_index():
+    index = NameIndex()
+    index.add_table("CUSTOMERS", "APP", ["ID", "NAME"])
+    index.add_table("ORDERS", "APP", ["ID", "CUSTOMER_ID"])
+    with patch("db2_mcp_server.search.name_index._name_index", index):
+        yield index
+
+
+def test_search_tables_logic(name_index):
+    """Test that matches are returned best first."""
+    result = search_tables_logic(SearchTablesInput(query="customer", limit=5))
+    assert result.count == 2
+    assert (result.matches[0].table_name, result.matches[0].column_name) == ("CUSTOMERS", None)
+    assert result.matches[1].column_name == "CUSTOMER_ID"
+
+
+def test_search_tables_kind_filter(name_index):
+    """Test the kind filter and its validation."""
+    result = search_tables_logic(SearchTablesInput(query="id", kind="column"))
+    assert {m.table_name for m in result.matches} == {"CUSTOMERS", "ORDERS"}
+    with pytest.raises(ValueError):
+        search_tables_logic(SearchTablesInput(query="id", kind="index"))
+
+
+def test_search_tables_tool(name_index):
+    """Test the async tool entry point."""
+    result = asyncio.run(search_tables(None, SearchTablesInput(query="ordrs")))
+    assert result.matches[0].table_name == "ORDERS"
+    assert result.matches[0].match == "fuzzy"